@@ -0,0 +1,1037 @@
+#!/usr/bin/env python3
+"""
+BLOODBATH BENCHMARKS
+python bench.py                 run every benchmark
+python bench.py collides        run one by name
+python bench.py --list          show what is available
+python bench.py --scenarios --json out.json
+                                play every scenario, per-subsystem frame times to out.json
+"""
+
+import os
+import sys
+import time
+import math
+import json
+import random
+import inspect
+import argparse
+import itertools
+import subprocess
+import importlib.util
+
+# Benchmarks never need a real window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCRIPT = os.path.join(HERE, 'bloodbath V1,5.py')
+
+BENCHMARKS = {}
+
+
+def benchmark(fn):
+    """Register a bench_* function under its short name"""
+    BENCHMARKS[fn.__name__[len('bench_'):]] = fn
+    return fn
+
+
+def load_game(path=DEFAULT_SCRIPT):
+    """Import a game script by path (the file names are not importable)"""
+    spec = importlib.util.spec_from_file_location('bloodbath', path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    if hasattr(mod, 'open_display'):
+        mod.open_display()  # newer scripts leave the window to their caller
+    return mod
+
+
+def time_frames(fn, frames):
+    """Mean milliseconds per call of fn over a number of frames"""
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def make(cls, *args, **seeded):
+    """cls(*args), passing the seeded keywords (rng=, seed=) only if this script's cls takes them"""
+    params = inspect.signature(cls).parameters
+    return cls(*args, **{name: value for name, value in seeded.items() if name in params})
+
+
+def place_near(bb, game, cls, count, radius=600, w=40, h=60):
+    """Drop extra NPCs on free ground around the player"""
+    p = game.player
+    added = []
+    for _ in range(count):
+        for _ in range(50):
+            x = p.x + random.uniform(-radius, radius)
+            y = p.y + random.uniform(-radius, radius)
+            x = max(100, min(bb.MAP_W*bb.TILE - 100, x))
+            y = max(100, min(bb.MAP_H*bb.TILE - 100, y))
+            if not game.collides(x, y, w, h):
+                added.append(make(cls, x, y, rng=random))
+                break
+    return added
+
+
+def legacy_collides(game):
+    """The original linear scan over every building rect"""
+    import pygame
+
+    def collides(x, y, w, h):
+        rect = pygame.Rect(x, y, w, h)
+        for b in game.buildings:
+            if rect.colliderect(b):
+                return True
+        return False
+    return collides
+
+
+@benchmark
+def bench_collides(bb, frames):
+    """Game.update with 200+ NPCs: linear building scan vs tile occupancy grid"""
+    results = {}
+    for label in ('linear', 'grid'):
+        random.seed(1)
+        game = bb.Game()
+        random.seed(2)
+        game.cops.extend(place_near(bb, game, bb.Cop, 80))
+        game.civilians.extend(place_near(bb, game, bb.Civilian, 120, w=35, h=55))
+        game.player.wanted = 2  # every cop in range chases
+        if label == 'linear':
+            game.collides = legacy_collides(game)
+
+        calls = [0]
+        inner = game.collides
+
+        def counted(x, y, w, h):
+            calls[0] += 1
+            return inner(x, y, w, h)
+        game.collides = counted
+
+        npcs = len(game.cops) + len(game.civilians) + len(game.gang_members)
+        ms = time_frames(lambda: game.update(1 / 60), frames)
+        results[label] = ms
+        print(f"  {label:<7} {ms:7.3f} ms/frame  {npcs} NPCs, "
+              f"{calls[0] / frames:.0f} collides()/frame, {len(game.buildings)} buildings")
+    print(f"  saving  {results['linear'] - results['grid']:7.3f} ms/frame "
+          f"({results['linear'] / results['grid']:.1f}x)")
+
+
+@benchmark
+def bench_bullets(bb, frames):
+    """Bullet-vs-cop hit tests in a growing crowd: linear scan vs hash point test vs swept segment"""
+    for crowd in (100, 400, 1600):
+        random.seed(1)
+        game = bb.Game()
+        random.seed(2)
+        game.cops.extend(place_near(bb, game, bb.Cop, crowd, radius=500))
+        game.reindex()
+        p = game.player
+        # Ten uzi bullets in flight per frame, each tested once per frame
+        shots = [(p.x + random.uniform(-500, 500), p.y + random.uniform(-500, 500))
+                 for _ in range(frames * 10)]
+
+        def linear():
+            for bx, by in shots:
+                for cop in game.cops:
+                    if abs(bx - cop.center[0]) < 25 and abs(by - cop.center[1]) < 35:
+                        break
+
+        def hashed():
+            grid = game.grids['cop']
+            for bx, by in shots:
+                for cop in grid.query_rect(bx - 25, by - 35, 50, 70):
+                    if abs(bx - cop.center[0]) < 25 and abs(by - cop.center[1]) < 35:
+                        break
+
+        def swept():
+            # What update() does now: wall raycast plus segment query per step
+            for bx, by in shots:
+                b = bb.Bullet(bx, by, random.uniform(0, math.tau))
+                x0, y0 = b.x - b.vx, b.y - b.vy
+                wall_t = game.occupancy.raycast(x0, y0, b.x, b.y)
+                game.sweep_bullet(b, x0, y0, 1.0 if wall_t is None else wall_t)
+
+        lin = time_frames(linear, 1) / frames
+        hsh = time_frames(hashed, 1) / frames
+        swp = time_frames(swept, 1) / frames
+        print(f"  {len(game.cops):5d} cops  linear {lin:7.3f} ms/frame  hash {hsh:6.3f} ms/frame  "
+              f"swept {swp:6.3f} ms/frame")
+
+
+@benchmark
+def bench_gangwar(bb, frames):
+    """Gang targeting at 30/300/3000 members: O(n^2) scan vs per-gang hash"""
+    for members in (30, 300, 3000):
+        random.seed(1)
+        game = bb.Game()
+        random.seed(2)
+        game.gang_members.clear()
+        # Three equal gangs spread over the whole map
+        span = bb.MAP_W * bb.TILE - 200
+        while len(game.gang_members) < members:
+            x, y = 100 + random.random() * span, 100 + random.random() * span
+            if not game.collides(x, y, 38, 58):
+                gang = ('red', 'blue', 'green')[len(game.gang_members) % 3]
+                game.gang_members.append(make(bb.GangMember, x, y, gang, rng=random))
+        game.reindex()
+        gangs = list(game.gang_members)
+
+        def brute():
+            for gang in gangs:
+                nearest, nearest_dist = None, 400
+                for other in gangs:
+                    if other.gang != gang.gang:
+                        dist = math.hypot(other.x - gang.x, other.y - gang.y)
+                        if dist < nearest_dist:
+                            nearest, nearest_dist = other, dist
+
+        def indexed():
+            for gang in gangs:
+                game.nearest_hostile(gang)
+
+        brute_ms = time_frames(brute, 1 if members > 300 else 10)
+        index_ms = time_frames(indexed, 10)
+        # Amortised: each member searches once every RETARGET_TICKS
+        amortised = index_ms / bb.GangMember.RETARGET_TICKS
+        tick_ms = time_frames(lambda: game.update(1 / 60), min(frames, 60))
+        print(f"  {members:5d} members  search all: brute {brute_ms:9.2f} ms  "
+              f"hash {index_ms:7.2f} ms  amortised {amortised:6.2f} ms/tick  "
+              f"full update {tick_ms:7.2f} ms")
+
+
+def legacy_lookups(game):
+    """The original per-frame scans behind auto-aim and the E prompt"""
+    def nearest_cop(max_range=400):
+        px, py = game.player.center
+        nearest, nearest_dist = None, max_range
+        for cop in game.cops:
+            dist = math.hypot(cop.center[0] - px, cop.center[1] - py)
+            if dist < nearest_dist:
+                nearest, nearest_dist = cop, dist
+        return nearest
+
+    def near_building():
+        px, py = game.player.center
+        for vehicle in game.vehicles:
+            if not vehicle.occupied and math.hypot(px - vehicle.x, py - vehicle.y) < 80:
+                return vehicle
+        for places in (game.crack_dens, game.strip_clubs, game.gunstores,
+                       game.upgrade_shops, game.safe_houses):
+            for rect, center in places:
+                if math.hypot(px - center[0], py - center[1]) < 80:
+                    return rect
+        for dealer in game.drug_dealers:
+            if math.hypot(px - dealer.center[0], py - dealer.center[1]) < 80:
+                return dealer
+        return None
+    return nearest_cop, near_building
+
+
+@benchmark
+def bench_proximity(bb, frames):
+    """Auto-aim + interaction prompt lookups per frame: linear scans vs proximity index"""
+    for crowd in (8, 100, 1000):
+        random.seed(1)
+        game = bb.Game()
+        random.seed(2)
+        game.cops.extend(place_near(bb, game, bb.Cop, crowd - len(game.cops), radius=1500))
+        game.reindex()
+        p = game.player
+        spots = [(p.x + random.uniform(-1500, 1500), p.y + random.uniform(-1500, 1500))
+                 for _ in range(frames)]
+        nearest_cop, near_building = legacy_lookups(game)
+
+        def run(aim, prompt):
+            def frame():
+                for x, y in spots:
+                    p.x, p.y = x, y
+                    aim(400)
+                    prompt()
+            return frame
+
+        lin = time_frames(run(nearest_cop, near_building), 1) / frames
+        idx = time_frames(run(game.get_nearest_cop, game.check_near_building), 1) / frames
+        print(f"  {len(game.cops):5d} cops  {len(game.vehicles)} cars  "
+              f"linear {lin * 1000:7.1f} us/frame  index {idx * 1000:6.1f} us/frame")
+
+
+def scatter(bb, game, cls, count, w, h):
+    """NPCs dropped on free ground anywhere on the map"""
+    span = bb.MAP_W * bb.TILE - 200
+    placed = []
+    while len(placed) < count:
+        x, y = 100 + random.random() * span, 100 + random.random() * span
+        if not game.collides(x, y, w, h):
+            placed.append(make(cls, x, y, rng=random))
+    return placed
+
+
+@benchmark
+def bench_crowd(bb, frames):
+    """Thousands of pedestrians: Civilian objects vs the NumPy crowd store"""
+    if bb.np is None:
+        print("  numpy is not installed - only the object path is available")
+        return
+    saved = bb.CROWD_STORE
+    try:
+        for crowd in (200, 2000, 5000):
+            row = []
+            for label, use_store in (('objects', False), ('arrays', True)):
+                bb.CROWD_STORE = use_store
+                random.seed(1)
+                game = bb.Game()
+                p = game.player
+                random.seed(2)
+                game.civilians.extend(scatter(bb, game, bb.Civilian, crowd - len(game.civilians), 35, 55))
+                game.reindex()
+                p.wanted = 1  # everyone within 300 px flees
+                ms = time_frames(lambda: game.update(1 / 60), frames)
+                row.append(f"{label} {ms:7.2f} ms/frame")
+            print(f"  {crowd:5d} civilians  " + "  ".join(row))
+    finally:
+        bb.CROWD_STORE = saved
+
+
+class LegacyParticle:
+    """The original one-object-per-particle effect, for comparison"""
+    def __init__(self, x, y, ptype):
+        self.x, self.y, self.ptype, self.life = x, y, ptype, 30
+        angle = random.random() * 6.28
+        speed = random.uniform(3, 10)
+        self.vx, self.vy = math.cos(angle) * speed, math.sin(angle) * speed
+        self.size = random.randint(4, 10)
+        if ptype == 'smoke':
+            self.vx, self.vy, self.life = random.uniform(-1, 1), random.uniform(-3, -1), 45
+        elif ptype == 'explosion':
+            self.life = 25
+
+    def update(self):
+        self.x += self.vx
+        self.y += self.vy
+        if self.ptype == 'smoke':
+            self.vy -= 0.05
+            self.size += 0.3
+        else:
+            self.vy += 0.3
+        self.life -= 1
+
+
+@benchmark
+def bench_particles(bb, frames):
+    """RPG spam: per-object particles with list.remove vs the pooled particle arrays"""
+    for blasts in (1, 4, 12):
+        particles = []
+
+        def legacy():
+            for _ in range(blasts):
+                particles.extend(LegacyParticle(500, 500, 'explosion') for _ in range(30))
+                particles.extend(LegacyParticle(500, 500, 'smoke') for _ in range(15))
+            for particle in particles[:]:
+                particle.update()
+                if particle.life <= 0:
+                    particles.remove(particle)
+
+        pool = make(bb.ParticlePool, seed=1)
+
+        def pooled():
+            for _ in range(blasts):
+                pool.spawn(500, 500, 'explosion', 30)
+                pool.spawn(500, 500, 'smoke', 15)
+            pool.update()
+
+        old_ms = time_frames(legacy, frames)
+        new_ms = time_frames(pooled, frames)
+        print(f"  {blasts:2d} blasts/tick  objects {old_ms:7.3f} ms ({len(particles):5d} live)  "
+              f"pool {new_ms:6.3f} ms ({len(pool):4d} live, capped at {pool.EMIT_BUDGET}/tick)")
+
+
+@benchmark
+def bench_blood(bb, frames):
+    """Rampage blood: per-splat dicts decayed and drawn each frame vs the decal layer"""
+    import pygame
+    surface = pygame.Surface((bb.SCREEN_W, bb.SCREEN_H))
+    cam = [1000, 1000]
+    blood_col = bb.C['blood']
+    for kills in (1, 5, 20):
+        splats = []
+
+        def legacy():
+            for _ in range(kills):
+                x, y = cam[0] + random.uniform(0, bb.SCREEN_W), cam[1] + random.uniform(0, bb.SCREEN_H)
+                for _ in range(50):
+                    splats.append({'x': x + random.randint(-25, 25), 'y': y + random.randint(-25, 25),
+                                   'life': 180})
+            for b in splats[:]:
+                b['life'] -= 1
+                if b['life'] <= 0:
+                    splats.remove(b)
+            for b in splats:
+                pygame.draw.circle(surface, blood_col, (int(b['x'] - cam[0]), int(b['y'] - cam[1])),
+                                   max(2, b['life'] // 30))
+
+        layer = bb.BloodLayer()
+
+        def decals():
+            for _ in range(kills):
+                x, y = cam[0] + random.uniform(0, bb.SCREEN_W), cam[1] + random.uniform(0, bb.SCREEN_H)
+                for _ in range(50):
+                    layer.stamp(x + random.randint(-25, 25), y + random.randint(-25, 25))
+            layer.update()
+            layer.draw(surface, cam)
+
+        old_ms = time_frames(legacy, frames)
+        new_ms = time_frames(decals, frames)
+        print(f"  {kills:2d} kills/frame  dicts {old_ms:8.3f} ms ({len(splats):6d} splats)  "
+              f"layer {new_ms:6.3f} ms ({len(layer)} chunks)")
+
+
+@benchmark
+def bench_churn(bb, frames):
+    """Entity churn (a quarter die each frame): list copy + remove vs EntityList kill/compact"""
+    class Thing:
+        __slots__ = ('life',)
+
+        def __init__(self):
+            self.life = random.randint(1, 4)
+
+    for count in (500, 2000, 8000):
+        row = []
+        for label in ('list', 'entitylist'):
+            things = [] if label == 'list' else bb.EntityList()
+            things.extend(Thing() for _ in range(count))
+
+            def frame():
+                if label == 'list':
+                    for t in things[:]:
+                        t.life -= 1
+                        if t.life <= 0:
+                            things.remove(t)
+                else:
+                    things.compact()
+                    for t in things:
+                        t.life -= 1
+                        if t.life <= 0:
+                            things.kill(t)
+                # Respawn back up to the target count
+                things.extend(Thing() for _ in range(count - len(things)))
+
+            ms = time_frames(frame, max(10, frames // 10))
+            row.append(f"{label} {ms:8.3f} ms ({ms * 1e6 / count:6.0f} ns/entity)")
+        print(f"  {count:5d} entities  " + "  ".join(row))
+
+
+@benchmark
+def bench_world(bb, frames):
+    """Ground + building pass while panning: per-tile draw calls every frame vs baked chunks"""
+    import pygame
+    random.seed(1)
+    game = bb.Game()
+    surface = pygame.Surface((bb.SCREEN_W, bb.SCREEN_H))
+    span = bb.MAP_W * bb.TILE - bb.SCREEN_W
+    T = bb.TILE
+    for label in ('day', 'night'):
+        night = label == 'night'
+        game.time_of_day = 0 if night else game.day_length // 2
+
+        def legacy(i=[0]):
+            i[0] += 1
+            x, y = (i[0] * 7) % span, (i[0] * 3) % span
+            game.render_ground(surface, int(x // T) - 1, int(y // T) - 1,
+                               bb.SCREEN_W // T + 3, bb.SCREEN_H // T + 3)
+            game.render_buildings(surface, x, y, night)
+
+        def chunked(i=[0]):
+            i[0] += 1
+            x, y = (i[0] * 7) % span, (i[0] * 3) % span
+            c = bb.ChunkCache.SIZE
+            for cy in range(int(y // c), int((y + bb.SCREEN_H) // c) + 1):
+                for cx in range(int(x // c), int((x + bb.SCREEN_W) // c) + 1):
+                    surface.blit(game.chunks.get(('ground', cx, cy)), (cx * c - x, cy * c - y))
+                    layer = game.chunks.get(('buildings', cx, cy, night))
+                    if layer is not None:
+                        surface.blit(layer, (cx * c - x, cy * c - y))
+
+        old_ms = time_frames(legacy, frames)
+        game.chunks.clear()
+        game.chunks.hits = game.chunks.misses = 0
+        new_ms = time_frames(chunked, frames)
+        print(f"  {label:<5}  draw calls {old_ms:6.2f} ms/frame  chunks {new_ms:6.2f} ms/frame  "
+              f"({game.chunks.misses} chunk builds, {game.chunks.hits} hits, {len(game.chunks)} cached)")
+
+
+@benchmark
+def bench_buildings(bb, frames):
+    """Building chunk rebuilds across a day/night flip: per-building draw calls vs cached sprites"""
+    random.seed(1)
+    game = bb.Game()
+    keys = [('buildings', cx, cy, night) for night in (False, True)
+            for cy in range(bb.MAP_H // bb.ChunkCache.TILES + 1)
+            for cx in range(bb.MAP_W // bb.ChunkCache.TILES + 1)]
+
+    def rebuild(i=[0], cold=True):
+        if cold:
+            game.building_sprites.clear()
+        game.render_chunk(keys[i[0] % len(keys)])
+        i[0] += 1
+
+    old_ms = time_frames(rebuild, frames)
+    new_ms = time_frames(lambda: rebuild(cold=False), frames)
+    print(f"  per-building draws {old_ms:6.2f} ms/chunk  cached sprites {new_ms:6.2f} ms/chunk  "
+          f"({len(game.building_sprites)} sprites for {len(game.buildings)} buildings)")
+
+
+@benchmark
+def bench_characters(bb, frames):
+    """draw_world with a busy street on screen: per-limb draw calls vs cached character sprites"""
+    random.seed(1)
+    game = bb.Game()
+    random.seed(2)
+    game.civilians.extend(place_near(bb, game, bb.Civilian, 30, radius=500, w=35, h=55))
+    game.cops.extend(place_near(bb, game, bb.Cop, 10, radius=500))
+    game.gang_members.extend(place_near(bb, game, bb.GangMember, 30, radius=500, w=38, h=58))
+    game.reindex()
+    game.update(1 / 60)
+    new_ms = time_frames(game.draw_world, frames)
+    # Instance attributes shadow the cached draw_* methods with the raw render_* ones
+    game.draw_person = lambda x, y, *a, **kw: game.render_person(bb.screen, x, y, *a, **kw)
+    game.draw_cop_person = lambda x, y, **kw: game.render_cop_person(bb.screen, x, y, **kw)
+    game.draw_gang_member = lambda x, y, *a, **kw: game.render_gang_member(bb.screen, x, y, *a, **kw)
+    game.draw_player_character = lambda x, y, **kw: game.render_player_character(bb.screen, x, y, **kw)
+    old_ms = time_frames(game.draw_world, frames)
+    print(f"  draw calls {old_ms:6.2f} ms/frame  sprites {new_ms:6.2f} ms/frame  "
+          f"({len(game.sprites)} sprites cached)")
+
+
+@benchmark
+def bench_text(bb, frames):
+    """A frame's worth of HUD labels, a ticking cash counter and 20 kill messages: font.render vs the text cache"""
+    C = bb.C
+    labels = [('main', "RICO", C['purple']), ('small', "PISTOL", C['white']), ('small', "CREW: 3", C['pink']),
+              ('small', "100/100", C['white']), ('tiny', "Press TAB for missions", (100, 100, 100)),
+              ('tiny', "WASD=Move | Click=Shoot | Space=Melee | E=Enter | TAB=Missions", (80, 80, 80))]
+    labels += [('main', random.choice(("+$250", "HEADSHOT", "WASTED", "+50 HP")), C['gold']) for _ in range(20)]
+    tick = [0]
+
+    def frame(F):
+        tick[0] += 1
+        F['main'].render(f"${tick[0] * 7:,}", True, C['gold'])
+        for font, text, color in labels:
+            F[font].render(text, True, color)
+
+    raw = {k: f.font for k, f in bb.F.items()}
+    old_ms = time_frames(lambda: frame(raw), frames)
+    bb.TEXT.clear()
+    bb.TEXT.hits = bb.TEXT.misses = 0
+    new_ms = time_frames(lambda: frame(bb.F), frames)
+    print(f"  font.render {old_ms:6.3f} ms/frame  cached {new_ms:6.3f} ms/frame  "
+          f"({len(bb.TEXT)} strings cached, {bb.TEXT.hits} hits, {bb.TEXT.misses} misses)")
+
+
+@benchmark
+def bench_hud(bb, frames):
+    """Top bar and mission panel: every widget redrawn each frame vs only the ones whose value changed"""
+    random.seed(1)
+    game = bb.Game()
+    p = game.player
+    if game.available_missions:
+        game.start_mission(game.available_missions[0])
+    widgets = list(game.hud_widgets.values()) + [game.mission_widget]
+    tick = [0]
+
+    def hud(force):
+        tick[0] += 1
+        if tick[0] % 30 == 0:
+            p.cash += 50  # a sale every half second
+        if force:
+            for w in widgets:
+                w.value = w.STALE
+        game.draw_hud()
+
+    for label, force in (('every frame', True), ('dirty only', False)):
+        game.hud_redraws = 0
+        ms = time_frames(lambda: hud(force), frames)
+        print(f"  {label:<12} {ms:6.2f} ms/frame  ({game.hud_redraws / frames:.2f} widget redraws/frame)")
+
+
+def legacy_minimap(bb, game):
+    """The original minimap: every building, dealer and cop transformed each frame"""
+    import pygame
+    screen, C, p = bb.screen, bb.C, game.player
+    map_size = 130
+    map_x, map_y = bb.SCREEN_W - map_size - 15, bb.SCREEN_H - map_size - 40
+    pygame.draw.rect(screen, (20, 25, 35), (map_x - 3, map_y - 3, map_size + 6, map_size + 6))
+    pygame.draw.rect(screen, (35, 45, 60), (map_x, map_y, map_size, map_size))
+    pygame.draw.rect(screen, (55, 65, 85), (map_x, map_y, map_size, map_size), 2)
+    scale = map_size / 800
+    for b in game.buildings:
+        bx = map_x + map_size//2 + int((b.x - p.x) * scale)
+        by = map_y + map_size//2 + int((b.y - p.y) * scale)
+        if map_x < bx < map_x + map_size - 2 and map_y < by < map_y + map_size - 2:
+            pygame.draw.rect(screen, (70, 75, 90), (bx, by, 3, 3))
+    for dealer in game.drug_dealers:
+        dx = map_x + map_size//2 + int((dealer.x - p.x) * scale)
+        dy = map_y + map_size//2 + int((dealer.y - p.y) * scale)
+        if map_x + 2 < dx < map_x + map_size - 2 and map_y + 2 < dy < map_y + map_size - 2:
+            pygame.draw.circle(screen, C['green'], (dx, dy), 3)
+    for cop in game.cops:
+        cx = map_x + map_size//2 + int((cop.x - p.x) * scale)
+        cy = map_y + map_size//2 + int((cop.y - p.y) * scale)
+        if map_x < cx < map_x + map_size and map_y < cy < map_y + map_size:
+            pygame.draw.circle(screen, C['cop'], (cx, cy), 2)
+    pygame.draw.circle(screen, C['gold'], (map_x + map_size//2, map_y + map_size//2), 3)
+
+
+@benchmark
+def bench_minimap(bb, frames):
+    """Minimap with 40 cops about: per-building transform every frame vs the baked map"""
+    random.seed(1)
+    game = bb.Game()
+    random.seed(2)
+    game.cops.extend(scatter(bb, game, bb.Cop, 40, 40, 60))
+    game.reindex()
+    old_ms = time_frames(lambda: legacy_minimap(bb, game), frames)
+    new_ms = time_frames(game.draw_minimap, frames)
+    print(f"  per-building {old_ms:6.3f} ms/frame  baked {new_ms:6.3f} ms/frame  "
+          f"({len(game.buildings)} buildings)")
+
+
+@benchmark
+def bench_lighting(bb, frames):
+    """Night tint: a fresh SRCALPHA overlay every frame vs the MULT/ADD compositor, plus the light map"""
+    import pygame
+    random.seed(1)
+    game = bb.Game()
+    game.time_of_day = 0
+    surface = pygame.Surface((bb.SCREEN_W, bb.SCREEN_H))
+
+    def overlay():
+        tint = pygame.Surface((bb.SCREEN_W, bb.SCREEN_H), pygame.SRCALPHA)
+        tint.fill((0, 0, 50, 80))
+        surface.blit(tint, (0, 0))
+
+    def lightmap(i=[0]):
+        i[0] += 1
+        game.camera = [game.player.x - bb.SCREEN_W // 2 + i[0] % 200, game.player.y - bb.SCREEN_H // 2]
+        game.lighting.apply(surface, (0, 0, 50), 80, game.visible_lights())
+
+    old_ms = time_frames(overlay, frames)
+    new_ms = time_frames(lambda: game.lighting.apply(surface, (0, 0, 50), 80), frames)
+    lit_ms = time_frames(lightmap, frames)
+    print(f"  alpha overlay {old_ms:6.2f} ms/frame  mult/add {new_ms:6.2f} ms/frame  "
+          f"light map while panning {lit_ms:6.2f} ms/frame")
+
+
+def legacy_vehicle(bb, surface, x, y, w, h, angle, color, windshield=True):
+    """The original per-frame rotated polygons for one car body"""
+    import pygame
+    cos_a, sin_a = math.cos(angle), math.sin(angle)
+    hw, hh = w // 2, h // 2
+    points = [(x + cos_a * hw * fx - sin_a * hh * fy, y + sin_a * hw * fx + cos_a * hh * fy)
+              for fx, fy in ((1, 1), (-1, 1), (-1, -1), (1, -1))]
+    pygame.draw.polygon(surface, color, points)
+    pygame.draw.polygon(surface, (0, 0, 0), points, 2)
+    if windshield:
+        ws = [(x + cos_a * hw * fx - sin_a * hh * fy, y + sin_a * hw * fx + cos_a * hh * fy)
+              for fx, fy in ((0.4, 0.6), (0.4, -0.6), (0.1, -0.6), (0.1, 0.6))]
+        pygame.draw.polygon(surface, (100, 150, 200), ws)
+
+
+@benchmark
+def bench_vehicles(bb, frames):
+    """30 cars and 10 police cars turning on screen: rotated polygons vs cached angle sprites"""
+    import pygame
+    random.seed(1)
+    game = bb.Game()
+    surface = pygame.Surface((bb.SCREEN_W, bb.SCREEN_H))
+    cars = [(random.uniform(50, bb.SCREEN_W - 50), random.uniform(50, bb.SCREEN_H - 50),
+             random.choice(list(bb.Vehicle.TYPES.values()))) for _ in range(30)]
+    police = [(random.uniform(50, bb.SCREEN_W - 50), random.uniform(50, bb.SCREEN_H - 50)) for _ in range(10)]
+    tick = [0]
+
+    def legacy():
+        tick[0] += 1
+        for i, (x, y, t) in enumerate(cars):
+            legacy_vehicle(bb, surface, x, y, t['w'], t['h'], i + tick[0] * 0.02, bb.C[t['color']])
+        for i, (x, y) in enumerate(police):
+            legacy_vehicle(bb, surface, x, y, 90, 50, i + tick[0] * 0.02, bb.C['cop'], windshield=False)
+            pygame.draw.circle(surface, bb.C['red'] if tick[0] // 10 % 2 else bb.C['cop'], (int(x), int(y - 5)), 8)
+
+    def cached():
+        tick[0] += 1
+        for i, (x, y, t) in enumerate(cars):
+            sprite = game.vehicle_sprite(('car', t['w'], t['h'], bb.C[t['color']]), i + tick[0] * 0.02, 1, 1, False)
+            surface.blit(sprite, (x - sprite.get_width() // 2, y - sprite.get_height() // 2))
+        for i, (x, y) in enumerate(police):
+            sprite = game.vehicle_sprite(('police', tick[0] // 10 % 2), i + tick[0] * 0.02, 1, 1, False)
+            surface.blit(sprite, (x - sprite.get_width() // 2, y - sprite.get_height() // 2))
+
+    old_ms = time_frames(legacy, frames)
+    new_ms = time_frames(cached, frames)
+    warm_ms = time_frames(cached, frames)
+    print(f"  polygons {old_ms:6.2f} ms/frame  sprites {new_ms:6.2f} ms/frame, {warm_ms:.2f} once warm  "
+          f"({len(game.vehicle_sprites)} sprites cached, {game.vehicle_sprites.misses} built)")
+
+
+@benchmark
+def bench_culling(bb, frames):
+    """World pass as the off-screen population grows: full-list bounds checks vs spatial index queries"""
+    random.seed(1)
+    game = bb.Game()
+    p = game.player
+    game.camera = [p.x - bb.SCREEN_W // 2, p.y - bb.SCREEN_H // 2]
+    kinds = (('cop', game.cops), ('gang', game.gang_members), ('vehicle', game.vehicles))
+
+    def legacy():
+        cam = game.camera
+        for _, group in kinds:
+            for obj in group:
+                x, y = obj.x - cam[0], obj.y - cam[1]
+                if x < -100 or x > bb.SCREEN_W + 100 or y < -100 or y > bb.SCREEN_H + 100:
+                    continue
+        for prop in game.props:
+            x, y = prop['x'] - cam[0], prop['y'] - cam[1]
+            if x < -60 or x > bb.SCREEN_W + 60 or y < -60 or y > bb.SCREEN_H + 60:
+                continue
+
+    def indexed():
+        for kind, _ in kinds:
+            game.visible(kind, 100)
+        game.visible('prop', 60)
+
+    last = 1
+    for scale in (1, 4, 16):
+        grow, last = scale - last, scale
+        if grow:
+            game.cops.extend(scatter(bb, game, bb.Cop, 8 * grow, 40, 60))
+            game.gang_members.extend(scatter(bb, game, lambda x, y: make(bb.GangMember, x, y, 'red', rng=random), 24 * grow, 38, 58))
+            game.vehicles.extend(scatter(bb, game, bb.Vehicle, 15 * grow, 100, 60))
+            game.props.extend(scatter(bb, game, lambda x, y: {'x': x, 'y': y, 'type': 'trashcan'}, 60 * grow, 30, 30))
+            game.reindex()
+            game.index_scenery()
+        old_ms = time_frames(legacy, frames)
+        new_ms = time_frames(indexed, frames)
+        draw_ms = time_frames(game.draw_world, frames)
+        print(f"  x{scale:<3} {len(game.cops) + len(game.gang_members) + len(game.vehicles):5d} NPCs  "
+              f"full scan {old_ms:6.3f} ms  index {new_ms:6.3f} ms  draw_world {draw_ms:6.2f} ms/frame")
+
+
+def wall_between(bb, game):
+    """A building tile with open ground on both sides, away from the map edge"""
+    occ = game.occupancy
+    for rect in game.buildings:
+        tx, ty = rect.x // bb.TILE, rect.y // bb.TILE
+        if not (4 <= tx < bb.MAP_W - 4 and 6 <= ty < bb.MAP_H - 6):
+            continue
+        around = [(x, y) for x in range(tx - 2, tx + 3) for y in range(ty - 5, ty + 6)
+                  if (x, y) != (tx, ty)]
+        if not any(occ.solid(x, y) for x, y in around):
+            return tx, ty
+    raise RuntimeError("no free-standing building on this map")
+
+
+@benchmark
+def bench_pursuit(bb, frames):
+    """30 alerted cops at 5 stars behind a building: straight-line chase vs flow field"""
+    T = bb.TILE
+    for label in ('straight', 'flow'):
+        random.seed(1)
+        game = bb.Game()
+        tx, ty = wall_between(bb, game)
+        p = game.player
+        p.x, p.y = tx * T + 12, (ty + 2) * T  # right behind the building
+        p.wanted, p.armor = 5, 100  # armor soaks every hit so the chase keeps going
+        random.seed(2)
+        game.cops.clear()
+        for i in range(30):
+            # Lined up on the far side, facing the wall
+            cop = make(bb.Cop, tx * T + random.uniform(-40, 60), (ty - 3) * T - random.uniform(0, 120), rng=random)
+            cop.alert = True
+            game.cops.append(cop)
+        game.reindex()
+        if label == 'straight':
+            game.flow.step_toward = lambda x, y: None
+        ms = time_frames(lambda: game.update(1 / 60), frames)
+        dists = sorted(math.hypot(c.x - p.x, c.y - p.y) for c in game.cops)
+        caught = sum(d < 120 for d in dists)
+        print(f"  {label:<8} {ms:6.3f} ms/frame  {caught:2d}/{len(dists)} cops reached the player, "
+              f"median distance {dists[len(dists) // 2]:4.0f} px")
+    start = time.perf_counter()
+    for i in range(100):
+        game.flow.update(p.x + (i % 10 + 1) * T, p.y + (i // 10) * T)
+    print(f"  field rebuild {(time.perf_counter() - start) * 10:.3f} ms "
+          f"(once per player tile change, shared by every chaser)")
+
+
+# Scenarios play a whole canned situation tick by tick, the way the game does,
+# and break each frame down by subsystem. Unlike the benchmarks above they only
+# call what every script version has, so the variants can be compared.
+
+SCENARIOS = {}
+
+# Subsystem -> the methods whose time it adds up. Scripts that do not have a
+# method just don't report it.
+PHASES = {
+    'npc_ai': ('update_cops', 'update_civilians', 'update_gangs', 'update_police_cars'),
+    'bullets': ('update_bullets',),
+    'rockets': ('update_rockets',),
+    'particles': ('particles.update',),
+    'draw_world': ('draw_world',),
+    'draw_hud': ('draw_hud',),
+}
+BIG_MAPS = {'bigcity': 253}  # scenarios on a bigger map: tiles a side, 10x the 80x80 area
+
+
+class Unsupported(Exception):
+    """A scenario needs something this script version does not have"""
+
+
+def scenario(fn):
+    """Register a scenario_* setup function under its short name"""
+    SCENARIOS[fn.__name__[len('scenario_'):]] = fn
+    return fn
+
+
+def need(obj, *names):
+    """Raise Unsupported unless obj has every one of names"""
+    for name in names:
+        if not hasattr(obj, name):
+            raise Unsupported(f"no {name}")
+
+
+def instrument(bb, game):
+    """Wrap this game's phase methods; returns take() and the phases found
+
+    take() hands back the seconds spent in each phase since it was last called.
+    Scripts with the F3 profiler are timed by its own wrappers, older ones by
+    the same kind of wrapper made here.
+    """
+    phase_of = {path: phase for phase, paths in PHASES.items() for path in paths}
+    found = []
+    phase_by_label = {}
+    if hasattr(bb, 'Profiler'):
+        profiler = bb.Profiler()
+        path_of = {label: path for label, path, _ in profiler.PHASES}
+        for label, obj, name in profiler.owners(game):
+            phase = phase_of.get(path_of[label])
+            if phase:
+                setattr(obj, name, profiler.timed(label, getattr(obj, name)))
+                phase_by_label[label] = phase
+        events = profiler.events
+    else:
+        events = []
+
+        def timed(label, fn):
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    events.append((label, start, time.perf_counter() - start))
+            return wrapper
+
+        for path, phase in phase_of.items():
+            *owners, name = path.split('.')
+            obj = game
+            for owner in owners:
+                obj = getattr(obj, owner, None)
+            fn = getattr(obj, name, None)
+            if callable(fn) and not isinstance(obj, list):
+                setattr(obj, name, timed(path, fn))
+                phase_by_label[path] = phase
+    found = [phase for phase in PHASES if phase in phase_by_label.values()]
+
+    def take():
+        spent = dict.fromkeys(found, 0.0)
+        for label, _, seconds in events:
+            spent[phase_by_label[label]] += seconds
+        events.clear()
+        return spent
+    return take, found
+
+
+def percentiles(samples):
+    """Mean, p50, p95 and p99 of a list of milliseconds"""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+    return {'mean': sum(ordered) / len(ordered), 'p50': pick(50), 'p95': pick(95), 'p99': pick(99)}
+
+
+@scenario
+def scenario_idle(bb, game):
+    """A fresh city with nobody wanted"""
+
+
+@scenario
+def scenario_chase(bb, game):
+    """A 5-star chase: 25 extra cops closing in and every police car on the player"""
+    p = game.player
+    random.seed(2)
+    for cop in place_near(bb, game, bb.Cop, 25, radius=900):
+        cop.alert = True
+        game.cops.append(cop)
+
+    def tick(i):
+        p.wanted = 5
+    return tick
+
+
+@scenario
+def scenario_barrage(bb, game):
+    """An RPG fired every 10 ticks, sweeping round the player"""
+    p = game.player
+    need(p, 'has_rpg')
+    p.has_rpg, p.current_weapon = True, 'rpg'
+
+    def tick(i):
+        if i % 10 == 0:
+            p.rockets, p.shoot_cooldown = 99, 0
+            game.shoot(i * 0.7)
+    return tick
+
+
+@scenario
+def scenario_gangwar(bb, game):
+    """300 members of the three gangs fighting around the player"""
+    need(bb, 'GangMember')
+    random.seed(2)
+    gangs = itertools.cycle(('red', 'blue', 'green'))
+    game.gang_members.clear()
+    game.gang_members.extend(place_near(bb, game, lambda x, y: make(bb.GangMember, x, y, next(gangs), rng=random), 300,
+                                        radius=1200, w=38, h=58))
+
+
+@scenario
+def scenario_bigcity(bb, game):
+    """A map 10x the area with 2000 civilians on it"""
+    random.seed(2)
+    game.civilians.extend(scatter(bb, game, bb.Civilian, 2000 - len(game.civilians), 35, 55))
+
+
+def run_scenario(bb, name, ticks, headless):
+    """Play one scenario; None if the script can't, else its population and per-phase stats"""
+    saved = bb.MAP_W, bb.MAP_H
+    try:
+        if name in BIG_MAPS:
+            bb.MAP_W = bb.MAP_H = BIG_MAPS[name]
+        random.seed(1)
+        try:
+            game = bb.Game(headless=True) if headless else bb.Game()
+        except TypeError:
+            game = bb.Game()  # older scripts always draw - headless just leaves it out
+        hook = SCENARIOS[name](bb, game)
+        if hasattr(game, 'reindex'):
+            game.reindex()
+        take, found = instrument(bb, game)
+        p = game.player
+        if hasattr(p, 'armor'):
+            p.armor = 100  # armor soaks every hit so the scenario keeps going
+        samples = {phase: [] for phase in ['frame', 'update'] + found}
+        for i in range(ticks):
+            take()  # drop anything timed between ticks
+            p.health = p.max_health  # and older scripts just heal
+            if hook:
+                hook(i)
+            start = time.perf_counter()
+            game.update(1 / 60)
+            updated = time.perf_counter()
+            if not headless:
+                game.draw_world()
+                game.draw_hud()
+            end = time.perf_counter()
+            spent = take()
+            samples['frame'].append((end - start) * 1000)
+            samples['update'].append((updated - start) * 1000)
+            for phase in found:
+                samples[phase].append(spent[phase] * 1000)
+        if headless:
+            samples = {k: v for k, v in samples.items() if k not in ('draw_world', 'draw_hud')}
+        population = {kind: len(getattr(game, kind)) for kind in
+                      ('cops', 'civilians', 'gang_members', 'police_cars', 'bullets', 'rockets')
+                      if hasattr(game, kind)}
+        return {'population': population,
+                'phases': {phase: percentiles(ms) for phase, ms in samples.items()}}
+    finally:
+        bb.MAP_W, bb.MAP_H = saved
+
+
+def git_commit():
+    """The checked-out commit, to tell saved results apart"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_scenarios(scripts, names, ticks, headless, json_path=None):
+    results = {'ticks': ticks, 'headless': headless, 'commit': git_commit(), 'scripts': {}}
+    for script in scripts:
+        label = os.path.basename(script)
+        bb = load_game(script)
+        print(f"== {label}")
+        results['scripts'][label] = runs = {}
+        for name in names:
+            print(f"[{name}] {SCENARIOS[name].__doc__}")
+            try:
+                runs[name] = run = run_scenario(bb, name, ticks, headless)
+            except Unsupported as e:
+                print(f"  skipped: {e}")
+                runs[name] = None
+                continue
+            print("  " + ", ".join(f"{n} {kind.replace('_', ' ')}" for kind, n in run['population'].items()))
+            print(f"  {'ms':<10} {'mean':>7} {'p50':>7} {'p95':>7} {'p99':>7}")
+            for phase, stats in run['phases'].items():
+                print(f"  {phase:<10} " + " ".join(f"{stats[k]:7.3f}" for k in ('mean', 'p50', 'p95', 'p99')))
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {json_path}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bloodbath performance benchmarks")
+    parser.add_argument('names', nargs='*', help="benchmarks (or scenarios) to run (default: all)")
+    parser.add_argument('--frames', type=int, default=300, help="frames per measurement")
+    parser.add_argument('--script', action='append',
+                        help="game script to load, repeat to compare versions (default: %s)"
+                        % os.path.basename(DEFAULT_SCRIPT))
+    parser.add_argument('--list', action='store_true', help="list benchmarks and scenarios and exit")
+    parser.add_argument('--scenarios', action='store_true', help="play canned scenarios instead of benchmarks")
+    parser.add_argument('--ticks', type=int, default=600, help="ticks per scenario")
+    parser.add_argument('--headless', action='store_true', help="scenarios simulate only, with no drawing")
+    parser.add_argument('--json', metavar='PATH', help="also write scenario results to PATH")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, fn in BENCHMARKS.items():
+            print(f"{name:<12} {fn.__doc__}")
+        for name, fn in SCENARIOS.items():
+            print(f"{name:<12} scenario: {fn.__doc__}")
+        return 0
+
+    registry = SCENARIOS if args.scenarios else BENCHMARKS
+    names = args.names or list(registry)
+    unknown = [n for n in names if n not in registry]
+    if unknown:
+        parser.error(f"unknown {'scenario' if args.scenarios else 'benchmark'}(s): {', '.join(unknown)}")
+    scripts = args.script or [DEFAULT_SCRIPT]
+
+    if args.scenarios:
+        run_scenarios(scripts, names, args.ticks, args.headless, args.json)
+        return 0
+
+    for script in scripts:
+        bb = load_game(script)
+        for name in names:
+            print(f"[{name}] {BENCHMARKS[name].__doc__}")
+            BENCHMARKS[name](bb, args.frames)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,15 +6,27 @@ Arrow keys or WASD to move, click to shoot, space to melee
 
 import pygame
 import sys
+import time
 import random
 import math
+import array
+import argparse
+import json
+import itertools
+import struct
+import collections
 
-pygame.init()
+try:
+    import numpy as np
+except ImportError:  # civilians fall back to plain objects
+    np = None
 
 SCREEN_W, SCREEN_H = 1280, 720
 TILE = 64
 MAP_W, MAP_H = 80, 80
-FPS = 60
+FPS = 60  # frame rate cap for drawing, 0 for uncapped
+TICK_RATE = 60  # simulation ticks per second, whatever the frame rate
+CROWD_STORE = np is not None  # simulate civilians as NumPy arrays when available
 
 C = {
     # Modern dark theme with vibrant accents
@@ -37,18 +49,117 @@ C = {
     'asphalt': (38, 38, 42), 'sidewalk': (75, 85, 99), 'grass': (34, 80, 34),
 }
 
-F = {
-    'main': pygame.font.SysFont("arial", 28, bold=True),
-    'big': pygame.font.SysFont("arial", 72, bold=True),
-    'small': pygame.font.SysFont("arial", 20),
-    'tiny': pygame.font.SysFont("arial", 16)
-}
+class TextCache:
+    """LRU cache of rendered text, keyed by (font, text, color, antialias)
+
+    Antialiased strings containing digits are put together from cached digit
+    glyphs and text runs, and only the most recent few of those are kept, so
+    counters that change every frame (cash, ammo, health) do not push the
+    static labels out of the cache.
+    """
+    CAPACITY = 512
+    NUMBERS = 32  # recent digit strings kept whole
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.surfaces = {}  # key -> Surface, oldest use first
+        self.numbers = {}
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def lookup(self, table, capacity, key, build):
+        if key in table:
+            self.hits += 1
+            surf = table.pop(key)  # re-insert to mark as most recently used
+        else:
+            self.misses += 1
+            surf = build(*key)
+            if len(table) >= capacity:
+                del table[next(iter(table))]
+        table[key] = surf
+        return surf
+
+    def render(self, font, text, antialias, color):
+        """A cached font.render() result; callers must not modify it"""
+        key = (font, text, tuple(color), antialias)
+        surfaces = self.surfaces
+        if key in surfaces:
+            self.hits += 1
+            surfaces[key] = surf = surfaces.pop(key)
+            return surf
+        if antialias and any(ch.isdigit() for ch in text):
+            return self.lookup(self.numbers, self.NUMBERS, key, self.compose)
+        return self.lookup(surfaces, self.capacity, key, self.build)
+
+    def build(self, font, text, color, antialias):
+        return font.render(text, antialias, color)
 
-screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
-pygame.display.set_caption("BLOODBATH RPG")
+    def compose(self, font, text, color, antialias):
+        """Blit single digits and the runs of text between them at their offsets in the string"""
+        pieces, start = [], 0
+        for i, ch in enumerate(text):
+            if ch.isdigit():
+                if start < i:
+                    pieces.append((start, text[start:i]))
+                pieces.append((i, ch))
+                start = i + 1
+        if start < len(text):
+            pieces.append((start, text[start:]))
+        surf = pygame.Surface(font.size(text), pygame.SRCALPHA)
+        for i, piece in pieces:
+            glyph = self.lookup(self.surfaces, self.capacity, (font, piece, color, antialias), self.build)
+            # MAX keeps the strongest coverage where neighbouring glyph edges touch
+            surf.blit(glyph, (font.size(text[:i])[0], 0), special_flags=pygame.BLEND_RGBA_MAX)
+        return surf
+
+    def clear(self):
+        self.surfaces.clear()
+        self.numbers.clear()
+
+
+class CachedFont:
+    """A pygame Font whose render() goes through a TextCache"""
+    def __init__(self, font, cache):
+        self.font = font
+        self.cache = cache
+
+    def render(self, text, antialias, color, background=None):
+        if background is not None:
+            return self.font.render(text, antialias, color, background)
+        return self.cache.render(self.font, text, antialias, color)
+
+    def __getattr__(self, name):
+        return getattr(self.font, name)
+
+
+TEXT = TextCache()
+F = {}  # filled by load_fonts() - the simulation never needs them
+screen = None  # the window, once open_display() has made it
 clock = pygame.time.Clock()
 
 
+def load_fonts():
+    pygame.font.init()
+    F.update({
+        'main': CachedFont(pygame.font.SysFont("arial", 28, bold=True), TEXT),
+        'big': CachedFont(pygame.font.SysFont("arial", 72, bold=True), TEXT),
+        'small': CachedFont(pygame.font.SysFont("arial", 20), TEXT),
+        'tiny': CachedFont(pygame.font.SysFont("arial", 16), TEXT)
+    })
+
+
+def open_display():
+    """Start pygame, open the game window and load fonts; returns the window surface"""
+    global screen
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+    pygame.display.set_caption("BLOODBATH RPG")
+    load_fonts()
+    return screen
+
+
 class Player:
     def __init__(self):
         self.x, self.y = 200, 200  # Spawn in open area
@@ -124,13 +235,13 @@ class Player:
 
 
 class Cop:
-    def __init__(self, x, y):
+    def __init__(self, x, y, *, rng):
         self.x, self.y = x, y
         self.w, self.h = 40, 60
         self.health = 80
         self.max_health = 80
         self.shoot_timer = 0
-        self.angle = random.random() * 6.28
+        self.angle = rng.random() * 6.28
         self.alert = False
     
     @property
@@ -143,16 +254,15 @@ class Cop:
 
 
 class Civilian:
-    def __init__(self, x, y):
+    # Clothing colors, a small fixed set so character sprites can be cached
+    PALETTE = [(r, g, b) for r in (150, 185, 220) for g in (130, 165, 200) for b in (120, 150, 180)]
+
+    def __init__(self, x, y, *, rng):
         self.x, self.y = x, y
         self.w, self.h = 35, 55
-        self.angle = random.random() * 6.28
-        self.move_timer = random.randint(60, 180)
-        self.color = (
-            random.randint(150, 220),
-            random.randint(130, 200),
-            random.randint(120, 180)
-        )
+        self.angle = rng.random() * 6.28
+        self.move_timer = rng.randint(60, 180)
+        self.color = rng.choice(self.PALETTE)
         self.scared = False
         self.scared_timer = 0
     
@@ -165,15 +275,182 @@ class Civilian:
         return (self.x + self.w//2, self.y + self.h//2)
 
 
+def _crowd_field(name, cast):
+    """Property that reads and writes one slot of a CrowdStore array"""
+    def get(self):
+        return cast(getattr(self.store, name)[self.slot])
+
+    def set(self, value):
+        getattr(self.store, name)[self.slot] = value
+    return property(get, set)
+
+
+class CrowdMember:
+    """Stand-in for a Civilian whose state lives in a CrowdStore"""
+    __slots__ = ('store', 'slot')
+    w, h = 35, 55
+
+    def __init__(self, store, slot):
+        self.store, self.slot = store, slot
+
+    x = _crowd_field('x', float)
+    y = _crowd_field('y', float)
+    angle = _crowd_field('angle', float)
+    move_timer = _crowd_field('move_timer', int)
+    scared = _crowd_field('scared', bool)
+    scared_timer = _crowd_field('scared_timer', int)
+
+    @property
+    def color(self):
+        return tuple(int(v) for v in self.store.color[self.slot])
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.x, self.y, self.w, self.h)
+
+    @property
+    def center(self):
+        return (self.x + self.w//2, self.y + self.h//2)
+
+
+class CrowdStore:
+    """Civilians as contiguous NumPy arrays, updated a whole crowd at a time
+
+    Acts as both the civilian list (append/remove/iterate/len) and its
+    spatial index (query_rect/query_radius/query_segment), so thousands of
+    pedestrians never go through per-object updates or re-hashing.
+    """
+    FIELDS = (('x', 'f8', ()), ('y', 'f8', ()), ('angle', 'f8', ()), ('move_timer', 'i4', ()),
+              ('scared', '?', ()), ('scared_timer', 'i4', ()), ('color', 'u1', (3,)))
+    W, H = CrowdMember.w, CrowdMember.h
+
+    def __init__(self, pad=0, capacity=64, *, rng):
+        self.pad = pad  # extra reach around each body for hit-box queries
+        self.rng = rng  # a NumPy Generator seeded from the game's crowd stream
+        self.n = 0
+        self.members = []  # slot -> CrowdMember
+        for name, dtype, shape in self.FIELDS:
+            setattr(self, name, np.zeros((capacity,) + shape, dtype))
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        return iter(self.members[:])
+
+    def grow(self):
+        for name, dtype, shape in self.FIELDS:
+            old = getattr(self, name)
+            new = np.zeros((len(old) * 2,) + shape, dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+    def append(self, civ):
+        """Copy a freshly spawned Civilian into the arrays"""
+        if self.n == len(self.x):
+            self.grow()
+        i = self.n
+        for name, _, _ in self.FIELDS:
+            getattr(self, name)[i] = getattr(civ, name)
+        self.members.append(CrowdMember(self, i))
+        self.n += 1
+
+    def extend(self, civs):
+        for civ in civs:
+            self.append(civ)
+
+    def remove(self, member):
+        if member.store is not self:
+            return  # already removed
+        i, last = member.slot, self.n - 1
+        # The removed member keeps a private copy of its row so callers
+        # can still read where it died
+        member.store, member.slot = CrowdRow(self, i), 0
+        if i != last:
+            for name, _, _ in self.FIELDS:
+                arr = getattr(self, name)
+                arr[i] = arr[last]
+            moved = self.members[last]
+            moved.slot = i
+            self.members[i] = moved
+        self.members.pop()
+        self.n -= 1
+
+    kill = remove  # no deferred removal needed - iteration copies the members
+
+    def insert(self, obj, x, y, w, h):
+        pass  # positions already live in the arrays
+
+    def query_rect(self, x, y, w, h):
+        """Members whose padded body touches the box (callers do the exact test)"""
+        n, pad = self.n, self.pad
+        xs, ys = self.x[:n], self.y[:n]
+        hit = ((xs - pad < x + w) & (xs + self.W + pad > x) &
+               (ys - pad < y + h) & (ys + self.H + pad > y))
+        members = self.members
+        return [members[i] for i in np.flatnonzero(hit)]
+
+    def query_radius(self, x, y, r):
+        return self.query_rect(x - r, y - r, r * 2, r * 2)
+
+    def query_segment(self, x0, y0, x1, y1):
+        return self.query_rect(min(x0, x1), min(y0, y1), abs(x1 - x0), abs(y1 - y0))
+
+    def update(self, player, occupancy):
+        """One tick of wandering and fleeing for the whole crowd"""
+        n = self.n
+        if not n:
+            return
+        x, y = self.x[:n], self.y[:n]
+        angle, move_timer = self.angle[:n], self.move_timer[:n]
+        scared, scared_timer = self.scared[:n], self.scared_timer[:n]
+        dx, dy = x - player.x, y - player.y
+        dist = np.hypot(dx, dy)
+        
+        # Scare civilians if shooting or wanted
+        if player.wanted >= 1:
+            near = dist < 300
+            scared |= near
+            scared_timer[near] = 180
+        
+        fleeing = scared & (scared_timer > 0)
+        scared_timer[fleeing] -= 1
+        walking = ~fleeing
+        scared[walking] = False
+        
+        # Random walking
+        move_timer[walking] -= 1
+        turn = walking & (move_timer <= 0)
+        turns = int(np.count_nonzero(turn))
+        if turns:
+            angle[turn] = self.rng.random(turns) * 6.28
+            move_timer[turn] = self.rng.integers(60, 181, turns)
+        
+        # Run away from player, or keep walking
+        d = dist + 0.1
+        nx = np.where(fleeing, x + dx / d * 4, x + np.cos(angle))
+        ny = np.where(fleeing, y + dy / d * 4, y + np.sin(angle))
+        free = ~occupancy.overlaps_many(nx, ny, self.W, self.H)
+        x[free] = nx[free]
+        y[free] = ny[free]
+
+
+class CrowdRow:
+    """One removed member's last row, in the shape CrowdMember reads (field[0])"""
+    __slots__ = tuple(name for name, _, _ in CrowdStore.FIELDS)
+
+    def __init__(self, store, i):
+        for name in self.__slots__:
+            setattr(self, name, [getattr(store, name)[i].tolist()])
+
+
 class Hoe:
-    def __init__(self, x, y):
+    PALETTE = [(r, g, b) for r in (200, 228, 255) for g in (50, 100, 150) for b in (150, 200, 255)]
+
+    def __init__(self, x, y, *, rng):
         self.x, self.y = x, y
         self.w, self.h = 30, 50
-        self.color = (
-            random.randint(200, 255),
-            random.randint(50, 150),
-            random.randint(150, 255)
-        )
+        self.color = rng.choice(self.PALETTE)
         self.income_timer = 0
     
     @property
@@ -192,9 +469,9 @@ class Bullet:
 
 
 class HealthPickup:
-    def __init__(self, x, y):
+    def __init__(self, x, y, *, rng):
         self.x, self.y = x, y
-        self.amount = random.randint(20, 40)
+        self.amount = rng.randint(20, 40)
         self.pulse = 0
     
     @property
@@ -203,15 +480,15 @@ class HealthPickup:
 
 
 class DrugDealer:
-    def __init__(self, x, y):
+    def __init__(self, x, y, *, rng):
         self.x, self.y = x, y
         self.w, self.h = 38, 58
         # Prices fluctuate
-        self.buy_price = random.randint(30, 60)   # Price to buy from dealer
-        self.sell_price = random.randint(80, 150)  # Price dealer pays you
-        self.stock = random.randint(5, 15)
-        self.wants = random.randint(3, 10)
-        self.cash = random.randint(200, 500)  # Dealer's cash for buying from player
+        self.buy_price = rng.randint(30, 60)   # Price to buy from dealer
+        self.sell_price = rng.randint(80, 150)  # Price dealer pays you
+        self.stock = rng.randint(5, 15)
+        self.wants = rng.randint(3, 10)
+        self.cash = rng.randint(200, 500)  # Dealer's cash for buying from player
         self.restock_timer = 0
     
     @property
@@ -230,7 +507,7 @@ class Vehicle:
         'truck': {'w': 100, 'h': 55, 'speed': 10, 'health': 250, 'color': 'car_black'},
     }
     
-    def __init__(self, x, y, vtype='car'):
+    def __init__(self, x, y, vtype='car', *, rng):
         self.x, self.y = x, y
         self.vtype = vtype
         stats = self.TYPES[vtype]
@@ -239,7 +516,7 @@ class Vehicle:
         self.health = stats['health']
         self.max_health = stats['health']
         self.color_key = stats['color']
-        self.angle = random.random() * 6.28
+        self.angle = rng.random() * 6.28
         self.velocity = 0
         self.occupied = False
         self.driver = None
@@ -254,7 +531,9 @@ class Vehicle:
 
 
 class GangMember:
-    def __init__(self, x, y, gang='red'):
+    RETARGET_TICKS = 15  # How often a member looks for a closer enemy
+
+    def __init__(self, x, y, gang='red', *, rng):
         self.x, self.y = x, y
         self.w, self.h = 38, 58
         self.health = 60
@@ -262,8 +541,9 @@ class GangMember:
         self.gang = gang  # 'red', 'blue', 'green'
         self.shoot_timer = 0
         self.target = None
+        self.retarget_timer = rng.randint(0, self.RETARGET_TICKS - 1)  # Staggered so searches spread out
         self.alert = False
-        self.patrol_angle = random.random() * 6.28
+        self.patrol_angle = rng.random() * 6.28
     
     @property
     def rect(self):
@@ -279,58 +559,177 @@ class GangMember:
         return colors.get(self.gang, C['gang_red'])
 
 
-class Particle:
-    """For visual effects like explosions, sparks, smoke"""
-    def __init__(self, x, y, ptype='spark'):
-        self.x, self.y = x, y
-        self.ptype = ptype
-        self.life = 30
-        
+class ParticlePool:
+    """Fixed-capacity particle system for explosions, sparks, smoke and shells
+
+    Particles live in parallel arrays (NumPy when available, the array
+    module otherwise), are integrated in one pass per tick and compacted by
+    swapping dead slots with live ones from the end. Emission is capped per
+    tick so RPG spam can't flood the pool.
+    """
+    CAPACITY = 4096
+    EMIT_BUDGET = 600  # new particles allowed per tick
+    TYPES = ('spark', 'smoke', 'explosion', 'shell')
+    GRAVITY = (0.3, -0.05, 0.3, 0.2)  # per type, added to vy each tick
+    GROWTH = (0.0, 0.3, 0.0, 0.0)  # per type, added to size each tick
+    LIFE = (30, 45, 25, 40)
+    PALETTE = (C['yellow'], (100, 100, 100), C['orange'], C['red'], C['gold'])
+    FIELDS = (('x', 'd'), ('y', 'd'), ('vx', 'd'), ('vy', 'd'), ('life', 'd'),
+              ('size', 'd'), ('color', 'B'), ('ptype', 'B'))
+
+    def __init__(self, capacity=CAPACITY, *, seed):
+        self.capacity = capacity
+        self.n = 0
+        self.budget = self.EMIT_BUDGET
+        for name, code in self.FIELDS:
+            if np is not None:
+                setattr(self, name, np.zeros(capacity, code))
+            else:
+                setattr(self, name, array.array(code, bytes(capacity * array.array(code).itemsize)))
+        if np is not None:
+            self.rng = np.random.default_rng(seed)
+            self.gravity = np.array(self.GRAVITY)
+            self.growth = np.array(self.GROWTH)
+        else:
+            self.rng = random.Random(seed)
+
+    def __len__(self):
+        return self.n
+
+    def spawn(self, x, y, ptype, count):
+        """Emit up to count particles of one type at (x, y)"""
+        count = min(count, self.budget, self.capacity - self.n)
+        if count <= 0:
+            return
+        self.budget -= count
+        kind = self.TYPES.index(ptype)
+        i, j = self.n, self.n + count
+        self.n = j
+        if np is None:
+            for k in range(i, j):
+                self.emit_one(k, x, y, kind)
+            return
+        rng = self.rng
+        self.x[i:j], self.y[i:j] = x, y
+        self.ptype[i:j] = kind
+        self.life[i:j] = self.LIFE[kind]
         if ptype == 'spark':
-            self.vx = random.uniform(-5, 5)
-            self.vy = random.uniform(-5, 5)
-            self.color = C['yellow']
-            self.size = random.randint(2, 4)
+            self.vx[i:j] = rng.uniform(-5, 5, count)
+            self.vy[i:j] = rng.uniform(-5, 5, count)
+            self.color[i:j] = 0
+            self.size[i:j] = rng.integers(2, 5, count)
         elif ptype == 'smoke':
-            self.vx = random.uniform(-1, 1)
-            self.vy = random.uniform(-3, -1)
-            self.color = (100, 100, 100)
-            self.size = random.randint(5, 12)
-            self.life = 45
+            self.vx[i:j] = rng.uniform(-1, 1, count)
+            self.vy[i:j] = rng.uniform(-3, -1, count)
+            self.color[i:j] = 1
+            self.size[i:j] = rng.integers(5, 13, count)
         elif ptype == 'explosion':
-            angle = random.random() * 6.28
-            speed = random.uniform(3, 10)
-            self.vx = math.cos(angle) * speed
-            self.vy = math.sin(angle) * speed
-            self.color = random.choice([C['yellow'], C['orange'], C['red']])
-            self.size = random.randint(4, 10)
-            self.life = 25
+            angle = rng.random(count) * 6.28
+            speed = rng.uniform(3, 10, count)
+            self.vx[i:j] = np.cos(angle) * speed
+            self.vy[i:j] = np.sin(angle) * speed
+            self.color[i:j] = rng.choice((0, 2, 3), count)
+            self.size[i:j] = rng.integers(4, 11, count)
         elif ptype == 'shell':
-            self.vx = random.uniform(-2, 2)
-            self.vy = random.uniform(-4, -1)
-            self.color = C['gold']
-            self.size = 3
-            self.life = 40
-    
+            self.vx[i:j] = rng.uniform(-2, 2, count)
+            self.vy[i:j] = rng.uniform(-4, -1, count)
+            self.color[i:j] = 4
+            self.size[i:j] = 3
+
+    def emit_one(self, k, x, y, kind):
+        """Pure-Python emission of one particle into slot k"""
+        ptype = self.TYPES[kind]
+        self.x[k], self.y[k] = x, y
+        self.ptype[k] = kind
+        self.life[k] = self.LIFE[kind]
+        if ptype == 'spark':
+            vx, vy = self.rng.uniform(-5, 5), self.rng.uniform(-5, 5)
+            color, size = 0, self.rng.randint(2, 4)
+        elif ptype == 'smoke':
+            vx, vy = self.rng.uniform(-1, 1), self.rng.uniform(-3, -1)
+            color, size = 1, self.rng.randint(5, 12)
+        elif ptype == 'explosion':
+            angle = self.rng.random() * 6.28
+            speed = self.rng.uniform(3, 10)
+            vx, vy = math.cos(angle) * speed, math.sin(angle) * speed
+            color, size = self.rng.choice((0, 2, 3)), self.rng.randint(4, 10)
+        else:
+            vx, vy = self.rng.uniform(-2, 2), self.rng.uniform(-4, -1)
+            color, size = 4, 3
+        self.vx[k], self.vy[k] = vx, vy
+        self.color[k], self.size[k] = color, size
+
     def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        if self.ptype == 'smoke':
-            self.vy -= 0.05  # Rise up
-            self.size += 0.3
-        elif self.ptype in ['spark', 'explosion']:
-            self.vy += 0.3  # Gravity
-        elif self.ptype == 'shell':
-            self.vy += 0.2
-        self.life -= 1
+        """Integrate every live particle and drop the ones that expired"""
+        self.budget = self.EMIT_BUDGET
+        n = self.n
+        if not n:
+            return
+        if np is None:
+            self.update_slow()
+            return
+        kind = self.ptype[:n]
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.vy[:n] += self.gravity[kind]
+        self.size[:n] += self.growth[kind]
+        life = self.life[:n]
+        life -= 1
+        dead = np.flatnonzero(life <= 0)
+        if not len(dead):
+            return
+        # Swap-remove: holes below the new end take live particles from above it
+        keep = n - len(dead)
+        holes = dead[dead < keep]
+        movers = np.flatnonzero(life[keep:] > 0) + keep
+        for name, _ in self.FIELDS:
+            arr = getattr(self, name)
+            arr[holes] = arr[movers]
+        self.n = keep
+
+    def update_slow(self):
+        gravity, growth = self.GRAVITY, self.GROWTH
+        x, y, vx, vy, life, size, kind = (self.x, self.y, self.vx, self.vy,
+                                          self.life, self.size, self.ptype)
+        i = 0
+        while i < self.n:
+            x[i] += vx[i]
+            y[i] += vy[i]
+            vy[i] += gravity[kind[i]]
+            size[i] += growth[kind[i]]
+            life[i] -= 1
+            if life[i] > 0:
+                i += 1
+                continue
+            # Swap the last particle into this slot - it hasn't moved yet
+            # this tick, so go round again without advancing
+            last = self.n - 1
+            if i != last:
+                for name, _ in self.FIELDS:
+                    arr = getattr(self, name)
+                    arr[i] = arr[last]
+            self.n = last
+
+    def visible(self, left, top, right, bottom):
+        """(x, y, ptype, size, color) for particles inside the given box"""
+        n = self.n
+        if np is None:
+            idx = [i for i in range(n) if left <= self.x[i] <= right and top <= self.y[i] <= bottom]
+        else:
+            xs, ys = self.x[:n], self.y[:n]
+            idx = np.flatnonzero((xs >= left) & (xs <= right) & (ys >= top) & (ys <= bottom))
+        types, palette = self.TYPES, self.PALETTE
+        return [(float(self.x[i]), float(self.y[i]), types[self.ptype[i]],
+                 float(self.size[i]), palette[self.color[i]]) for i in idx]
+
 
 
 class Mission:
     TYPES = ['kill_cops', 'earn_money', 'sell_drugs', 'survive', 'recruit_hoes', 
              'kill_gangs', 'steal_vehicles', 'destroy_vehicles', 'rampage']
     
-    def __init__(self, mission_type=None, difficulty=1):
-        self.type = mission_type or random.choice(self.TYPES)
+    def __init__(self, mission_type, difficulty=1):
+        self.type = mission_type
         self.difficulty = difficulty
         self.active = False
         self.complete = False
@@ -457,29 +856,985 @@ class Mission:
         return f"{self.progress} / {self.target}"
 
 
-class Game:
+def grid_cells(x0, y0, x1, y1, cell):
+    """Cells a segment passes through, in order (Amanatides-Woo stepping)
+
+    Yields (cx, cy, t) where t in [0, 1] is how far along the segment it
+    enters that cell.
+    """
+    cx, cy = int(x0 // cell), int(y0 // cell)
+    ex, ey = int(x1 // cell), int(y1 // cell)
+    dx, dy = x1 - x0, y1 - y0
+    step_x = 1 if dx > 0 else -1
+    step_y = 1 if dy > 0 else -1
+    # t at the next vertical / horizontal cell boundary, and t per whole cell
+    if dx:
+        t_max_x = ((cx + (step_x > 0)) * cell - x0) / dx
+        t_delta_x = cell / abs(dx)
+    else:
+        t_max_x = t_delta_x = math.inf
+    if dy:
+        t_max_y = ((cy + (step_y > 0)) * cell - y0) / dy
+        t_delta_y = cell / abs(dy)
+    else:
+        t_max_y = t_delta_y = math.inf
+    t = 0.0
+    yield cx, cy, t
+    while cx != ex or cy != ey:
+        if t_max_x < t_max_y:
+            t = t_max_x
+            t_max_x += t_delta_x
+            cx += step_x
+        else:
+            t = t_max_y
+            t_max_y += t_delta_y
+            cy += step_y
+        if t > 1:  # float drift past the end cell
+            break
+        yield cx, cy, t
+
+
+def segment_box_t(x0, y0, dx, dy, left, top, right, bottom):
+    """Where along (x0, y0) + t*(dx, dy) the segment enters a box, or None
+
+    Slab test; returns 0 if the segment starts inside the box.
+    """
+    t0, t1 = 0.0, 1.0
+    for p, d, lo, hi in ((x0, dx, left, right), (y0, dy, top, bottom)):
+        if d == 0:
+            if p <= lo or p >= hi:
+                return None
+            continue
+        ta, tb = (lo - p) / d, (hi - p) / d
+        if ta > tb:
+            ta, tb = tb, ta
+        if ta > t0:
+            t0 = ta
+        if tb < t1:
+            t1 = tb
+        if t0 > t1:
+            return None
+    return t0
+
+
+class EntityList(list):
+    """List of live game objects with deferred, swap-pop removal
+
+    kill() only marks an entity. Iteration walks the entries present when
+    it started and skips killed ones, so killing mid-loop is safe without
+    copying the list, and len() counts only the living. compact() drops
+    the dead once per tick by swapping the last entry into each hole.
+    Entities come in through append/extend and leave through kill/clear,
+    which keep track of what is in the list, so killing something that is
+    not (or no longer) in it does nothing.
+    """
+    def __init__(self, items=()):
+        super().__init__(items)
+        self.members = set(map(id, list.__iter__(self)))  # id() of every entry
+        self.dead = set()  # id() of killed entries still in the list
+
+    def append(self, obj):
+        list.append(self, obj)
+        self.members.add(id(obj))
+
+    def extend(self, objs):
+        start = list.__len__(self)
+        list.extend(self, objs)
+        self.members.update(map(id, list.__getitem__(self, slice(start, None))))
+
+    def kill(self, obj):
+        key = id(obj)
+        if key in self.members:
+            self.dead.add(key)
+
+    def alive(self, obj):
+        return id(obj) not in self.dead
+
+    def __iter__(self):
+        dead = self.dead
+        for obj in itertools.islice(list.__iter__(self), list.__len__(self)):
+            if id(obj) not in dead:
+                yield obj
+
+    def __len__(self):
+        return list.__len__(self) - len(self.dead)
+
+    def clear(self):
+        super().clear()
+        self.members.clear()
+        self.dead.clear()
+
+    def compact(self):
+        dead = self.dead
+        if not dead:
+            return
+        i = 0
+        while i < list.__len__(self):
+            if id(list.__getitem__(self, i)) in dead:
+                last = list.pop(self)
+                if i < list.__len__(self):
+                    list.__setitem__(self, i, last)
+            else:
+                i += 1
+        self.members -= dead
+        dead.clear()
+
+
+class BloodLayer:
+    """Blood decals stamped once into chunked map-space surfaces
+
+    Each chunk fades by subtracting alpha every FADE_TICKS, counted from
+    its first splat so chunks don't all fade on the same tick. A splat can
+    land just before or just after one of its chunk's fades, so it takes one
+    fade more than LIFE needs and lasts between LIFE and LIFE + FADE_TICKS.
+    A chunk is dropped once everything on it has faded, and at most
+    MAX_CHUNKS are kept, so cost and memory don't grow with the body count.
+    """
+    CHUNK = 256
+    LIFE = 180  # ticks a fresh splat stays visible at least
+    FADE_TICKS = 30
+    MAX_CHUNKS = 48
+    RADIUS = 6
+
+    def __init__(self):
+        self.tick = 0
+        self.fade_step = math.ceil(255 / (self.LIFE // self.FADE_TICKS + 1))
+        self.chunks = {}  # (cx, cy) -> [surface, first_tick, last_stamp_tick]
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def stamp(self, x, y):
+        """Paint one splat, splitting it across chunk borders if needed"""
+        c, r = self.CHUNK, self.RADIUS
+        for cy in range(int((y - r) // c), int((y + r) // c) + 1):
+            for cx in range(int((x - r) // c), int((x + r) // c) + 1):
+                chunk = self.chunks.get((cx, cy))
+                if chunk is None:
+                    if len(self.chunks) >= self.MAX_CHUNKS:
+                        # Evict the chunk that was bled on longest ago
+                        oldest = min(self.chunks, key=lambda k: self.chunks[k][2])
+                        del self.chunks[oldest]
+                    surf = pygame.Surface((c, c), pygame.SRCALPHA)
+                    chunk = self.chunks[(cx, cy)] = [surf, self.tick, self.tick]
+                chunk[2] = self.tick
+                pygame.draw.circle(chunk[0], C['blood'], (int(x - cx * c), int(y - cy * c)), r)
+
+    def update(self):
+        self.tick += 1
+        for key, (surf, first, last) in list(self.chunks.items()):
+            if self.tick - last > self.LIFE + self.FADE_TICKS:
+                del self.chunks[key]
+            elif (self.tick - first) % self.FADE_TICKS == 0:
+                surf.fill((0, 0, 0, self.fade_step), special_flags=pygame.BLEND_RGBA_SUB)
+
+    def draw(self, surface, cam):
+        c = self.CHUNK
+        for cy in range(int(cam[1] // c), int((cam[1] + SCREEN_H) // c) + 1):
+            for cx in range(int(cam[0] // c), int((cam[0] + SCREEN_W) // c) + 1):
+                chunk = self.chunks.get((cx, cy))
+                if chunk:
+                    surface.blit(chunk[0], (cx * c - cam[0], cy * c - cam[1]))
+
+
+class ChunkCache:
+    """LRU cache of pre-rendered map chunks or sprites, built on first use
+
+    build(key) returns a Surface, or None for a chunk with nothing on it.
+    """
+    TILES = 8  # chunk edge in tiles
+    SIZE = TILES * TILE
+    CAPACITY = 40
+
+    def __init__(self, build, capacity=CAPACITY):
+        self.build = build
+        self.capacity = capacity
+        self.surfaces = {}  # key -> Surface or None, oldest use first
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def get(self, key):
+        surfaces = self.surfaces
+        if key in surfaces:
+            self.hits += 1
+            surf = surfaces.pop(key)  # re-insert to mark as most recently used
+        else:
+            self.misses += 1
+            surf = self.build(key)
+            if len(surfaces) >= self.capacity:
+                del surfaces[next(iter(surfaces))]
+        surfaces[key] = surf
+        return surf
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+class HudWidget:
+    """One region of a cached HUD or room surface, redrawn only when the value it shows changes
+
+    draw(surface, value) paints the widget in the surface's own coordinates;
+    the region is first restored from a background surface of the same size.
+    HUD surfaces hold premultiplied alpha so translucent layers composite the
+    same as drawing them straight onto the screen: opaque draw calls work as
+    usual, anything with alpha goes through HudWidget.blit.
+    """
+    STALE = object()  # never equal to a real value, so the first update draws
+
+    @staticmethod
+    def blit(surface, source, pos):
+        # copy() first: premul_alpha() misreads surfaces with padded rows, which font renders have
+        surface.blit(source.copy().premul_alpha(), pos, special_flags=pygame.BLEND_PREMULTIPLIED)
+
+    def __init__(self, rect, draw):
+        self.rect = pygame.Rect(rect)
+        self.draw = draw
+        self.value = self.STALE
+
+    def update(self, surface, background, value):
+        """Redraw if value changed since the last call; returns whether it did"""
+        if value == self.value:
+            return False
+        r = self.rect
+        surface.fill((0, 0, 0, 0), r)
+        surface.blit(background, r, r, special_flags=pygame.BLEND_RGBA_MAX)  # exact copy
+        surface.set_clip(r)
+        self.draw(surface, value)
+        surface.set_clip(None)
+        self.value = value
+        return True
+
+
+class Lighting:
+    """Full-screen tint for the day/night cycle and the damage flash
+
+    Blending a color at some alpha over the frame is the same as scaling the
+    frame by (255 - alpha) and adding color * alpha. Two opaque layers hold
+    those, refilled only when the tint (or the set of lights) changes, and
+    are blitted with BLEND_RGB_MULT and BLEND_RGB_ADD - both far cheaper
+    than blitting a per-pixel alpha surface. Lights punch untinted holes,
+    kept inside lit_area so they never reach the HUD.
+    """
+    def __init__(self, size, lit_area=None):
+        self.shade = pygame.Surface(size)  # multiplied in
+        self.glow = pygame.Surface(size)  # added on top
+        self.lit_area = lit_area
+        self.tint = None  # (color, alpha, lights) the layers currently hold
+
+    def apply(self, surface, color, alpha, lights=()):
+        """Tint surface, leaving lights untouched: (x, y, radius) circles or (x, y, w, h) rects"""
+        if (color, alpha, lights) != self.tint:
+            k = 255 - alpha
+            shade, glow = self.shade, self.glow
+            shade.set_clip(None)
+            glow.set_clip(None)
+            shade.fill((k, k, k))
+            glow.fill(tuple(c * alpha // 255 for c in color))
+            shade.set_clip(self.lit_area)
+            glow.set_clip(self.lit_area)
+            for light in lights:
+                if len(light) == 3:
+                    pygame.draw.circle(shade, (255, 255, 255), light[:2], light[2])
+                    pygame.draw.circle(glow, (0, 0, 0), light[:2], light[2])
+                else:
+                    shade.fill((255, 255, 255), light)
+                    glow.fill((0, 0, 0), light)
+            self.tint = (color, alpha, lights)
+        surface.blit(self.shade, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+        surface.blit(self.glow, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+
+
+class Interpolator:
+    """Draw positions between the last two fixed simulation ticks
+
+    capture() records where everything stood before a tick. apply(alpha)
+    moves whatever is still around part of the way from there to where the
+    tick left it, and restore() puts the simulated positions back once the
+    frame is drawn. Objects spawned during the tick are drawn where they are.
+    """
+    SNAP = TILE  # further than this in one tick is a teleport, not movement
+
+    def __init__(self):
+        self.objects = []  # (obj, x, y) for anything with x/y attributes
+        self.dicts = []  # (dict, x, y) for police cars and rockets
+        self.crowd = None  # (store, members, x, y) - a NumPy crowd moves as arrays
+        self.camera = None  # (camera list, x, y)
+        self.saved = None
+
+    def capture(self, objects, dicts=(), crowd=None, camera=None):
+        self.objects = [(obj, obj.x, obj.y) for obj in objects]
+        self.dicts = [(d, d['x'], d['y']) for d in dicts]
+        self.crowd = None
+        if crowd is not None:
+            n = crowd.n
+            self.crowd = (crowd, list(crowd.members), crowd.x[:n].copy(), crowd.y[:n].copy())
+        self.camera = (camera, camera[0], camera[1]) if camera is not None else None
+
+    def apply(self, alpha):
+        snap = self.SNAP
+        objects, dicts = [], []
+        for obj, x0, y0 in self.objects:
+            x, y = obj.x, obj.y
+            if abs(x - x0) < snap and abs(y - y0) < snap:
+                objects.append((obj, x, y))
+                obj.x, obj.y = x0 + (x - x0) * alpha, y0 + (y - y0) * alpha
+        for d, x0, y0 in self.dicts:
+            x, y = d['x'], d['y']
+            if abs(x - x0) < snap and abs(y - y0) < snap:
+                dicts.append((d, x, y))
+                d['x'], d['y'] = x0 + (x - x0) * alpha, y0 + (y - y0) * alpha
+        crowd = None
+        if self.crowd is not None:
+            store, members, x0, y0 = self.crowd
+            # Any death or spawn reshuffles the rows - those frames draw the tick as is
+            if store.members == members:
+                n = store.n
+                crowd = (store, store.x[:n].copy(), store.y[:n].copy())
+                store.x[:n] += (x0 - store.x[:n]) * (1 - alpha)
+                store.y[:n] += (y0 - store.y[:n]) * (1 - alpha)
+        camera = None
+        if self.camera is not None:
+            cam, x0, y0 = self.camera
+            camera = (cam, cam[0], cam[1])
+            cam[0], cam[1] = x0 + (cam[0] - x0) * alpha, y0 + (cam[1] - y0) * alpha
+        self.saved = (objects, dicts, crowd, camera)
+
+    def restore(self):
+        if self.saved is None:
+            return
+        objects, dicts, crowd, camera = self.saved
+        for obj, x, y in objects:
+            obj.x, obj.y = x, y
+        for d, x, y in dicts:
+            d['x'], d['y'] = x, y
+        if crowd is not None:
+            store, x, y = crowd
+            store.x[:store.n] = x
+            store.y[:store.n] = y
+        if camera is not None:
+            cam, x, y = camera
+            cam[0], cam[1] = x, y
+        self.saved = None
+
+
+class InputLog:
+    """Everything the player did, tick by tick, to replay a game exactly
+
+    Each tick holds the movement keys held, whether the player fired and
+    where the mouse was when they did, and the keys pressed since the last
+    tick. Together with the game's seed and the tick play started on that
+    is the whole game. Saved logs run-length encode identical ticks, so
+    standing around costs a few bytes.
+    """
+    MAGIC = b'BBRP'
+    HEADER = struct.Struct('<4sQI')  # magic, seed, starting game_time
+    TICK = struct.Struct('<HHhhB')  # repeats, held/shoot bits, mouse x, mouse y, presses
+    KEYS = (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d,
+            pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT)
+    SHOOT = 1 << len(KEYS)
+    WHEEL_UP, WHEEL_DOWN = -1, -2  # the mouse wheel, logged as presses
+
+    SEEDS = 2**64  # seeds a log can hold: the header stores an unsigned 64-bit one
+
+    def __init__(self, seed=0, start=0):
+        # Checked now rather than on save, when the game played would be lost
+        if not 0 <= seed < self.SEEDS:
+            raise ValueError(f"seed {seed} is outside 0..2**64-1 and can't be recorded")
+        self.seed = seed
+        self.start = start
+        self.ticks = []  # (bits, mouse x, mouse y, presses)
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def append(self, keys, shoot, mouse, presses):
+        bits = 0
+        for i, key in enumerate(self.KEYS):
+            if keys[key]:
+                bits |= 1 << i
+        mx, my = mouse if shoot else (0, 0)  # aim only matters on a shot
+        if shoot:
+            bits |= self.SHOOT
+        self.ticks.append((bits, mx, my, tuple(presses)))
+
+    def __iter__(self):
+        """(keys, shoot, mouse, presses) for each tick, as Game.step() takes them"""
+        for bits, mx, my, presses in self.ticks:
+            keys = collections.defaultdict(bool)
+            for i, key in enumerate(self.KEYS):
+                if bits & (1 << i):
+                    keys[key] = True
+            yield keys, bool(bits & self.SHOOT), (mx, my), presses
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.seed, self.start))
+            for tick, run in itertools.groupby(self.ticks):
+                count = sum(1 for _ in run)
+                bits, mx, my, presses = tick
+                while count:
+                    repeats = min(count, 0xffff)
+                    f.write(self.TICK.pack(repeats, bits, mx, my, len(presses)))
+                    f.write(struct.pack(f'<{len(presses)}i', *presses))
+                    count -= repeats
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, seed, start = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError(f"{path} is not a BLOODBATH replay")
+        log = cls(seed, start)
+        at = cls.HEADER.size
+        while at < len(data):
+            repeats, bits, mx, my, n = cls.TICK.unpack_from(data, at)
+            at += cls.TICK.size
+            presses = struct.unpack_from(f'<{n}i', data, at)
+            at += 4 * n
+            log.ticks.extend([(bits, mx, my, presses)] * repeats)
+        return log
+
+
+class Profiler:
+    """Per-phase frame timings for the F3 overlay, and Chrome trace dumps (F4)
+
+    Switched off it is not there at all: attach() wraps the game's phase
+    methods in timers on the instance, and detach() deletes the wrappers so
+    the class's own methods run again untouched. The few phases that are not
+    methods (input, overlays, flip) are spans the run loop records only
+    while the profiler is on.
+    """
+    # (label, method timed or None for a run loop span, indent)
+    PHASES = (
+        ('input', None, 0),
+        ('tick', 'step', 0),
+        ('update_mission', 'update_mission', 1),
+        ('cop AI', 'update_cops', 1),
+        ('civilian AI', 'update_civilians', 1),
+        ('gang AI', 'update_gangs', 1),
+        ('rockets', 'update_rockets', 1),
+        ('police cars', 'update_police_cars', 1),
+        ('bullets', 'update_bullets', 1),
+        ('particles', 'particles.update', 1),
+        ('draw_world', 'draw_world', 0),
+        ('ground', 'draw_ground', 1),
+        ('props', 'draw_props', 1),
+        ('buildings', 'draw_building_layer', 1),
+        ('people', 'draw_people', 1),
+        ('vehicles', 'draw_vehicles', 1),
+        ('gangs', 'draw_gangs', 1),
+        ('effects', 'draw_effects', 1),
+        ('draw_interior', 'draw_interior', 0),
+        ('draw_hud', 'draw_hud', 0),
+        ('overlays', None, 0),
+        ('flip', None, 0),
+    )
+    COUNTS = ('cops', 'civilians', 'gang_members', 'hoes', 'vehicles', 'police_cars',
+              'bullets', 'rockets', 'particles')
+    TRACE_SECONDS = 10  # history kept for the trace dump
+    AVERAGE = 60  # frames averaged for the numbers on screen
+    REFRESH = 30  # frames between redraws of the numbers, so they can be read
+    GRAPH = 240  # frames in the frame-time graph
+
+    def __init__(self):
+        self.on = False
+        self.frames = collections.deque()  # (start, end, events, counts), oldest first
+        self.events = []  # (label, start, seconds) this frame
+        self.frame_start = None
+        self.counts = {}
+        self.panel = None
+        self.age = 0
+        self.status = None  # last trace saved, shown at the foot of the panel
+        self.epoch = time.perf_counter()
+
+    def toggle(self, game):
+        if self.on:
+            self.detach(game)
+        else:
+            self.attach(game)
+        return self.on
+
+    def owners(self, game):
+        """(label, object, attribute name) for each phase that is a method of game"""
+        for label, path, _ in self.PHASES:
+            if path is None:
+                continue
+            *parents, name = path.split('.')
+            obj = game
+            for parent in parents:
+                obj = getattr(obj, parent)
+            yield label, obj, name
+
+    def attach(self, game):
+        for label, obj, name in self.owners(game):
+            setattr(obj, name, self.timed(label, getattr(obj, name)))
+        self.frames.clear()
+        self.events = []
+        self.frame_start = None
+        self.panel = None
+        self.on = True
+
+    def detach(self, game):
+        for label, obj, name in self.owners(game):
+            vars(obj).pop(name, None)
+        self.on = False
+
+    def timed(self, label, fn):
+        def timed_call(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.events.append((label, start, time.perf_counter() - start))
+        return timed_call
+
+    def span(self, label, start):
+        """Record a run loop phase that began at start; returns now, where the next one begins"""
+        now = time.perf_counter()
+        self.events.append((label, start, now - start))
+        return now
+
+    def next_frame(self, game):
+        """Close the frame that was being timed and start another"""
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            end = max((start + seconds for _, start, seconds in self.events), default=self.frame_start)
+            self.frames.append((self.frame_start, end, self.events, self.counts))
+            while self.frames and self.frames[0][0] < now - self.TRACE_SECONDS:
+                self.frames.popleft()
+        self.events = []
+        self.frame_start = now
+        self.counts = {name: len(getattr(game, name)) for name in self.COUNTS}
+        return now
+
+    def draw(self, surf, fps):
+        """The timings panel and frame-time graph, top right under the HUD"""
+        frames = list(itertools.islice(reversed(self.frames), self.GRAPH))
+        if not frames:
+            return
+        self.age += 1
+        if self.panel is None or self.age >= self.REFRESH:
+            self.panel = self.render_panel(frames[:self.AVERAGE], fps)
+            self.age = 0
+        x, y = SCREEN_W - self.panel.get_width() - 10, 75
+        surf.blit(self.panel, (x, y))
+        # Frame time graph, newest on the right; the line is one 60 fps frame
+        gx, gy, gh = x + 10, y + self.panel.get_height() - 70, 60
+        scale = gh / 33.3
+        for i, (start, end, _, _) in enumerate(frames):
+            ms = (end - start) * 1000
+            color = C['green'] if ms < 16.7 else C['gold'] if ms < 33.3 else C['red']
+            h = min(gh, max(1, int(ms * scale)))
+            pygame.draw.line(surf, color, (gx + self.GRAPH - i, gy + gh), (gx + self.GRAPH - i, gy + gh - h))
+        pygame.draw.line(surf, (120, 120, 120), (gx, gy + gh - int(16.7 * scale)),
+                         (gx + self.GRAPH, gy + gh - int(16.7 * scale)))
+
+    def render_panel(self, frames, fps):
+        totals = collections.defaultdict(float)
+        for _, _, events, _ in frames:
+            for label, _, seconds in events:
+                totals[label] += seconds
+        times = sorted((end - start) * 1000 for start, end, _, _ in frames)
+        counts = frames[0][3]
+        rows = [(f"{fps:.0f} fps  frame {sum(times) / len(times):.2f} ms  worst {times[-1]:.2f} ms",
+                 None, 0, C['white'])]
+        for label, _, indent in self.PHASES:
+            if label in totals:
+                ms = totals[label] * 1000 / len(frames)
+                rows.append((label, f"{ms:.2f} ms", indent, C['neon'] if indent else C['white']))
+        rows.append((f"{counts['cops']} cops  {counts['civilians']} civilians  {counts['gang_members']} gang  "
+                     f"{counts['hoes']} crew", None, 0, C['gold']))
+        rows.append((f"{counts['vehicles']} cars  {counts['police_cars']} police  {counts['bullets']} bullets  "
+                     f"{counts['rockets']} rockets  {counts['particles']} particles", None, 0, C['gold']))
+        rows.append(("F3 close  F4 save trace", None, 0, (150, 150, 150)))
+        if self.status:
+            rows.append((self.status, None, 0, C['green']))
+        width = self.GRAPH + 100
+        panel = pygame.Surface((width, 20 + 18 * len(rows) + 70), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+        for i, (label, value, indent, color) in enumerate(rows):
+            panel.blit(F['tiny'].render(label, True, color), (10 + 16 * indent, 10 + 18 * i))
+            if value is not None:
+                txt = F['tiny'].render(value, True, color)
+                panel.blit(txt, (width - 10 - txt.get_width(), 10 + 18 * i))
+        return panel
+
+    def dump(self, path=None):
+        """Write the frames kept as a Chrome trace (chrome://tracing, Perfetto); returns the path"""
+        path = path or time.strftime("bloodbath-trace-%Y%m%d-%H%M%S.json")
+        us = lambda t: (t - self.epoch) * 1e6
+        trace = []
+        for start, end, events, counts in self.frames:
+            trace.append({'name': 'frame', 'ph': 'X', 'pid': 1, 'tid': 1, 'ts': us(start), 'dur': (end - start) * 1e6})
+            trace.append({'name': 'entities', 'ph': 'C', 'pid': 1, 'tid': 1, 'ts': us(start), 'args': counts})
+            for label, t, seconds in events:
+                trace.append({'name': label, 'ph': 'X', 'pid': 1, 'tid': 1, 'ts': us(t), 'dur': seconds * 1e6})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+        self.status = f"Trace saved to {path}"
+        self.panel = None
+        return path
+
+
+class TileGrid:
+    """Static per-tile occupancy of the building layer"""
+    def __init__(self, w, h):
+        self.w, self.h = w, h
+        self.cells = bytearray(w * h)  # 1 = building on that tile
+
+    def mark(self, tx, ty):
+        self.cells[ty * self.w + tx] = 1
+
+    def solid(self, tx, ty):
+        return 0 <= tx < self.w and 0 <= ty < self.h and self.cells[ty * self.w + tx] == 1
+
+    def overlaps(self, x, y, w, h):
+        """Same answer as pygame.Rect(x, y, w, h).colliderect against every solid tile"""
+        # pygame.Rect truncates floats, so truncate the same way
+        x, y, w, h = int(x), int(y), int(w), int(h)
+        if w <= 0 or h <= 0:
+            return False
+        tx0 = max(0, x // TILE)
+        tx1 = min(self.w - 1, (x + w - 1) // TILE)
+        ty0 = max(0, y // TILE)
+        ty1 = min(self.h - 1, (y + h - 1) // TILE)
+        if tx0 > tx1:
+            return False
+        cells = self.cells
+        for ty in range(ty0, ty1 + 1):
+            row = ty * self.w
+            if cells.find(1, row + tx0, row + tx1 + 1) != -1:
+                return True
+        return False
+
+    def overlaps_many(self, xs, ys, w, h):
+        """overlaps() for a whole array of w x h boxes at once (w, h <= TILE)"""
+        grid = np.frombuffer(self.cells, dtype=np.uint8).reshape(self.h, self.w)
+        x = np.trunc(xs).astype(np.int64)
+        y = np.trunc(ys).astype(np.int64)
+        w, h = int(w), int(h)
+        tx0, tx1 = np.maximum(x // TILE, 0), np.minimum((x + w - 1) // TILE, self.w - 1)
+        ty0, ty1 = np.maximum(y // TILE, 0), np.minimum((y + h - 1) // TILE, self.h - 1)
+        on_map = (tx0 <= tx1) & (ty0 <= ty1)
+        # A box no bigger than a tile touches at most 2x2 tiles
+        tx0, tx1 = np.clip(tx0, 0, self.w - 1), np.clip(tx1, 0, self.w - 1)
+        ty0, ty1 = np.clip(ty0, 0, self.h - 1), np.clip(ty1, 0, self.h - 1)
+        hit = grid[ty0, tx0] | grid[ty0, tx1] | grid[ty1, tx0] | grid[ty1, tx1]
+        return on_map & (hit != 0)
+
+    def raycast(self, x0, y0, x1, y1):
+        """Fraction along the segment where it first enters a solid tile, or None"""
+        for tx, ty, t in grid_cells(x0, y0, x1, y1, TILE):
+            if self.solid(tx, ty):
+                return t
+        return None
+
+
+class SpatialHash:
+    """Uniform grid of buckets for broad-phase queries on moving entities"""
+    def __init__(self, cell=128):
+        self.cell = cell
+        self.buckets = {}  # (cx, cy) -> [obj, ...]
+        self.where = {}  # id(obj) -> cell keys the object was filed under
+
+    def __len__(self):
+        return len(self.where)
+
+    def clear(self):
+        self.buckets.clear()
+        self.where.clear()
+
+    def cells(self, x, y, w, h):
+        c = self.cell
+        return [(cx, cy)
+                for cy in range(int(y // c), int((y + h) // c) + 1)
+                for cx in range(int(x // c), int((x + w) // c) + 1)]
+
+    def insert(self, obj, x, y, w, h):
+        keys = self.cells(x, y, w, h)
+        for key in keys:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                self.buckets[key] = [obj]
+            else:
+                bucket.append(obj)
+        self.where[id(obj)] = keys
+
+    def remove(self, obj):
+        for key in self.where.pop(id(obj), ()):
+            self.buckets[key].remove(obj)
+
+    def query_rect(self, x, y, w, h):
+        """Objects filed in any cell the box touches (callers do the exact test)"""
+        found = {}
+        buckets = self.buckets
+        for key in self.cells(x, y, w, h):
+            bucket = buckets.get(key)
+            if bucket:
+                for obj in bucket:
+                    found[id(obj)] = obj
+        return list(found.values())
+
+    def query_radius(self, x, y, r):
+        return self.query_rect(x - r, y - r, r * 2, r * 2)
+
+    def query_segment(self, x0, y0, x1, y1):
+        """Objects filed in any cell the segment crosses"""
+        found = {}
+        buckets = self.buckets
+        for cx, cy, _ in grid_cells(x0, y0, x1, y1, self.cell):
+            bucket = buckets.get((cx, cy))
+            if bucket:
+                for obj in bucket:
+                    found[id(obj)] = obj
+        return list(found.values())
+
+    def nearest(self, x, y, max_dist, pos, accept=None):
+        """Closest object within max_dist of (x, y), measured to pos(obj)
+
+        Walks rings of cells outward and stops once no unvisited ring can
+        hold anything closer. pos(obj) must lie inside the box the object
+        was inserted with. Returns (obj, dist) or (None, max_dist).
+        """
+        c = self.cell
+        cx0, cy0 = int(x // c), int(y // c)
+        buckets = self.buckets
+        best, best_dist = None, max_dist
+        rings = int(max_dist // c) + 2
+        if len(buckets) < (2 * rings - 1) ** 2:
+            # Sparse grid - fewer buckets in total than cells to visit
+            for bucket in buckets.values():
+                for obj in bucket:
+                    ox, oy = pos(obj)
+                    dist = math.hypot(ox - x, oy - y)
+                    if dist < best_dist and (accept is None or accept(obj)):
+                        best, best_dist = obj, dist
+            return best, best_dist
+        for r in range(rings):
+            if best is not None and best_dist <= (r - 1) * c:
+                break
+            if r == 0:
+                ring = [(cx0, cy0)]
+            else:
+                ring = [(cx, cy0 - r) for cx in range(cx0 - r, cx0 + r + 1)]
+                ring += [(cx, cy0 + r) for cx in range(cx0 - r, cx0 + r + 1)]
+                ring += [(cx0 - r, cy) for cy in range(cy0 - r + 1, cy0 + r)]
+                ring += [(cx0 + r, cy) for cy in range(cy0 - r + 1, cy0 + r)]
+            for key in ring:
+                bucket = buckets.get(key)
+                if not bucket:
+                    continue
+                for obj in bucket:
+                    ox, oy = pos(obj)
+                    dist = math.hypot(ox - x, oy - y)
+                    if dist < best_dist and (accept is None or accept(obj)):
+                        best, best_dist = obj, dist
+        return best, best_dist
+
+
+class FlowField:
+    """Shared BFS field that leads every chaser around buildings to one goal
+
+    Rebuilt only when the goal moves to another tile. Each open tile near
+    the goal remembers which neighbour tile is one step closer.
+    """
+    RADIUS = 20  # tiles searched out from the goal
+    NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+    def __init__(self, occupancy):
+        self.occupancy = occupancy
+        self.goal = None
+        self.dist = {}  # tile -> steps to the goal tile
+        self.next = {}  # tile -> center of the tile to head for
+        self.rebuilds = 0
+
+    def update(self, x, y):
+        """Retarget the field at the tile holding (x, y)"""
+        occ = self.occupancy
+        w, cells = occ.w, occ.cells
+        gx, gy = int(x // TILE), int(y // TILE)
+        if not (0 <= gx < w and 0 <= gy < occ.h):
+            return
+        goal = gy * w + gx  # tiles are keyed by flat index ty * w + tx
+        if goal == self.goal:
+            return
+        self.goal = goal
+        self.rebuilds += 1
+        r = self.RADIUS
+        x0, x1 = max(0, gx - r), min(w - 1, gx + r)
+        y0, y1 = max(0, gy - r), min(occ.h - 1, gy + r)
+        dist = {goal: 0}
+        frontier = [goal]
+        d = 0
+        while frontier:
+            d += 1
+            nxt = []
+            for i in frontier:
+                ty, tx = divmod(i, w)
+                for j, ok in ((i - 1, tx > x0), (i + 1, tx < x1), (i - w, ty > y0), (i + w, ty < y1)):
+                    if ok and not cells[j] and j not in dist:
+                        dist[j] = d
+                        nxt.append(j)
+            frontier = nxt
+        self.dist = dist
+        self.next = {}
+
+    def step_toward(self, x, y):
+        """Where an agent centered at (x, y) should head next, or None
+
+        None means walk straight: the agent is next to the goal, or out of
+        the field's reach.
+        """
+        tile = int(y // TILE) * self.occupancy.w + int(x // TILE)
+        target = self.next.get(tile)
+        if target is None:
+            target = self.next[tile] = self.pick(tile)
+        return target or None
+
+    def pick(self, tile):
+        dist = self.dist
+        here = dist.get(tile)
+        if here is None or here <= 1:
+            return ()
+        w = self.occupancy.w
+        ty, tx = divmod(tile, w)
+        best, best_d = None, here
+        for dx, dy in self.NEIGHBOURS:
+            if not 0 <= tx + dx < w:
+                continue
+            d = dist.get(tile + dy * w + dx)
+            if d is None or d >= best_d:
+                continue
+            # No cutting across a building corner
+            if dx and dy and (tile + dx not in dist or tile + dy * w not in dist):
+                continue
+            best, best_d = (tx + dx, ty + dy), d
+        if best is None:
+            return ()
+        return (best[0] * TILE + TILE // 2, best[1] * TILE + TILE // 2)
+
+
+class ProximityIndex:
+    """Nearest-thing lookups for auto-aim and interaction prompts
+
+    Static interactables (shops, dealers) are hashed by tile once. Moving
+    ones are answered from the spatial hashes the game already keeps.
+    """
     def __init__(self):
+        self.static = {}  # kind -> {(tx, ty): [(obj, x, y), ...]}
+        self.dynamic = {}  # kind -> (SpatialHash, pos(obj))
+
+    def add_static(self, kind, obj, pos):
+        tiles = self.static.setdefault(kind, {})
+        key = (int(pos[0] // TILE), int(pos[1] // TILE))
+        tiles.setdefault(key, []).append((obj, pos[0], pos[1]))
+
+    def add_dynamic(self, kind, grid, pos):
+        self.dynamic[kind] = (grid, pos)
+
+    def query_nearest(self, kind, pos, radius, accept=None):
+        """Nearest object of a kind within radius of pos
+
+        Returns (obj, dist) or (None, radius).
+        """
+        x, y = pos
+        if kind in self.dynamic:
+            grid, at = self.dynamic[kind]
+            return grid.nearest(x, y, radius, at, accept)
+        best, best_dist = None, radius
+        tiles = self.static.get(kind)
+        if not tiles:
+            return best, best_dist
+        tx0, tx1 = int((x - radius) // TILE), int((x + radius) // TILE)
+        for ty in range(int((y - radius) // TILE), int((y + radius) // TILE) + 1):
+            for tx in range(tx0, tx1 + 1):
+                for obj, ox, oy in tiles.get((tx, ty), ()):
+                    dist = math.hypot(ox - x, oy - y)
+                    if dist < best_dist and (accept is None or accept(obj)):
+                        best, best_dist = obj, dist
+        return best, best_dist
+
+
+class Game:
+    # Bullet hit boxes (half width, half height) around each target's center
+    HIT_BOXES = {'player': (25, 35), 'cop': (25, 35), 'gang': (22, 32), 'civilian': (20, 30)}
+    HIT_PAD = 8  # largest amount a hit box sticks out past the body
+    DEFAULT_STYLE = {'name': 'BUILDING', 'color': (65, 70, 80), 'floors': 2, 'type': 'generic'}
+    BUILDING_PAD = 16  # room around a building sprite for its shadow and sign text
+    SPRITE_PAD = 8  # room around a character sprite for hats, hair and arms
+    SIGN_COLORS = {'crack': C['neon'], 'strip': C['pink'], 'gun': C['gold'],
+                   'upgrade': C['neon'], 'safe': C['green']}
+    VEHICLE_STEPS = 64  # sprite rotations per full turn
+    POLICE_CAR = (90, 50)  # police car body size
+    VEHICLE_KEY = (255, 0, 255)  # transparent background of vehicle sprites
+    MINIMAP_SIZE = 130
+    MINIMAP_SCALE = MINIMAP_SIZE / 800  # minimap pixels per world pixel
+    # Walk-in interactables, in the order prompts and the E key check them
+    SITES = (('crack', 'TRAP HOUSE'), ('strip', 'THE SPOT'), ('gun', "TONY'S GUNS"),
+             ('upgrade', 'CHOP SHOP'), ('safe', 'THE STASH'))
+    INTERACT_RANGE = 80
+    TICK = 1 / TICK_RATE  # seconds of game time per simulation tick
+    MAX_TICKS = 5  # most ticks run to catch up before a frame is drawn
+    INTERIOR_FILLS = {'crack': (40, 0, 60), 'strip': (60, 0, 50), 'gun': (50, 40, 30),
+                      'dealer': (20, 40, 20), 'upgrade': (30, 30, 60), 'safe': (20, 30, 20)}
+
+    def __init__(self, screen=None, headless=False, seed=None):
+        """A new game drawing to screen (the open window by default)
+
+        A headless game has no surface, fonts or art at all - only update()
+        and the rest of the simulation may be used. Every random roll in the
+        simulation comes from streams derived from seed, so the same seed and
+        the same inputs always play out the same game.
+        """
+        self.headless = headless
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.spawn_rng = self.stream('spawn')      # who turns up where
+        self.ai_rng = self.stream('ai')            # cop, civilian and gang behaviour
+        self.combat_rng = self.stream('combat')    # spread, loot
+        self.fx_rng = self.stream('fx')            # blood, smoke, camera shake
+        self.economy_rng = self.stream('economy')  # cook targets, rizz
+        self.screen = None if headless else screen if screen is not None else pygame.display.get_surface()
         self.player = Player()
-        self.cops = []
-        self.civilians = []
-        self.hoes = []
-        self.bullets = []
-        self.rockets = []  # RPG rockets
-        self.blood = []
+        self.cops = EntityList()
+        self.civilians = (CrowdStore(self.HIT_PAD, rng=np.random.default_rng(self.stream('crowd').getrandbits(64)))
+                          if CROWD_STORE else EntityList())
+        self.hoes = EntityList()
+        self.bullets = EntityList()
+        self.rockets = EntityList()  # RPG rockets
+        self.blood = BloodLayer()
         self.buildings = []
         self.crack_dens = []
         self.strip_clubs = []
         self.gunstores = []
         self.upgrade_shops = []
         self.safe_houses = []  # Save points
-        self.health_pickups = []
-        self.drug_dealers = []
+        self.health_pickups = EntityList()
+        self.drug_dealers = EntityList()
         # New systems
-        self.vehicles = []
-        self.police_cars = []  # Cop vehicles that chase
-        self.gang_members = []
-        self.particles = []
+        self.vehicles = EntityList()
+        self.police_cars = EntityList()  # Cop vehicles that chase
+        self.gang_members = EntityList()
+        self.floating_texts = EntityList()
+        self.particles = ParticlePool(seed=self.stream('particles').getrandbits(64))
+        self.interp = Interpolator()  # smooths drawing between fixed ticks
+        self.profiler = Profiler()  # F3 phase timings, costs nothing until switched on
         self.gang_territories = {'red': [], 'blue': [], 'green': []}
+        # Spatial hashes for hit tests, rebuilt every tick by reindex()
+        self.grids = {
+            'cop': SpatialHash(),
+            # The crowd store answers its own spatial queries
+            'civilian': self.civilians if CROWD_STORE else SpatialHash(),
+            'gang': SpatialHash(), 'vehicle': SpatialHash(),
+        }
+        # Coarser per-gang hashes for nearest-hostile searches
+        self.gang_grids = {gang: SpatialHash(256) for gang in ('red', 'blue', 'green')}
+        # Nearest-target lookups for auto-aim and the E key
+        self.proximity = ProximityIndex()
+        self.proximity.add_dynamic('cop', self.grids['cop'], lambda o: o.center)
+        self.proximity.add_dynamic('vehicle', self.grids['vehicle'], lambda o: (o.x, o.y))
         # Radio system
         self.radio_stations = [
             {'name': 'DEATH FM', 'genre': 'Heavy Metal'},
@@ -516,22 +1871,48 @@ class Game:
         # Save system
         self.has_save = False
         self.generate_world()
+        self.index_sites()
+        self.index_scenery()
+        self.show_map = False
+        self.light_map = False
+        # Ground and building art, baked per chunk on first sight
+        self.chunks = ChunkCache(self.render_chunk)
+        self.building_sprites = {}  # (name, sign, is_night, window pattern) -> Surface
+        self.sprites = ChunkCache(self.render_sprite, capacity=128)  # characters
+        self.vehicle_sprites = ChunkCache(self.render_vehicle, capacity=512)
+        if not headless:
+            self.bake_minimap()
+            self.build_hud()
+            self.build_interiors()
+            # Screen tints, and the streetlight/window light map (L)
+            self.lighting = Lighting((SCREEN_W, SCREEN_H), lit_area=(0, 65, SCREEN_W, SCREEN_H - 65))
+            self.flash = Lighting((SCREEN_W, SCREEN_H))
         self.spawn_npcs()
         self.spawn_vehicles()
         self.spawn_gangs()
         self.spawn_police_cars()
         # Spawn starting hoes near player
         for i in range(self.player.hoes):
-            self.hoes.append(Hoe(self.player.x + random.randint(-100, 100), 
-                                 self.player.y + random.randint(-100, 100)))
+            self.hoes.append(Hoe(self.player.x + self.spawn_rng.randint(-100, 100),
+                                 self.player.y + self.spawn_rng.randint(-100, 100),
+                                 rng=self.spawn_rng))
+        self.reindex()
         # Generate initial missions
         self.generate_missions()
-    
+
+    def stream(self, name):
+        """A random stream of its own for one subsystem of this game's seed"""
+        return random.Random(f"{self.seed}/{name}")
+
     def generate_world(self):
-        random.seed(42)
+        rng = random.Random(42)  # the same city every game
         
         # Store building types for detailed rendering
         self.building_styles = {}  # rect -> style info
+        # Tile occupancy for collision queries (buildings never move)
+        self.occupancy = TileGrid(MAP_W, MAP_H)
+        # Pursuit field toward the player, shared by every chaser
+        self.flow = FlowField(self.occupancy)
         
         # Hood building styles for regular buildings
         hood_styles = [
@@ -549,88 +1930,86 @@ class Game:
         
         for x in range(MAP_W):
             for y in range(MAP_H):
-                if random.random() < 0.06:
-                    t = random.randint(1, 6)
+                if rng.random() < 0.06:
+                    t = rng.randint(1, 6)
                     rect = pygame.Rect(x*TILE, y*TILE, TILE, TILE)
                     self.buildings.append(rect)
+                    self.occupancy.mark(x, y)
                     center = (x*TILE + TILE//2, y*TILE + TILE//2)
                     if t == 2:
                         self.crack_dens.append((rect, center))
-                        self.building_styles[id(rect)] = {'name': 'TRAP HOUSE', 'color': (60, 40, 70), 'floors': 2, 'type': 'trap'}
+                        self.building_styles[id(rect)] = {'name': 'TRAP HOUSE', 'color': (60, 40, 70), 'floors': 2, 'type': 'trap', 'sign': 'crack'}
                     elif t == 3:
                         self.strip_clubs.append((rect, center))
-                        self.building_styles[id(rect)] = {'name': 'THE SPOT', 'color': (100, 30, 80), 'floors': 1, 'type': 'club'}
+                        self.building_styles[id(rect)] = {'name': 'THE SPOT', 'color': (100, 30, 80), 'floors': 1, 'type': 'club', 'sign': 'strip'}
                     elif t == 4:
                         self.gunstores.append((rect, center))
-                        self.building_styles[id(rect)] = {'name': "TONY'S GUNS", 'color': (90, 80, 50), 'floors': 1, 'type': 'store'}
+                        self.building_styles[id(rect)] = {'name': "TONY'S GUNS", 'color': (90, 80, 50), 'floors': 1, 'type': 'store', 'sign': 'gun'}
                     elif t == 5:
                         self.upgrade_shops.append((rect, center))
-                        self.building_styles[id(rect)] = {'name': 'CHOP SHOP', 'color': (70, 80, 90), 'floors': 1, 'type': 'garage'}
+                        self.building_styles[id(rect)] = {'name': 'CHOP SHOP', 'color': (70, 80, 90), 'floors': 1, 'type': 'garage', 'sign': 'upgrade'}
                     elif t == 6:
                         self.safe_houses.append((rect, center))
-                        self.building_styles[id(rect)] = {'name': 'STASH', 'color': (50, 80, 50), 'floors': 2, 'type': 'house'}
+                        self.building_styles[id(rect)] = {'name': 'STASH', 'color': (50, 80, 50), 'floors': 2, 'type': 'house', 'sign': 'safe'}
                     else:
                         # Random hood building
-                        style = random.choice(hood_styles)
+                        style = rng.choice(hood_styles)
                         self.building_styles[id(rect)] = style.copy()
-        random.seed()
         
         # Generate hood props (dumpsters, basketball hoops, etc.)
         self.props = []
         prop_types = ['dumpster', 'basketball', 'bench', 'hydrant', 'mailbox', 'trashcan', 'streetlight', 'busstop']
         
-        random.seed(43)  # Consistent props
+        rng = random.Random(43)  # Consistent props
         for _ in range(60):
             for _ in range(20):
-                x = random.randint(100, MAP_W*TILE - 100)
-                y = random.randint(100, MAP_H*TILE - 100)
+                x = rng.randint(100, MAP_W*TILE - 100)
+                y = rng.randint(100, MAP_H*TILE - 100)
                 if not self.collides(x, y, 30, 30):
-                    prop_type = random.choice(prop_types)
+                    prop_type = rng.choice(prop_types)
                     self.props.append({'x': x, 'y': y, 'type': prop_type})
                     break
-        random.seed()
         
         # Generate graffiti spots on buildings
         self.graffiti = []
         graffiti_tags = ['RIP TYRONE', 'BLOODS', 'CRIPS', 'F12', '187', 'THUG LIFE', 'WESTSIDE', 'EASTSIDE', 
                         'NO SNITCHIN', 'TRAP GOD', 'FREE LIL D', 'HOOD RICH', 'CASH RULES', 'STAY STRAPPED']
-        random.seed(44)
+        rng = random.Random(44)
         for b in self.buildings[:20]:  # Add graffiti to some buildings
-            if random.random() < 0.6:
+            if rng.random() < 0.6:
                 self.graffiti.append({
-                    'x': b.x + random.randint(5, 40),
-                    'y': b.y + random.randint(30, 50),
-                    'text': random.choice(graffiti_tags),
-                    'color': random.choice([C['red'], C['gang_blue'], C['green'], C['white'], C['gold'], C['pink'], C['neon']])
+                    'x': b.x + rng.randint(5, 40),
+                    'y': b.y + rng.randint(30, 50),
+                    'text': rng.choice(graffiti_tags),
+                    'color': rng.choice([C['red'], C['gang_blue'], C['green'], C['white'], C['gold'], C['pink'], C['neon']])
                 })
-        random.seed()
         
         # Spawn drug dealers in open areas
         for _ in range(12):
             for _ in range(50):
-                x = random.randint(200, MAP_W*TILE - 200)
-                y = random.randint(200, MAP_H*TILE - 200)
+                x = self.spawn_rng.randint(200, MAP_W*TILE - 200)
+                y = self.spawn_rng.randint(200, MAP_H*TILE - 200)
                 if not self.collides(x, y, 38, 58):
-                    self.drug_dealers.append(DrugDealer(x, y))
+                    self.drug_dealers.append(DrugDealer(x, y, rng=self.spawn_rng))
                     break
     
     def spawn_npcs(self):
         # Spawn cops
         for _ in range(8):
             for _ in range(50):
-                x = random.randint(100, MAP_W*TILE - 100)
-                y = random.randint(100, MAP_H*TILE - 100)
+                x = self.spawn_rng.randint(100, MAP_W*TILE - 100)
+                y = self.spawn_rng.randint(100, MAP_H*TILE - 100)
                 if not self.collides(x, y, 40, 60):
-                    self.cops.append(Cop(x, y))
+                    self.cops.append(Cop(x, y, rng=self.spawn_rng))
                     break
         
         # Spawn civilians
         for _ in range(30):
             for _ in range(50):
-                x = random.randint(100, MAP_W*TILE - 100)
-                y = random.randint(100, MAP_H*TILE - 100)
+                x = self.spawn_rng.randint(100, MAP_W*TILE - 100)
+                y = self.spawn_rng.randint(100, MAP_H*TILE - 100)
                 if not self.collides(x, y, 35, 55):
-                    self.civilians.append(Civilian(x, y))
+                    self.civilians.append(Civilian(x, y, rng=self.spawn_rng))
                     break
     
     def spawn_vehicles(self):
@@ -638,11 +2017,11 @@ class Game:
         vehicle_types = ['car', 'car', 'car', 'sports', 'truck']
         for _ in range(15):
             for _ in range(50):
-                x = random.randint(200, MAP_W*TILE - 200)
-                y = random.randint(200, MAP_H*TILE - 200)
+                x = self.spawn_rng.randint(200, MAP_W*TILE - 200)
+                y = self.spawn_rng.randint(200, MAP_H*TILE - 200)
                 if not self.collides(x - 50, y - 30, 100, 60):
-                    vtype = random.choice(vehicle_types)
-                    self.vehicles.append(Vehicle(x, y, vtype))
+                    vtype = self.spawn_rng.choice(vehicle_types)
+                    self.vehicles.append(Vehicle(x, y, vtype, rng=self.spawn_rng))
                     break
     
     def spawn_gangs(self):
@@ -656,24 +2035,24 @@ class Game:
         
         for gang, (x1, y1, x2, y2) in territories.items():
             # Spawn 6-10 members per gang
-            for _ in range(random.randint(6, 10)):
+            for _ in range(self.spawn_rng.randint(6, 10)):
                 for _ in range(50):
-                    x = random.randint(x1 + 100, x2 - 100)
-                    y = random.randint(y1 + 100, y2 - 100)
+                    x = self.spawn_rng.randint(x1 + 100, x2 - 100)
+                    y = self.spawn_rng.randint(y1 + 100, y2 - 100)
                     if not self.collides(x, y, 38, 58):
-                        self.gang_members.append(GangMember(x, y, gang))
+                        self.gang_members.append(GangMember(x, y, gang, rng=self.spawn_rng))
                         break
     
     def spawn_police_cars(self):
         """Spawn police vehicles"""
         for _ in range(4):
             for _ in range(50):
-                x = random.randint(300, MAP_W*TILE - 300)
-                y = random.randint(300, MAP_H*TILE - 300)
+                x = self.spawn_rng.randint(300, MAP_W*TILE - 300)
+                y = self.spawn_rng.randint(300, MAP_H*TILE - 300)
                 if not self.collides(x - 50, y - 30, 100, 60):
                     self.police_cars.append({
                         'x': x, 'y': y,
-                        'angle': random.random() * 6.28,
+                        'angle': self.spawn_rng.random() * 6.28,
                         'velocity': 0,
                         'chasing': False,
                         'health': 200,
@@ -683,8 +2062,7 @@ class Game:
     
     def spawn_particles(self, x, y, ptype, count=10):
         """Spawn particle effects"""
-        for _ in range(count):
-            self.particles.append(Particle(x, y, ptype))
+        self.particles.spawn(x, y, ptype, count)
     
     def create_explosion(self, x, y):
         """Create an explosion that damages nearby entities"""
@@ -700,50 +2078,50 @@ class Game:
         p.screen_shake = 20
         
         # Damage cops
-        for cop in self.cops[:]:
+        for cop in self.grids['cop'].query_radius(x, y, explosion_radius):
             dist = math.hypot(cop.center[0] - x, cop.center[1] - y)
             if dist < explosion_radius:
                 damage = int(explosion_damage * (1 - dist / explosion_radius))
                 cop.health -= damage
                 self.spawn_blood(cop.center[0], cop.center[1], 15)
                 if cop.health <= 0:
-                    self.cops.remove(cop)
+                    self.despawn('cop', cop)
                     self.spawn_blood(cop.center[0], cop.center[1], 40)
                     p.kills += 1
-                    p.cash += random.randint(30, 60)
-                    p.total_earned += random.randint(30, 60)
+                    p.cash += self.combat_rng.randint(30, 60)
+                    p.total_earned += self.combat_rng.randint(30, 60)
                     p.wanted = min(5, p.wanted + 1)
         
         # Damage gang members
-        for gang in self.gang_members[:]:
+        for gang in self.grids['gang'].query_radius(x, y, explosion_radius):
             dist = math.hypot(gang.center[0] - x, gang.center[1] - y)
             if dist < explosion_radius:
                 damage = int(explosion_damage * (1 - dist / explosion_radius))
                 gang.health -= damage
                 self.spawn_blood(gang.center[0], gang.center[1], 15)
                 if gang.health <= 0:
-                    self.gang_members.remove(gang)
+                    self.despawn('gang', gang)
                     self.spawn_blood(gang.center[0], gang.center[1], 35)
                     p.gang_kills += 1
-                    p.cash += random.randint(40, 80)
-                    p.total_earned += random.randint(40, 80)
+                    p.cash += self.combat_rng.randint(40, 80)
+                    p.total_earned += self.combat_rng.randint(40, 80)
         
         # Damage civilians
-        for civ in self.civilians[:]:
+        for civ in self.grids['civilian'].query_radius(x, y, explosion_radius):
             dist = math.hypot(civ.center[0] - x, civ.center[1] - y)
             if dist < explosion_radius:
-                self.civilians.remove(civ)
+                self.despawn('civilian', civ)
                 self.spawn_blood(civ.center[0], civ.center[1], 20)
                 p.wanted = min(5, p.wanted + 0.3)
         
         # Damage vehicles
-        for vehicle in self.vehicles[:]:
+        for vehicle in self.grids['vehicle'].query_radius(x, y, explosion_radius):
             dist = math.hypot(vehicle.x - x, vehicle.y - y)
             if dist < explosion_radius:
                 damage = int(explosion_damage * (1 - dist / explosion_radius))
                 vehicle.health -= damage
                 if vehicle.health <= 0:
-                    self.vehicles.remove(vehicle)
+                    self.despawn('vehicle', vehicle)
                     self.spawn_particles(vehicle.x, vehicle.y, 'explosion', 20)
                     p.vehicles_destroyed += 1
         
@@ -834,30 +2212,245 @@ class Game:
                 self.generate_missions()
     
     def collides(self, x, y, w, h):
-        rect = pygame.Rect(x, y, w, h)
+        return self.occupancy.overlaps(x, y, w, h)
+
+    def entity_list(self, kind):
+        return {'cop': self.cops, 'civilian': self.civilians,
+                'gang': self.gang_members, 'vehicle': self.vehicles}[kind]
+
+    def index_entity(self, kind, obj):
+        if kind == 'vehicle':
+            self.grids[kind].insert(obj, obj.x - obj.w//2, obj.y - obj.h//2, obj.w, obj.h)
+        else:
+            # Padded so the cells cover the bullet hit box, not just the body
+            pad = self.HIT_PAD
+            self.grids[kind].insert(obj, obj.x - pad, obj.y - pad, obj.w + pad*2, obj.h + pad*2)
+            if kind == 'gang':
+                self.gang_grids[obj.gang].insert(obj, obj.x, obj.y, obj.w, obj.h)
+
+    def reindex(self):
+        """Rebuild the spatial hashes from current entity positions"""
+        for grid in self.gang_grids.values():
+            grid.clear()
+        for kind, grid in self.grids.items():
+            if grid is self.entity_list(kind):
+                continue  # crowd store, always current
+            grid.clear()
+            for obj in self.entity_list(kind):
+                self.index_entity(kind, obj)
+
+    def add_entity(self, kind, obj):
+        """Spawn an entity mid-tick, keeping its spatial hash in sync"""
+        self.entity_list(kind).append(obj)
+        self.index_entity(kind, obj)
+
+    def despawn(self, kind, obj):
+        """Remove a dead entity from its list and its spatial hash"""
+        self.entity_list(kind).kill(obj)
+        self.grids[kind].remove(obj)
+        if kind == 'gang':
+            self.gang_grids[obj.gang].remove(obj)
+
+    def compact_entities(self):
+        for group in (self.cops, self.civilians, self.hoes, self.bullets, self.rockets,
+                      self.health_pickups, self.drug_dealers, self.vehicles, self.police_cars,
+                      self.gang_members, self.floating_texts):
+            if isinstance(group, EntityList):
+                group.compact()
+
+    def nearest_hostile(self, gang, max_dist=400):
+        """Nearest member of a rival gang within max_dist of a gang member"""
+        nearest, nearest_dist = None, max_dist
+        for name, grid in self.gang_grids.items():
+            if name == gang.gang:
+                continue
+            other, dist = grid.nearest(gang.x, gang.y, nearest_dist, lambda o: (o.x, o.y))
+            if other is not None:
+                nearest, nearest_dist = other, dist
+        return nearest, nearest_dist
+
+    def site_places(self):
+        """Shop and safe house (rect, center) lists by kind"""
+        return {'crack': self.crack_dens, 'strip': self.strip_clubs, 'gun': self.gunstores,
+                'upgrade': self.upgrade_shops, 'safe': self.safe_houses}
+    
+    def index_sites(self):
+        """File shops, safe houses and dealers in the proximity index"""
+        for kind, places in self.site_places().items():
+            for rect, center in places:
+                self.proximity.add_static(kind, rect, center)
+        # Dealers never move off their corner
+        for dealer in self.drug_dealers:
+            self.proximity.add_static('dealer', dealer, dealer.center)
+    
+    def index_scenery(self):
+        """Hash the things that never move for the render pass"""
+        self.scenery = {kind: SpatialHash() for kind in ('prop', 'building', 'dealer')}
+        for prop in self.props:
+            self.scenery['prop'].insert(prop, prop['x'], prop['y'], 40, 40)
         for b in self.buildings:
-            if rect.colliderect(b):
-                return True
-        return False
+            self.scenery['building'].insert(b, b.x, b.y, b.w, b.h)
+        for dealer in self.drug_dealers:
+            self.scenery['dealer'].insert(dealer, dealer.x, dealer.y, dealer.w, dealer.h)
     
-    def spawn_blood(self, x, y, n=15):
-        for _ in range(n):
-            self.blood.append({
-                'x': x + random.randint(-25, 25),
-                'y': y + random.randint(-25, 25),
-                'life': 180
-            })
+    def query_nearest(self, kind, pos, radius, accept=None):
+        """Nearest object of a kind within radius of pos that accept() allows, as (obj, dist)"""
+        return self.proximity.query_nearest(kind, pos, radius, accept)
     
-    def spawn_message(self, x, y, text, color):
-        """Spawn floating text message"""
-        if not hasattr(self, 'floating_texts'):
-            self.floating_texts = []
-        self.floating_texts.append({
-            'x': x, 'y': y, 
-            'text': text, 
-            'color': color,
-            'life': 60,
-            'vy': -2
+    def query_view(self, kind, x, y, w, h):
+        """Scenery or entities of a kind filed in cells the map box touches
+
+        Cells are coarse, so callers still do their exact bounds test.
+        """
+        grid = self.scenery[kind] if kind in self.scenery else self.grids[kind]
+        return grid.query_rect(x, y, w, h)
+    
+    def visible(self, kind, margin):
+        """query_view over the camera rect grown by margin on every side"""
+        cam = self.camera
+        return self.query_view(kind, cam[0] - margin, cam[1] - margin,
+                               SCREEN_W + margin * 2, SCREEN_H + margin * 2)
+    
+    def visible_by_depth(self, kind, margin):
+        """visible() sorted back to front by y, so draw order doesn't depend on hash cells"""
+        return sorted(self.visible(kind, margin), key=lambda e: (e.y, e.x))
+    
+    def sweep_bullet(self, b, x0, y0, max_t):
+        """First target a bullet hits moving from (x0, y0) to (b.x, b.y)
+
+        Only hits before max_t (where it meets a wall) count.
+        Returns (kind, target, t) or None.
+        """
+        p = self.player
+        dx, dy = b.x - x0, b.y - y0
+        if b.owner == 'player':
+            kinds = ('cop', 'gang', 'civilian')
+            shooter_gang = None
+        else:
+            kinds = ('gang',) if b.owner.startswith('gang_') else ()
+            shooter_gang = b.owner.split('_')[1] if kinds else None
+        hit = None
+        for kind in kinds:
+            hw, hh = self.HIT_BOXES[kind]
+            for obj in self.grids[kind].query_segment(x0, y0, b.x, b.y):
+                if kind == 'gang' and obj.gang == shooter_gang:
+                    continue
+                cx, cy = obj.center
+                t = segment_box_t(x0, y0, dx, dy, cx - hw, cy - hh, cx + hw, cy + hh)
+                if t is not None and t < max_t:
+                    hit, max_t = (kind, obj, t), t
+        if b.owner != 'player':
+            hw, hh = self.HIT_BOXES['player']
+            cx, cy = p.center
+            t = segment_box_t(x0, y0, dx, dy, cx - hw, cy - hh, cx + hw, cy + hh)
+            if t is not None and t < max_t:
+                hit = ('player', p, t)
+        return hit
+    
+    def bullet_hit(self, b, kind, target):
+        """Apply a bullet that struck target at (b.x, b.y)"""
+        p = self.player
+        if kind == 'player':
+            # Apply armor damage reduction
+            base_damage = 25 if b.owner == 'cop' else 20
+            actual_damage = int(base_damage * (1 - p.armor / 100))
+            p.health -= actual_damage
+            p.damage_flash = 10  # Screen flash effect
+            self.spawn_blood(b.x, b.y, 10 if b.owner == 'cop' else 8)
+            if p.health <= 0:
+                p.alive = False
+                p.respawn_timer = 180
+                self.spawn_blood(p.center[0], p.center[1], 50)
+        
+        elif kind == 'cop':
+            cop = target
+            # Apply damage multiplier and bonus
+            base_damage = 35 + b.damage_bonus
+            actual_damage = int(base_damage * p.damage_mult)
+            cop.health -= actual_damage
+            cop.alert = True
+            self.spawn_blood(b.x, b.y, 12)
+            self.spawn_particles(b.x, b.y, 'spark', 3)
+            if cop.health <= 0:
+                self.despawn('cop', cop)
+                self.spawn_blood(cop.center[0], cop.center[1], 35)
+                p.wanted = min(5, p.wanted + 1)
+                cash = self.combat_rng.randint(20, 50)
+                p.cash += cash
+                p.kills += 1
+                p.total_earned += cash
+                # Aggressive kill messages
+                kill_msgs = [
+                    f"+${cash} SMOKED", f"+${cash} BODIED", 
+                    f"+${cash} DROPPED", f"+${cash} ELIMINATED",
+                    f"+${cash} CLAPPED", f"+${cash} SENT TO GOD",
+                    f"+${cash} WRECKED", f"+${cash} OBLITERATED"
+                ]
+                self.spawn_message(cop.center[0], cop.center[1] - 30, 
+                                 self.combat_rng.choice(kill_msgs), C['gold'])
+        
+        elif kind == 'gang' and b.owner == 'player':
+            gang = target
+            base_damage = 35 + b.damage_bonus
+            actual_damage = int(base_damage * p.damage_mult)
+            gang.health -= actual_damage
+            self.spawn_blood(b.x, b.y, 12)
+            self.spawn_particles(b.x, b.y, 'spark', 3)
+            # Decrease reputation with this gang
+            p.gang_rep[gang.gang] = max(-100, p.gang_rep[gang.gang] - 10)
+            if gang.health <= 0:
+                self.despawn('gang', gang)
+                self.spawn_blood(gang.center[0], gang.center[1], 35)
+                cash = self.combat_rng.randint(30, 80)
+                p.cash += cash
+                p.gang_kills += 1
+                p.total_earned += cash
+                # Aggressive gang kill messages
+                gang_msgs = [
+                    f"+${cash} PACKED UP", f"+${cash} OPP DOWN",
+                    f"+${cash} EXTERMINATED", f"+${cash} NO MERCY",
+                    f"+${cash} CAUGHT LACKING", f"+${cash} DELETED"
+                ]
+                self.spawn_message(gang.center[0], gang.center[1] - 30,
+                                 self.combat_rng.choice(gang_msgs), C['gold'])
+        
+        elif kind == 'gang':
+            # Gang bullets hitting other gang members
+            gang = target
+            gang.health -= 25
+            self.spawn_blood(b.x, b.y, 10)
+            if gang.health <= 0:
+                self.despawn('gang', gang)
+                self.spawn_blood(gang.center[0], gang.center[1], 30)
+        
+        elif kind == 'civilian':
+            civ = target
+            self.despawn('civilian', civ)
+            self.spawn_blood(b.x, b.y, 20)
+            p.wanted = min(5, p.wanted + 0.5)
+            p.cash += self.combat_rng.randint(5, 30)
+            # Scare nearby civilians
+            for c in self.grids['civilian'].query_radius(civ.x, civ.y, 200):
+                if math.hypot(c.x - civ.x, c.y - civ.y) < 200:
+                    c.scared = True
+                    c.scared_timer = 180
+    
+    def spawn_blood(self, x, y, n=15):
+        for _ in range(n):
+            bx = x + self.fx_rng.randint(-25, 25)
+            by = y + self.fx_rng.randint(-25, 25)
+            # Still draw the offsets headless so fx_rng stays in step with a windowed run
+            if not self.headless:
+                self.blood.stamp(bx, by)
+    
+    def spawn_message(self, x, y, text, color):
+        """Spawn floating text message"""
+        self.floating_texts.append({
+            'x': x, 'y': y, 
+            'text': text, 
+            'color': color,
+            'life': 60,
+            'vy': -2
         })
     
     def show_notification(self, text, duration=120):
@@ -922,7 +2515,7 @@ class Game:
             p.shoot_cooldown = 12
         
         for _ in range(shots):
-            a = angle + random.uniform(-spread, spread)
+            a = angle + self.combat_rng.uniform(-spread, spread)
             b = Bullet(p.x + p.w//2, p.y + p.h//2, a, 'player')
             b.damage_bonus = damage_bonus
             self.bullets.append(b)
@@ -939,25 +2532,25 @@ class Game:
             return
         
         # Hit cops
-        for cop in self.cops[:]:
+        for cop in self.grids['cop'].query_radius(p.x, p.y, 80):
             dist = math.hypot(cop.x - p.x, cop.y - p.y)
             if dist < 80:
                 cop.health -= 35
                 self.spawn_blood(cop.center[0], cop.center[1], 12)
                 cop.alert = True
                 if cop.health <= 0:
-                    self.cops.remove(cop)
+                    self.despawn('cop', cop)
                     self.spawn_blood(cop.center[0], cop.center[1], 30)
                     p.wanted = min(5, p.wanted + 1)
         
         # Hit civilians
-        for civ in self.civilians[:]:
+        for civ in self.grids['civilian'].query_radius(p.x, p.y, 80):
             dist = math.hypot(civ.x - p.x, civ.y - p.y)
             if dist < 80:
-                self.civilians.remove(civ)
+                self.despawn('civilian', civ)
                 self.spawn_blood(civ.center[0], civ.center[1], 25)
                 p.wanted = min(5, p.wanted + 0.5)
-                p.cash += random.randint(10, 50)
+                p.cash += self.combat_rng.randint(10, 50)
         
         p.wanted = min(5, p.wanted + 0.3)
     
@@ -967,19 +2560,18 @@ class Game:
         if p.inside or p.in_vehicle:
             return False
         
-        px, py = p.center
-        for vehicle in self.vehicles:
-            dist = math.hypot(px - vehicle.x, py - vehicle.y)
-            if dist < 80 and not vehicle.occupied:
-                p.in_vehicle = True
-                p.current_vehicle = vehicle
-                vehicle.occupied = True
-                vehicle.driver = p
-                p.vehicles_stolen += 1
-                p.wanted = min(5, p.wanted + 0.5)
-                self.show_notification(f"Entered {vehicle.vtype.upper()}", 60)
-                return True
-        return False
+        vehicle, _ = self.query_nearest('vehicle', p.center, self.INTERACT_RANGE,
+                                        lambda v: not v.occupied)
+        if vehicle is None:
+            return False
+        p.in_vehicle = True
+        p.current_vehicle = vehicle
+        vehicle.occupied = True
+        vehicle.driver = p
+        p.vehicles_stolen += 1
+        p.wanted = min(5, p.wanted + 0.5)
+        self.show_notification(f"Entered {vehicle.vtype.upper()}", 60)
+        return True
     
     def exit_vehicle(self):
         """Exit current vehicle"""
@@ -998,76 +2590,51 @@ class Game:
     
     def get_nearby_vehicle(self):
         """Get nearest vehicle within range"""
-        p = self.player
-        px, py = p.center
-        for vehicle in self.vehicles:
-            if math.hypot(px - vehicle.x, py - vehicle.y) < 80:
-                return vehicle
-        return None
+        vehicle, _ = self.query_nearest('vehicle', self.player.center, self.INTERACT_RANGE)
+        return vehicle
     
     def enter_building(self):
         p = self.player
         if p.inside:
             return
         
-        px, py = p.center
-        
-        for rect, center in self.crack_dens:
-            if math.hypot(px - center[0], py - center[1]) < 80:
-                p.inside = True
-                p.building_type = 'crack'
-                p.entry_pos = (p.x, p.y)
-                p.cooking = False
-                return
-        
-        for rect, center in self.strip_clubs:
-            if math.hypot(px - center[0], py - center[1]) < 80:
-                p.inside = True
-                p.building_type = 'strip'
-                p.entry_pos = (p.x, p.y)
-                # Init THE PIT challenge
-                p.rizz_sequence = [random.choice(['W', 'A', 'S', 'D']) for _ in range(8)]
-                p.rizz_index = 0
-                p.rizz_combo = 0
-                p.rizz_score = 0
-                p.rizz_timer = 120  # 2 seconds per key
-                p.rizz_message = "PROVE YOURSELF"
-                p.rizz_message_timer = 60
-                p.rizz_target = 400 + len(self.hoes) * 100  # Harder with more crew
-                return
-        
-        for rect, center in self.gunstores:
-            if math.hypot(px - center[0], py - center[1]) < 80:
-                p.inside = True
-                p.building_type = 'gun'
-                p.entry_pos = (p.x, p.y)
-                return
-        
-        for rect, center in self.upgrade_shops:
-            if math.hypot(px - center[0], py - center[1]) < 80:
-                p.inside = True
-                p.building_type = 'upgrade'
-                p.entry_pos = (p.x, p.y)
-                p.upgrade_selection = 0
-                return
-        
-        for rect, center in self.safe_houses:
-            if math.hypot(px - center[0], py - center[1]) < 80:
+        kind = None
+        for site, _ in self.SITES:
+            if self.query_nearest(site, p.center, self.INTERACT_RANGE)[0]:
+                kind = site
+                break
+        if kind is None:
+            # Dealer interaction
+            dealer = self.get_nearby_dealer()
+            if dealer:
                 p.inside = True
-                p.building_type = 'safe'
+                p.building_type = 'dealer'
                 p.entry_pos = (p.x, p.y)
-                p.safe_selection = 0
-                return
-        
-        # Dealer interaction
-        dealer = self.get_nearby_dealer()
-        if dealer:
-            p.inside = True
-            p.building_type = 'dealer'
-            p.entry_pos = (p.x, p.y)
-            p.current_dealer = dealer
-            p.dealer_selection = 0
+                p.current_dealer = dealer
+                p.dealer_selection = 0
             return
+        
+        p.inside = True
+        p.building_type = kind
+        p.entry_pos = (p.x, p.y)
+        if kind == 'crack':
+            p.cooking = False
+        elif kind == 'strip':
+            # Init THE PIT challenge
+            p.rizz_sequence = [self.economy_rng.choice(['W', 'A', 'S', 'D']) for _ in range(8)]
+            p.rizz_index = 0
+            p.rizz_combo = 0
+            p.rizz_score = 0
+            p.rizz_timer = 120  # 2 seconds per key
+            p.rizz_message = "PROVE YOURSELF"
+            p.rizz_message_timer = 60
+            p.rizz_target = 400 + len(self.hoes) * 100  # Harder with more crew
+        elif kind == 'gun':
+            p.gun_selection = 0
+        elif kind == 'upgrade':
+            p.upgrade_selection = 0
+        elif kind == 'safe':
+            p.safe_selection = 0
     
     def exit_building(self):
         p = self.player
@@ -1088,7 +2655,7 @@ class Game:
                 p.cooking = True
                 p.cook_stage = 0
                 p.cook_bar = 0.0
-                p.cook_target = random.uniform(0.3, 0.7)
+                p.cook_target = self.economy_rng.uniform(0.3, 0.7)
                 p.cook_zone = 0.15
                 p.cook_speed = 0.012
             else:
@@ -1103,7 +2670,7 @@ class Game:
                         self.exit_building()
                     else:
                         p.cook_bar = 0.0
-                        p.cook_target = random.uniform(0.2, 0.8)
+                        p.cook_target = self.economy_rng.uniform(0.2, 0.8)
                         p.cook_zone = max(0.08, p.cook_zone - 0.02)
                         p.cook_speed += 0.004
                 else:
@@ -1112,7 +2679,7 @@ class Game:
                     p.cook_bar = 0.0
                     p.cook_zone = 0.15
                     p.cook_speed = 0.012
-                    p.cook_target = random.uniform(0.3, 0.7)
+                    p.cook_target = self.economy_rng.uniform(0.3, 0.7)
         
         elif p.building_type == 'strip':
             # RIZZ BATTLE - This is handled in the main loop now
@@ -1278,6 +2845,9 @@ class Game:
     def update(self, dt):
         p = self.player
         
+        # Drop everything killed since the last tick
+        self.compact_entities()
+        
         if not p.alive:
             p.respawn_timer -= 1
             if p.respawn_timer <= 0:
@@ -1306,6 +2876,19 @@ class Game:
             if p.cook_bar > 1.0:
                 p.cook_bar = 0.0
         
+        # Rizz battle key timer
+        if p.inside and p.building_type == 'strip':
+            if len(p.rizz_sequence) > 0 and p.rizz_index < len(p.rizz_sequence):
+                p.rizz_timer -= 1
+                if p.rizz_timer <= 0:
+                    # TIME OUT - reset combo
+                    p.rizz_combo = 0
+                    p.rizz_timer = 120
+                    p.rizz_message = "TOO SLOW. PATHETIC."
+                    p.rizz_message_timer = 40
+            if p.rizz_message_timer > 0:
+                p.rizz_message_timer -= 1
+        
         # Hoe income
         for hoe in self.hoes:
             hoe.income_timer += 1
@@ -1325,7 +2908,100 @@ class Game:
         if p.inside:
             return
         
-        # Update cops
+        # Chasers path around buildings toward the player's tile
+        self.flow.update(*p.center)
+        
+        # NPC AI
+        self.update_cops()
+        self.update_civilians()
+        self.update_gangs()
+        
+        # NPCs are done moving this tick - refresh hit-test buckets
+        self.reindex()
+        
+        # Update particles
+        self.particles.update()
+        
+        self.update_rockets()
+        
+        self.update_police_cars()
+        
+        # Update day/night cycle
+        self.time_of_day = (self.time_of_day + 1) % self.day_length
+        
+        self.update_bullets()
+        
+        # Fade blood
+        if not self.headless:
+            self.blood.update()
+        
+        # Respawn cops if too few
+        if len(self.cops) < 5 + int(p.wanted * 2):
+            for _ in range(50):
+                angle = self.spawn_rng.random() * 6.28
+                dist = self.spawn_rng.randint(800, 1200)
+                x = p.x + math.cos(angle) * dist
+                y = p.y + math.sin(angle) * dist
+                x = max(100, min(MAP_W*TILE - 100, x))
+                y = max(100, min(MAP_H*TILE - 100, y))
+                if not self.collides(x, y, 40, 60):
+                    cop = Cop(x, y, rng=self.spawn_rng)
+                    cop.alert = p.wanted >= 2
+                    self.add_entity('cop', cop)
+                    break
+        
+        # Respawn civilians
+        if len(self.civilians) < 20:
+            for _ in range(50):
+                x = self.spawn_rng.randint(100, MAP_W*TILE - 100)
+                y = self.spawn_rng.randint(100, MAP_H*TILE - 100)
+                if not self.collides(x, y, 35, 55) and math.hypot(x - p.x, y - p.y) > 600:
+                    self.add_entity('civilian', Civilian(x, y, rng=self.spawn_rng))
+                    break
+        
+        # Spawn health pickups occasionally
+        if len(self.health_pickups) < 5 and self.spawn_rng.random() < 0.002:
+            for _ in range(50):
+                x = self.spawn_rng.randint(100, MAP_W*TILE - 100)
+                y = self.spawn_rng.randint(100, MAP_H*TILE - 100)
+                if not self.collides(x - 15, y - 15, 30, 30):
+                    self.health_pickups.append(HealthPickup(x, y, rng=self.spawn_rng))
+                    break
+        
+        # Collect health pickups
+        for hp in self.health_pickups:
+            hp.pulse = (hp.pulse + 0.1) % 6.28
+            if math.hypot(p.center[0] - hp.x, p.center[1] - hp.y) < 40:
+                if p.health < p.max_health:
+                    heal = min(hp.amount, p.max_health - p.health)
+                    p.health += heal
+                    self.spawn_message(hp.x, hp.y, f"+{heal} HP", C['green'])
+                    self.health_pickups.kill(hp)
+        
+        # Update floating texts
+        for ft in self.floating_texts:
+            ft['y'] += ft['vy']
+            ft['life'] -= 1
+            if ft['life'] <= 0:
+                self.floating_texts.kill(ft)
+        
+        # Update notification
+        if self.notification_timer > 0:
+            self.notification_timer -= 1
+            if self.notification_timer <= 0:
+                self.notification = None
+        
+        # Update game time
+        self.game_time += 1
+        
+        # Check win condition
+        if p.total_earned >= self.win_goal and not self.game_won:
+            self.game_won = True
+            self.show_notification("EMPIRE BUILT. YOU RUN THESE STREETS. ESC for stats", 300)
+    
+    def update_cops(self):
+        """Cops chase and shoot at a wanted player, or patrol"""
+        p = self.player
         for cop in self.cops:
             dist = math.hypot(p.x - cop.x, p.y - cop.y)
             
@@ -1343,11 +3019,16 @@ class Game:
                 speed = 2.8 if p.wanted >= 4 else 1.8  # Slower cops
                 
                 # Cops get tired sometimes
-                if random.random() < 0.1:
+                if self.ai_rng.random() < 0.1:
                     speed *= 0.5  # Donut break
                 
-                nx = cop.x + dx/d * speed
-                ny = cop.y + dy/d * speed
+                mx, my, md = dx, dy, d
+                step = self.flow.step_toward(*cop.center)
+                if step:
+                    mx, my = step[0] - cop.center[0], step[1] - cop.center[1]
+                    md = math.hypot(mx, my) + 0.1
+                nx = cop.x + mx/md * speed
+                ny = cop.y + my/md * speed
                 
                 if not self.collides(nx, cop.y, cop.w, cop.h):
                     cop.x = nx
@@ -1357,9 +3038,9 @@ class Game:
                 # Shoot at player (cops have bad aim and shoot less often)
                 cop.shoot_timer += 1
                 if cop.shoot_timer > 90 and dist < 350:  # Slower shooting, shorter range
-                    a = math.atan2(dy, dx) + random.uniform(-0.25, 0.25)  # Terrible aim
+                    a = math.atan2(dy, dx) + self.ai_rng.uniform(-0.25, 0.25)  # Terrible aim
                     self.bullets.append(Bullet(cop.x + cop.w//2, cop.y + cop.h//2, a, 'cop'))
-                    cop.shoot_timer = random.randint(-30, 0)  # Random delay
+                    cop.shoot_timer = self.ai_rng.randint(-30, 0)  # Random delay
             else:
                 # Patrol (or eat donuts)
                 cop.angle += 0.015
@@ -1367,65 +3048,79 @@ class Game:
                 ny = cop.y + math.sin(cop.angle) * 1.0
                 if not self.collides(nx, ny, cop.w, cop.h):
                     cop.x, cop.y = nx, ny
-        
-        # Update civilians
-        for civ in self.civilians:
-            dist = math.hypot(p.x - civ.x, p.y - civ.y)
-            
-            # Scare civilians if shooting or wanted
-            if p.wanted >= 1 and dist < 300:
-                civ.scared = True
-                civ.scared_timer = 180
-            
-            if civ.scared and civ.scared_timer > 0:
-                civ.scared_timer -= 1
-                # Run away from player
-                dx = civ.x - p.x
-                dy = civ.y - p.y
-                d = dist + 0.1
-                nx = civ.x + dx/d * 4
-                ny = civ.y + dy/d * 4
-                if not self.collides(nx, ny, civ.w, civ.h):
-                    civ.x, civ.y = nx, ny
-            else:
-                civ.scared = False
-                # Random walking
-                civ.move_timer -= 1
-                if civ.move_timer <= 0:
-                    civ.angle = random.random() * 6.28
-                    civ.move_timer = random.randint(60, 180)
+    
+    def update_civilians(self):
+        """Pedestrians wander, or flee a wanted player"""
+        p = self.player
+        if CROWD_STORE:
+            self.civilians.update(p, self.occupancy)
+        else:
+            for civ in self.civilians:
+                dist = math.hypot(p.x - civ.x, p.y - civ.y)
                 
-                nx = civ.x + math.cos(civ.angle) * 1
-                ny = civ.y + math.sin(civ.angle) * 1
-                if not self.collides(nx, ny, civ.w, civ.h):
-                    civ.x, civ.y = nx, ny
-        
-        # Update gang members
-        for gang in self.gang_members[:]:
+                # Scare civilians if shooting or wanted
+                if p.wanted >= 1 and dist < 300:
+                    civ.scared = True
+                    civ.scared_timer = 180
+                
+                if civ.scared and civ.scared_timer > 0:
+                    civ.scared_timer -= 1
+                    # Run away from player
+                    dx = civ.x - p.x
+                    dy = civ.y - p.y
+                    d = dist + 0.1
+                    nx = civ.x + dx/d * 4
+                    ny = civ.y + dy/d * 4
+                    if not self.collides(nx, ny, civ.w, civ.h):
+                        civ.x, civ.y = nx, ny
+                else:
+                    civ.scared = False
+                    # Random walking
+                    civ.move_timer -= 1
+                    if civ.move_timer <= 0:
+                        civ.angle = self.ai_rng.random() * 6.28
+                        civ.move_timer = self.ai_rng.randint(60, 180)
+                
+                    nx = civ.x + math.cos(civ.angle) * 1
+                    ny = civ.y + math.sin(civ.angle) * 1
+                    if not self.collides(nx, ny, civ.w, civ.h):
+                        civ.x, civ.y = nx, ny
+    
+    def update_gangs(self):
+        """Gang members hunt rival gangs (and a hated player), or patrol"""
+        p = self.player
+        for gang in self.gang_members:
             # Find targets (other gang members or player if hostile)
             gang.shoot_timer += 1
             
             # Check if player is hostile to this gang
             player_hostile = p.gang_rep.get(gang.gang, 0) < -30
             
-            # Find nearest enemy
-            nearest_enemy = None
+            # Keep the current target until it dies or leaves range, and
+            # only search for a closer one every RETARGET_TICKS
+            nearest_enemy = gang.target
             nearest_dist = 400
+            lost = False
+            if nearest_enemy is p:
+                lost = not p.alive or not player_hostile
+            elif nearest_enemy is not None:
+                lost = nearest_enemy.health <= 0
+            if nearest_enemy is not None and not lost:
+                nearest_dist = math.hypot(nearest_enemy.x - gang.x, nearest_enemy.y - gang.y)
+                lost = nearest_dist >= 400
             
-            # Check other gang members
-            for other in self.gang_members:
-                if other.gang != gang.gang:
-                    dist = math.hypot(other.x - gang.x, other.y - gang.y)
-                    if dist < nearest_dist:
-                        nearest_enemy = other
-                        nearest_dist = dist
-            
-            # Check player if hostile
-            if player_hostile:
-                player_dist = math.hypot(p.x - gang.x, p.y - gang.y)
-                if player_dist < nearest_dist:
-                    nearest_enemy = p
-                    nearest_dist = player_dist
+            gang.retarget_timer -= 1
+            if lost or gang.retarget_timer <= 0:
+                gang.retarget_timer = GangMember.RETARGET_TICKS
+                nearest_enemy, nearest_dist = self.nearest_hostile(gang)
+                
+                # Check player if hostile
+                if player_hostile:
+                    player_dist = math.hypot(p.x - gang.x, p.y - gang.y)
+                    if player_dist < nearest_dist:
+                        nearest_enemy = p
+                        nearest_dist = player_dist
+            gang.target = nearest_enemy
             
             if nearest_enemy and nearest_dist < 350:
                 gang.alert = True
@@ -1433,14 +3128,19 @@ class Game:
                 dx = nearest_enemy.x - gang.x
                 dy = nearest_enemy.y - gang.y
                 d = nearest_dist + 0.1
-                nx = gang.x + dx/d * 2
-                ny = gang.y + dy/d * 2
+                mx, my, md = dx, dy, d
+                step = self.flow.step_toward(*gang.center) if nearest_enemy is p else None
+                if step:
+                    mx, my = step[0] - gang.center[0], step[1] - gang.center[1]
+                    md = math.hypot(mx, my) + 0.1
+                nx = gang.x + mx/md * 2
+                ny = gang.y + my/md * 2
                 if not self.collides(nx, ny, gang.w, gang.h):
                     gang.x, gang.y = nx, ny
                 
                 # Shoot at enemy
                 if gang.shoot_timer > 45 and nearest_dist < 300:
-                    angle = math.atan2(dy, dx) + random.uniform(-0.15, 0.15)
+                    angle = math.atan2(dy, dx) + self.ai_rng.uniform(-0.15, 0.15)
                     self.bullets.append(Bullet(gang.center[0], gang.center[1], angle, f'gang_{gang.gang}'))
                     gang.shoot_timer = 0
             else:
@@ -1451,47 +3151,45 @@ class Game:
                 ny = gang.y + math.sin(gang.patrol_angle) * 1
                 if not self.collides(nx, ny, gang.w, gang.h):
                     gang.x, gang.y = nx, ny
-        
-        # Update particles
-        for particle in self.particles[:]:
-            particle.update()
-            if particle.life <= 0:
-                self.particles.remove(particle)
-        
-        # Update rockets (RPG)
-        for rocket in self.rockets[:]:
+    
+    def update_rockets(self):
+        """Fly RPG rockets and blow them up on whatever they hit"""
+        for rocket in self.rockets:
             rocket['x'] += rocket['vx']
             rocket['y'] += rocket['vy']
             rocket['life'] -= 1
             
             # Spawn smoke trail
-            if random.random() < 0.5:
+            if self.fx_rng.random() < 0.5:
                 self.spawn_particles(rocket['x'], rocket['y'], 'smoke', 1)
             
             # Check collision with buildings or expired
             if rocket['life'] <= 0 or self.collides(rocket['x'] - 5, rocket['y'] - 5, 10, 10):
                 # Explode!
                 self.create_explosion(rocket['x'], rocket['y'])
-                self.rockets.remove(rocket)
+                self.rockets.kill(rocket)
                 continue
             
             # Check collision with cops
-            for cop in self.cops[:]:
+            for cop in self.grids['cop'].query_radius(rocket['x'], rocket['y'], 40):
                 if math.hypot(cop.center[0] - rocket['x'], cop.center[1] - rocket['y']) < 40:
                     self.create_explosion(rocket['x'], rocket['y'])
-                    self.rockets.remove(rocket)
+                    self.rockets.kill(rocket)
                     break
+            if not self.rockets.alive(rocket):
+                continue
             
             # Check collision with vehicles
-            for vehicle in self.vehicles[:]:
+            for vehicle in self.grids['vehicle'].query_radius(rocket['x'], rocket['y'], 50):
                 if math.hypot(vehicle.x - rocket['x'], vehicle.y - rocket['y']) < 50:
                     self.create_explosion(rocket['x'], rocket['y'])
-                    if rocket in self.rockets:
-                        self.rockets.remove(rocket)
+                    self.rockets.kill(rocket)
                     break
-        
-        # Update police cars
-        for pcar in self.police_cars[:]:
+    
+    def update_police_cars(self):
+        """Police cars run down a wanted player, or cruise"""
+        p = self.player
+        for pcar in self.police_cars:
             # Chase player if wanted level is high enough
             if p.wanted >= 3 and not p.in_vehicle:
                 pcar['chasing'] = True
@@ -1532,285 +3230,146 @@ class Game:
             # Keep in bounds
             pcar['x'] = max(100, min(MAP_W*TILE - 100, pcar['x']))
             pcar['y'] = max(100, min(MAP_H*TILE - 100, pcar['y']))
-        
-        # Update day/night cycle
-        self.time_of_day = (self.time_of_day + 1) % self.day_length
-        
-        # Update bullets
-        for b in self.bullets[:]:
+    
+    def update_bullets(self):
+        """Move bullets along the whole segment they cover this tick, so fast shots can't tunnel"""
+        for b in self.bullets:
+            x0, y0 = b.x, b.y
             b.x += b.vx
             b.y += b.vy
             b.life -= 1
             
-            # Remove if expired or hit building
-            if b.life <= 0 or self.collides(b.x - 4, b.y - 4, 8, 8):
-                self.bullets.remove(b)
+            # Remove if expired
+            if b.life <= 0:
+                self.bullets.kill(b)
                 continue
             
-            # Hit player
-            if b.owner == 'cop':
-                if abs(b.x - p.center[0]) < 25 and abs(b.y - p.center[1]) < 35:
-                    # Apply armor damage reduction
-                    base_damage = 25
-                    actual_damage = int(base_damage * (1 - p.armor / 100))
-                    p.health -= actual_damage
-                    p.damage_flash = 10  # Screen flash effect
-                    self.spawn_blood(b.x, b.y, 10)
-                    self.bullets.remove(b)
-                    if p.health <= 0:
-                        p.alive = False
-                        p.respawn_timer = 180
-                        self.spawn_blood(p.center[0], p.center[1], 50)
-                    continue
-            
-            # Hit cops
-            if b.owner == 'player':
-                for cop in self.cops[:]:
-                    if abs(b.x - cop.center[0]) < 25 and abs(b.y - cop.center[1]) < 35:
-                        # Apply damage multiplier and bonus
-                        base_damage = 35 + b.damage_bonus
-                        actual_damage = int(base_damage * p.damage_mult)
-                        cop.health -= actual_damage
-                        cop.alert = True
-                        self.spawn_blood(b.x, b.y, 12)
-                        self.spawn_particles(b.x, b.y, 'spark', 3)
-                        if b in self.bullets:
-                            self.bullets.remove(b)
-                        if cop.health <= 0:
-                            self.cops.remove(cop)
-                            self.spawn_blood(cop.center[0], cop.center[1], 35)
-                            p.wanted = min(5, p.wanted + 1)
-                            cash = random.randint(20, 50)
-                            p.cash += cash
-                            p.kills += 1
-                            p.total_earned += cash
-                            # Aggressive kill messages
-                            kill_msgs = [
-                                f"+${cash} SMOKED", f"+${cash} BODIED", 
-                                f"+${cash} DROPPED", f"+${cash} ELIMINATED",
-                                f"+${cash} CLAPPED", f"+${cash} SENT TO GOD",
-                                f"+${cash} WRECKED", f"+${cash} OBLITERATED"
-                            ]
-                            self.spawn_message(cop.center[0], cop.center[1] - 30, 
-                                             random.choice(kill_msgs), C['gold'])
-                        break
-                
-                # Hit gang members
-                for gang in self.gang_members[:]:
-                    if abs(b.x - gang.center[0]) < 22 and abs(b.y - gang.center[1]) < 32:
-                        base_damage = 35 + b.damage_bonus
-                        actual_damage = int(base_damage * p.damage_mult)
-                        gang.health -= actual_damage
-                        self.spawn_blood(b.x, b.y, 12)
-                        self.spawn_particles(b.x, b.y, 'spark', 3)
-                        # Decrease reputation with this gang
-                        p.gang_rep[gang.gang] = max(-100, p.gang_rep[gang.gang] - 10)
-                        if b in self.bullets:
-                            self.bullets.remove(b)
-                        if gang.health <= 0:
-                            self.gang_members.remove(gang)
-                            self.spawn_blood(gang.center[0], gang.center[1], 35)
-                            cash = random.randint(30, 80)
-                            p.cash += cash
-                            p.gang_kills += 1
-                            p.total_earned += cash
-                            # Aggressive gang kill messages
-                            gang_msgs = [
-                                f"+${cash} PACKED UP", f"+${cash} OPP DOWN",
-                                f"+${cash} EXTERMINATED", f"+${cash} NO MERCY",
-                                f"+${cash} CAUGHT LACKING", f"+${cash} DELETED"
-                            ]
-                            self.spawn_message(gang.center[0], gang.center[1] - 30,
-                                             random.choice(gang_msgs), C['gold'])
-                        break
-                
-                # Hit civilians
-                for civ in self.civilians[:]:
-                    if abs(b.x - civ.center[0]) < 20 and abs(b.y - civ.center[1]) < 30:
-                        self.civilians.remove(civ)
-                        self.spawn_blood(b.x, b.y, 20)
-                        if b in self.bullets:
-                            self.bullets.remove(b)
-                        p.wanted = min(5, p.wanted + 0.5)
-                        p.cash += random.randint(5, 30)
-                        # Scare nearby civilians
-                        for c in self.civilians:
-                            if math.hypot(c.x - civ.x, c.y - civ.y) < 200:
-                                c.scared = True
-                                c.scared_timer = 180
-                        break
-            
-            # Gang bullets hitting player
-            if b.owner.startswith('gang_'):
-                if abs(b.x - p.center[0]) < 25 and abs(b.y - p.center[1]) < 35:
-                    base_damage = 20
-                    actual_damage = int(base_damage * (1 - p.armor / 100))
-                    p.health -= actual_damage
-                    p.damage_flash = 10
-                    self.spawn_blood(b.x, b.y, 8)
-                    if b in self.bullets:
-                        self.bullets.remove(b)
-                    if p.health <= 0:
-                        p.alive = False
-                        p.respawn_timer = 180
-                        self.spawn_blood(p.center[0], p.center[1], 50)
-                    continue
-                
-                # Gang bullets hitting other gang members
-                shooter_gang = b.owner.split('_')[1]
-                for gang in self.gang_members[:]:
-                    if gang.gang != shooter_gang:
-                        if abs(b.x - gang.center[0]) < 22 and abs(b.y - gang.center[1]) < 32:
-                            gang.health -= 25
-                            self.spawn_blood(b.x, b.y, 10)
-                            if b in self.bullets:
-                                self.bullets.remove(b)
-                            if gang.health <= 0:
-                                self.gang_members.remove(gang)
-                                self.spawn_blood(gang.center[0], gang.center[1], 30)
-                            break
-        
-        # Decay blood
-        for b in self.blood[:]:
-            b['life'] -= 1
-            if b['life'] <= 0:
-                self.blood.remove(b)
-        
-        # Respawn cops if too few
-        if len(self.cops) < 5 + int(p.wanted * 2):
-            for _ in range(50):
-                angle = random.random() * 6.28
-                dist = random.randint(800, 1200)
-                x = p.x + math.cos(angle) * dist
-                y = p.y + math.sin(angle) * dist
-                x = max(100, min(MAP_W*TILE - 100, x))
-                y = max(100, min(MAP_H*TILE - 100, y))
-                if not self.collides(x, y, 40, 60):
-                    cop = Cop(x, y)
-                    cop.alert = p.wanted >= 2
-                    self.cops.append(cop)
-                    break
-        
-        # Respawn civilians
-        if len(self.civilians) < 20:
-            for _ in range(50):
-                x = random.randint(100, MAP_W*TILE - 100)
-                y = random.randint(100, MAP_H*TILE - 100)
-                if not self.collides(x, y, 35, 55) and math.hypot(x - p.x, y - p.y) > 600:
-                    self.civilians.append(Civilian(x, y))
-                    break
-        
-        # Spawn health pickups occasionally
-        if len(self.health_pickups) < 5 and random.random() < 0.002:
-            for _ in range(50):
-                x = random.randint(100, MAP_W*TILE - 100)
-                y = random.randint(100, MAP_H*TILE - 100)
-                if not self.collides(x - 15, y - 15, 30, 30):
-                    self.health_pickups.append(HealthPickup(x, y))
-                    break
-        
-        # Collect health pickups
-        for hp in self.health_pickups[:]:
-            if math.hypot(p.center[0] - hp.x, p.center[1] - hp.y) < 40:
-                if p.health < p.max_health:
-                    heal = min(hp.amount, p.max_health - p.health)
-                    p.health += heal
-                    self.spawn_message(hp.x, hp.y, f"+{heal} HP", C['green'])
-                    self.health_pickups.remove(hp)
-        
-        # Update floating texts
-        if hasattr(self, 'floating_texts'):
-            for ft in self.floating_texts[:]:
-                ft['y'] += ft['vy']
-                ft['life'] -= 1
-                if ft['life'] <= 0:
-                    self.floating_texts.remove(ft)
-        
-        # Update notification
-        if self.notification_timer > 0:
-            self.notification_timer -= 1
-            if self.notification_timer <= 0:
-                self.notification = None
-        
-        # Update game time
-        self.game_time += 1
-        
-        # Check win condition
-        if p.total_earned >= self.win_goal and not self.game_won:
-            self.game_won = True
-            self.show_notification("EMPIRE BUILT. YOU RUN THESE STREETS. ESC for stats", 300)
+            wall_t = self.occupancy.raycast(x0, y0, b.x, b.y)
+            hit = self.sweep_bullet(b, x0, y0, 1.0 if wall_t is None else wall_t)
+            if hit is not None:
+                kind, target, t = hit
+                # Effects go where the bullet actually struck
+                b.x, b.y = x0 + b.vx * t, y0 + b.vy * t
+                self.bullets.kill(b)
+                self.bullet_hit(b, kind, target)
+            elif wall_t is not None:
+                self.bullets.kill(b)
     
     def draw_person(self, x, y, body_color, skin_color=(255, 220, 190), shirt_color=None, 
                     pants_color=(40, 40, 50), hair_color=(30, 20, 10), facing=0, scale=1.0):
-        """Draw a humanoid figure at position x,y"""
+        """Blit a cached humanoid figure at position x,y"""
+        if shirt_color is None:
+            shirt_color = body_color
+        return self.blit_sprite(('person', skin_color, shirt_color, pants_color, hair_color, facing, scale), x, y)
+    
+    def draw_cop_person(self, x, y, scale=1.0):
+        """Blit a cached cop at position x,y"""
+        return self.blit_sprite(('cop', scale), x, y)
+    
+    def draw_gang_member(self, x, y, gang_color, scale=1.0):
+        """Blit a cached gang member in their color at position x,y"""
+        return self.blit_sprite(('gang', gang_color, scale), x, y)
+    
+    def draw_player_character(self, x, y, scale=1.0):
+        """Blit the cached player character at position x,y"""
+        return self.blit_sprite(('player', scale), x, y)
+    
+    def blit_sprite(self, key, x, y):
+        """Blit a character sprite with its figure origin at x,y; returns (head center x, head y)"""
+        pad = self.SPRITE_PAD
+        self.screen.blit(self.sprites.get(key), (x - pad, y - pad))
+        s = key[-1]
+        return x + 20 * s, y + 10 * s
+    
+    def render_sprite(self, key):
+        """Draw one character archetype/colors/scale combination onto its own surface"""
+        kind, s = key[0], key[-1]
+        pad = self.SPRITE_PAD
+        sprite = pygame.Surface((int(40 * s) + pad * 2, int(66 * s) + pad * 2), pygame.SRCALPHA)
+        if kind == 'person':
+            skin, shirt, pants, hair, facing = key[1:6]
+            self.render_person(sprite, pad, pad, shirt, skin, shirt, pants, hair, facing, s)
+        elif kind == 'cop':
+            self.render_cop_person(sprite, pad, pad, s)
+        elif kind == 'gang':
+            self.render_gang_member(sprite, pad, pad, key[1], s)
+        else:
+            self.render_player_character(sprite, pad, pad, s)
+        if pygame.display.get_surface():
+            sprite = sprite.convert_alpha()
+        return sprite
+    
+    def render_person(self, surf, x, y, body_color, skin_color=(255, 220, 190), shirt_color=None, 
+                    pants_color=(40, 40, 50), hair_color=(30, 20, 10), facing=0, scale=1.0):
+        """Draw a humanoid figure at position x,y onto surf"""
         if shirt_color is None:
             shirt_color = body_color
         s = scale
         cx = x + 20 * s
         
         # Shadow
-        pygame.draw.ellipse(screen, (20, 20, 30), (x + 5*s, y + 55*s, 30*s, 10*s))
+        pygame.draw.ellipse(surf, (20, 20, 30), (x + 5*s, y + 55*s, 30*s, 10*s))
         
         # Legs
         leg_width = 8 * s
         leg_height = 22 * s
         leg_y = y + 38 * s
-        pygame.draw.rect(screen, pants_color, (cx - 10*s, leg_y, leg_width, leg_height))
-        pygame.draw.rect(screen, (0, 0, 0), (cx - 10*s, leg_y, leg_width, leg_height), 1)
-        pygame.draw.rect(screen, (20, 20, 20), (cx - 11*s, leg_y + leg_height - 4*s, leg_width + 2*s, 5*s))
-        pygame.draw.rect(screen, pants_color, (cx + 2*s, leg_y, leg_width, leg_height))
-        pygame.draw.rect(screen, (0, 0, 0), (cx + 2*s, leg_y, leg_width, leg_height), 1)
-        pygame.draw.rect(screen, (20, 20, 20), (cx + 1*s, leg_y + leg_height - 4*s, leg_width + 2*s, 5*s))
+        pygame.draw.rect(surf, pants_color, (cx - 10*s, leg_y, leg_width, leg_height))
+        pygame.draw.rect(surf, (0, 0, 0), (cx - 10*s, leg_y, leg_width, leg_height), 1)
+        pygame.draw.rect(surf, (20, 20, 20), (cx - 11*s, leg_y + leg_height - 4*s, leg_width + 2*s, 5*s))
+        pygame.draw.rect(surf, pants_color, (cx + 2*s, leg_y, leg_width, leg_height))
+        pygame.draw.rect(surf, (0, 0, 0), (cx + 2*s, leg_y, leg_width, leg_height), 1)
+        pygame.draw.rect(surf, (20, 20, 20), (cx + 1*s, leg_y + leg_height - 4*s, leg_width + 2*s, 5*s))
         
         # Torso
         torso_width = 22 * s
         torso_height = 20 * s
         torso_x = cx - torso_width/2
         torso_y = y + 18 * s
-        pygame.draw.rect(screen, shirt_color, (torso_x, torso_y, torso_width, torso_height))
-        pygame.draw.rect(screen, (0, 0, 0), (torso_x, torso_y, torso_width, torso_height), 1)
+        pygame.draw.rect(surf, shirt_color, (torso_x, torso_y, torso_width, torso_height))
+        pygame.draw.rect(surf, (0, 0, 0), (torso_x, torso_y, torso_width, torso_height), 1)
         
         # Arms
         arm_width = 6 * s
         arm_height = 18 * s
         arm_y = y + 20 * s
-        pygame.draw.rect(screen, shirt_color, (torso_x - arm_width, arm_y, arm_width, arm_height * 0.6))
-        pygame.draw.rect(screen, skin_color, (torso_x - arm_width, arm_y + arm_height * 0.6, arm_width, arm_height * 0.4))
-        pygame.draw.rect(screen, (0, 0, 0), (torso_x - arm_width, arm_y, arm_width, arm_height), 1)
-        pygame.draw.rect(screen, shirt_color, (torso_x + torso_width, arm_y, arm_width, arm_height * 0.6))
-        pygame.draw.rect(screen, skin_color, (torso_x + torso_width, arm_y + arm_height * 0.6, arm_width, arm_height * 0.4))
-        pygame.draw.rect(screen, (0, 0, 0), (torso_x + torso_width, arm_y, arm_width, arm_height), 1)
+        pygame.draw.rect(surf, shirt_color, (torso_x - arm_width, arm_y, arm_width, arm_height * 0.6))
+        pygame.draw.rect(surf, skin_color, (torso_x - arm_width, arm_y + arm_height * 0.6, arm_width, arm_height * 0.4))
+        pygame.draw.rect(surf, (0, 0, 0), (torso_x - arm_width, arm_y, arm_width, arm_height), 1)
+        pygame.draw.rect(surf, shirt_color, (torso_x + torso_width, arm_y, arm_width, arm_height * 0.6))
+        pygame.draw.rect(surf, skin_color, (torso_x + torso_width, arm_y + arm_height * 0.6, arm_width, arm_height * 0.4))
+        pygame.draw.rect(surf, (0, 0, 0), (torso_x + torso_width, arm_y, arm_width, arm_height), 1)
         
         # Neck
-        pygame.draw.rect(screen, skin_color, (cx - 4*s, y + 14*s, 8*s, 4*s))
+        pygame.draw.rect(surf, skin_color, (cx - 4*s, y + 14*s, 8*s, 4*s))
         
         # Head
         head_radius = 10 * s
         head_y = y + 10 * s
-        pygame.draw.circle(screen, skin_color, (int(cx), int(head_y)), int(head_radius))
-        pygame.draw.circle(screen, (0, 0, 0), (int(cx), int(head_y)), int(head_radius), 1)
+        pygame.draw.circle(surf, skin_color, (int(cx), int(head_y)), int(head_radius))
+        pygame.draw.circle(surf, (0, 0, 0), (int(cx), int(head_y)), int(head_radius), 1)
         
         # Hair
         hair_points = [(cx - 9*s, head_y - 2*s), (cx - 7*s, head_y - 10*s), (cx, head_y - 12*s),
                       (cx + 7*s, head_y - 10*s), (cx + 9*s, head_y - 2*s)]
-        pygame.draw.polygon(screen, hair_color, hair_points)
+        pygame.draw.polygon(surf, hair_color, hair_points)
         
         # Eyes
         eye_y = head_y - 1 * s
-        pygame.draw.circle(screen, (255, 255, 255), (int(cx - 4*s), int(eye_y)), int(3*s))
-        pygame.draw.circle(screen, (255, 255, 255), (int(cx + 4*s), int(eye_y)), int(3*s))
-        pygame.draw.circle(screen, (30, 30, 30), (int(cx - 4*s), int(eye_y)), int(1.5*s))
-        pygame.draw.circle(screen, (30, 30, 30), (int(cx + 4*s), int(eye_y)), int(1.5*s))
+        pygame.draw.circle(surf, (255, 255, 255), (int(cx - 4*s), int(eye_y)), int(3*s))
+        pygame.draw.circle(surf, (255, 255, 255), (int(cx + 4*s), int(eye_y)), int(3*s))
+        pygame.draw.circle(surf, (30, 30, 30), (int(cx - 4*s), int(eye_y)), int(1.5*s))
+        pygame.draw.circle(surf, (30, 30, 30), (int(cx + 4*s), int(eye_y)), int(1.5*s))
         
         return cx, head_y
     
-    def draw_cop_person(self, x, y, scale=1.0):
+    def render_cop_person(self, surf, x, y, scale=1.0):
         """Draw a cop with uniform"""
         s = scale
         cx = x + 20 * s
         
         # Shadow
-        pygame.draw.ellipse(screen, (20, 20, 30), (x + 5*s, y + 55*s, 30*s, 10*s))
+        pygame.draw.ellipse(surf, (20, 20, 30), (x + 5*s, y + 55*s, 30*s, 10*s))
         
         # Legs
         leg_width = 8 * s
@@ -1818,13 +3377,13 @@ class Game:
         leg_y = y + 38 * s
         pants = (30, 40, 70)  # Navy pants
         
-        pygame.draw.rect(screen, pants, (cx - 10*s, leg_y, leg_width, leg_height))
-        pygame.draw.rect(screen, (0, 0, 0), (cx - 10*s, leg_y, leg_width, leg_height), 1)
-        pygame.draw.rect(screen, (20, 20, 20), (cx - 11*s, leg_y + leg_height - 4*s, leg_width + 2*s, 5*s))
+        pygame.draw.rect(surf, pants, (cx - 10*s, leg_y, leg_width, leg_height))
+        pygame.draw.rect(surf, (0, 0, 0), (cx - 10*s, leg_y, leg_width, leg_height), 1)
+        pygame.draw.rect(surf, (20, 20, 20), (cx - 11*s, leg_y + leg_height - 4*s, leg_width + 2*s, 5*s))
         
-        pygame.draw.rect(screen, pants, (cx + 2*s, leg_y, leg_width, leg_height))
-        pygame.draw.rect(screen, (0, 0, 0), (cx + 2*s, leg_y, leg_width, leg_height), 1)
-        pygame.draw.rect(screen, (20, 20, 20), (cx + 1*s, leg_y + leg_height - 4*s, leg_width + 2*s, 5*s))
+        pygame.draw.rect(surf, pants, (cx + 2*s, leg_y, leg_width, leg_height))
+        pygame.draw.rect(surf, (0, 0, 0), (cx + 2*s, leg_y, leg_width, leg_height), 1)
+        pygame.draw.rect(surf, (20, 20, 20), (cx + 1*s, leg_y + leg_height - 4*s, leg_width + 2*s, 5*s))
         
         # Torso - blue uniform
         shirt = (40, 60, 120)
@@ -1832,11 +3391,11 @@ class Game:
         torso_height = 20 * s
         torso_x = cx - torso_width/2
         torso_y = y + 18 * s
-        pygame.draw.rect(screen, shirt, (torso_x, torso_y, torso_width, torso_height))
-        pygame.draw.rect(screen, (0, 0, 0), (torso_x, torso_y, torso_width, torso_height), 1)
+        pygame.draw.rect(surf, shirt, (torso_x, torso_y, torso_width, torso_height))
+        pygame.draw.rect(surf, (0, 0, 0), (torso_x, torso_y, torso_width, torso_height), 1)
         
         # Badge
-        pygame.draw.circle(screen, C['gold'], (int(torso_x + 6*s), int(torso_y + 6*s)), int(4*s))
+        pygame.draw.circle(surf, C['gold'], (int(torso_x + 6*s), int(torso_y + 6*s)), int(4*s))
         
         # Arms
         arm_width = 6 * s
@@ -1844,44 +3403,44 @@ class Game:
         arm_y = y + 20 * s
         skin = (255, 220, 190)
         
-        pygame.draw.rect(screen, shirt, (torso_x - arm_width, arm_y, arm_width, arm_height * 0.6))
-        pygame.draw.rect(screen, skin, (torso_x - arm_width, arm_y + arm_height * 0.6, arm_width, arm_height * 0.4))
-        pygame.draw.rect(screen, (0, 0, 0), (torso_x - arm_width, arm_y, arm_width, arm_height), 1)
+        pygame.draw.rect(surf, shirt, (torso_x - arm_width, arm_y, arm_width, arm_height * 0.6))
+        pygame.draw.rect(surf, skin, (torso_x - arm_width, arm_y + arm_height * 0.6, arm_width, arm_height * 0.4))
+        pygame.draw.rect(surf, (0, 0, 0), (torso_x - arm_width, arm_y, arm_width, arm_height), 1)
         
-        pygame.draw.rect(screen, shirt, (torso_x + torso_width, arm_y, arm_width, arm_height * 0.6))
-        pygame.draw.rect(screen, skin, (torso_x + torso_width, arm_y + arm_height * 0.6, arm_width, arm_height * 0.4))
-        pygame.draw.rect(screen, (0, 0, 0), (torso_x + torso_width, arm_y, arm_width, arm_height), 1)
+        pygame.draw.rect(surf, shirt, (torso_x + torso_width, arm_y, arm_width, arm_height * 0.6))
+        pygame.draw.rect(surf, skin, (torso_x + torso_width, arm_y + arm_height * 0.6, arm_width, arm_height * 0.4))
+        pygame.draw.rect(surf, (0, 0, 0), (torso_x + torso_width, arm_y, arm_width, arm_height), 1)
         
         # Neck
-        pygame.draw.rect(screen, skin, (cx - 4*s, y + 14*s, 8*s, 4*s))
+        pygame.draw.rect(surf, skin, (cx - 4*s, y + 14*s, 8*s, 4*s))
         
         # Head
         head_radius = 10 * s
         head_y = y + 10 * s
-        pygame.draw.circle(screen, skin, (int(cx), int(head_y)), int(head_radius))
-        pygame.draw.circle(screen, (0, 0, 0), (int(cx), int(head_y)), int(head_radius), 1)
+        pygame.draw.circle(surf, skin, (int(cx), int(head_y)), int(head_radius))
+        pygame.draw.circle(surf, (0, 0, 0), (int(cx), int(head_y)), int(head_radius), 1)
         
         # Cop hat
-        pygame.draw.rect(screen, (30, 40, 70), (cx - 12*s, head_y - 14*s, 24*s, 8*s))
-        pygame.draw.rect(screen, (20, 30, 50), (cx - 14*s, head_y - 8*s, 28*s, 4*s))
-        pygame.draw.rect(screen, C['gold'], (cx - 4*s, head_y - 12*s, 8*s, 4*s))  # Badge on hat
+        pygame.draw.rect(surf, (30, 40, 70), (cx - 12*s, head_y - 14*s, 24*s, 8*s))
+        pygame.draw.rect(surf, (20, 30, 50), (cx - 14*s, head_y - 8*s, 28*s, 4*s))
+        pygame.draw.rect(surf, C['gold'], (cx - 4*s, head_y - 12*s, 8*s, 4*s))  # Badge on hat
         
         # Eyes
         eye_y = head_y - 1 * s
-        pygame.draw.circle(screen, (255, 255, 255), (int(cx - 4*s), int(eye_y)), int(3*s))
-        pygame.draw.circle(screen, (255, 255, 255), (int(cx + 4*s), int(eye_y)), int(3*s))
-        pygame.draw.circle(screen, (30, 30, 30), (int(cx - 4*s), int(eye_y)), int(1.5*s))
-        pygame.draw.circle(screen, (30, 30, 30), (int(cx + 4*s), int(eye_y)), int(1.5*s))
+        pygame.draw.circle(surf, (255, 255, 255), (int(cx - 4*s), int(eye_y)), int(3*s))
+        pygame.draw.circle(surf, (255, 255, 255), (int(cx + 4*s), int(eye_y)), int(3*s))
+        pygame.draw.circle(surf, (30, 30, 30), (int(cx - 4*s), int(eye_y)), int(1.5*s))
+        pygame.draw.circle(surf, (30, 30, 30), (int(cx + 4*s), int(eye_y)), int(1.5*s))
         
         return cx, head_y
     
-    def draw_gang_member(self, x, y, gang_color, scale=1.0):
+    def render_gang_member(self, surf, x, y, gang_color, scale=1.0):
         """Draw a gang member with their color"""
         s = scale
         cx = x + 20 * s
         
         # Shadow
-        pygame.draw.ellipse(screen, (20, 20, 30), (x + 5*s, y + 55*s, 30*s, 10*s))
+        pygame.draw.ellipse(surf, (20, 20, 30), (x + 5*s, y + 55*s, 30*s, 10*s))
         
         # Legs - baggy jeans
         leg_width = 9 * s
@@ -1889,25 +3448,25 @@ class Game:
         leg_y = y + 38 * s
         jeans = (50, 50, 80)
         
-        pygame.draw.rect(screen, jeans, (cx - 11*s, leg_y, leg_width, leg_height))
-        pygame.draw.rect(screen, (0, 0, 0), (cx - 11*s, leg_y, leg_width, leg_height), 1)
-        pygame.draw.rect(screen, (40, 40, 40), (cx - 12*s, leg_y + leg_height - 5*s, leg_width + 2*s, 6*s))
+        pygame.draw.rect(surf, jeans, (cx - 11*s, leg_y, leg_width, leg_height))
+        pygame.draw.rect(surf, (0, 0, 0), (cx - 11*s, leg_y, leg_width, leg_height), 1)
+        pygame.draw.rect(surf, (40, 40, 40), (cx - 12*s, leg_y + leg_height - 5*s, leg_width + 2*s, 6*s))
         
-        pygame.draw.rect(screen, jeans, (cx + 2*s, leg_y, leg_width, leg_height))
-        pygame.draw.rect(screen, (0, 0, 0), (cx + 2*s, leg_y, leg_width, leg_height), 1)
-        pygame.draw.rect(screen, (40, 40, 40), (cx + 1*s, leg_y + leg_height - 5*s, leg_width + 2*s, 6*s))
+        pygame.draw.rect(surf, jeans, (cx + 2*s, leg_y, leg_width, leg_height))
+        pygame.draw.rect(surf, (0, 0, 0), (cx + 2*s, leg_y, leg_width, leg_height), 1)
+        pygame.draw.rect(surf, (40, 40, 40), (cx + 1*s, leg_y + leg_height - 5*s, leg_width + 2*s, 6*s))
         
         # Torso - hoodie in gang color
         torso_width = 24 * s
         torso_height = 20 * s
         torso_x = cx - torso_width/2
         torso_y = y + 18 * s
-        pygame.draw.rect(screen, gang_color, (torso_x, torso_y, torso_width, torso_height))
-        pygame.draw.rect(screen, (0, 0, 0), (torso_x, torso_y, torso_width, torso_height), 1)
+        pygame.draw.rect(surf, gang_color, (torso_x, torso_y, torso_width, torso_height))
+        pygame.draw.rect(surf, (0, 0, 0), (torso_x, torso_y, torso_width, torso_height), 1)
         
         # Hood drawstrings
-        pygame.draw.line(screen, (200, 200, 200), (torso_x + 8*s, torso_y), (torso_x + 8*s, torso_y + 10*s), 1)
-        pygame.draw.line(screen, (200, 200, 200), (torso_x + 16*s, torso_y), (torso_x + 16*s, torso_y + 10*s), 1)
+        pygame.draw.line(surf, (200, 200, 200), (torso_x + 8*s, torso_y), (torso_x + 8*s, torso_y + 10*s), 1)
+        pygame.draw.line(surf, (200, 200, 200), (torso_x + 16*s, torso_y), (torso_x + 16*s, torso_y + 10*s), 1)
         
         # Arms
         arm_width = 7 * s
@@ -1915,42 +3474,42 @@ class Game:
         arm_y = y + 20 * s
         skin = (180, 140, 100)
         
-        pygame.draw.rect(screen, gang_color, (torso_x - arm_width, arm_y, arm_width, arm_height * 0.7))
-        pygame.draw.rect(screen, skin, (torso_x - arm_width, arm_y + arm_height * 0.7, arm_width, arm_height * 0.3))
-        pygame.draw.rect(screen, (0, 0, 0), (torso_x - arm_width, arm_y, arm_width, arm_height), 1)
+        pygame.draw.rect(surf, gang_color, (torso_x - arm_width, arm_y, arm_width, arm_height * 0.7))
+        pygame.draw.rect(surf, skin, (torso_x - arm_width, arm_y + arm_height * 0.7, arm_width, arm_height * 0.3))
+        pygame.draw.rect(surf, (0, 0, 0), (torso_x - arm_width, arm_y, arm_width, arm_height), 1)
         
-        pygame.draw.rect(screen, gang_color, (torso_x + torso_width, arm_y, arm_width, arm_height * 0.7))
-        pygame.draw.rect(screen, skin, (torso_x + torso_width, arm_y + arm_height * 0.7, arm_width, arm_height * 0.3))
-        pygame.draw.rect(screen, (0, 0, 0), (torso_x + torso_width, arm_y, arm_width, arm_height), 1)
+        pygame.draw.rect(surf, gang_color, (torso_x + torso_width, arm_y, arm_width, arm_height * 0.7))
+        pygame.draw.rect(surf, skin, (torso_x + torso_width, arm_y + arm_height * 0.7, arm_width, arm_height * 0.3))
+        pygame.draw.rect(surf, (0, 0, 0), (torso_x + torso_width, arm_y, arm_width, arm_height), 1)
         
         # Neck
-        pygame.draw.rect(screen, skin, (cx - 4*s, y + 14*s, 8*s, 4*s))
+        pygame.draw.rect(surf, skin, (cx - 4*s, y + 14*s, 8*s, 4*s))
         
         # Head
         head_radius = 10 * s
         head_y = y + 10 * s
-        pygame.draw.circle(screen, skin, (int(cx), int(head_y)), int(head_radius))
-        pygame.draw.circle(screen, (0, 0, 0), (int(cx), int(head_y)), int(head_radius), 1)
+        pygame.draw.circle(surf, skin, (int(cx), int(head_y)), int(head_radius))
+        pygame.draw.circle(surf, (0, 0, 0), (int(cx), int(head_y)), int(head_radius), 1)
         
         # Bandana
-        pygame.draw.rect(screen, gang_color, (cx - 10*s, head_y - 6*s, 20*s, 6*s))
+        pygame.draw.rect(surf, gang_color, (cx - 10*s, head_y - 6*s, 20*s, 6*s))
         
         # Eyes (slightly menacing)
         eye_y = head_y
-        pygame.draw.ellipse(screen, (255, 255, 255), (cx - 7*s, eye_y - 2*s, 6*s, 4*s))
-        pygame.draw.ellipse(screen, (255, 255, 255), (cx + 1*s, eye_y - 2*s, 6*s, 4*s))
-        pygame.draw.circle(screen, (30, 30, 30), (int(cx - 4*s), int(eye_y)), int(1.5*s))
-        pygame.draw.circle(screen, (30, 30, 30), (int(cx + 4*s), int(eye_y)), int(1.5*s))
+        pygame.draw.ellipse(surf, (255, 255, 255), (cx - 7*s, eye_y - 2*s, 6*s, 4*s))
+        pygame.draw.ellipse(surf, (255, 255, 255), (cx + 1*s, eye_y - 2*s, 6*s, 4*s))
+        pygame.draw.circle(surf, (30, 30, 30), (int(cx - 4*s), int(eye_y)), int(1.5*s))
+        pygame.draw.circle(surf, (30, 30, 30), (int(cx + 4*s), int(eye_y)), int(1.5*s))
         
         return cx, head_y
     
-    def draw_player_character(self, x, y, scale=1.0):
+    def render_player_character(self, surf, x, y, scale=1.0):
         """Draw the player character - distinctive look"""
         s = scale
         cx = x + 20 * s
         
         # Shadow
-        pygame.draw.ellipse(screen, (20, 20, 30), (x + 5*s, y + 55*s, 30*s, 10*s))
+        pygame.draw.ellipse(surf, (20, 20, 30), (x + 5*s, y + 55*s, 30*s, 10*s))
         
         # Legs - dark tactical pants
         leg_width = 8 * s
@@ -1958,22 +3517,22 @@ class Game:
         leg_y = y + 38 * s
         pants = (30, 30, 35)
         
-        pygame.draw.rect(screen, pants, (cx - 10*s, leg_y, leg_width, leg_height))
-        pygame.draw.rect(screen, (0, 0, 0), (cx - 10*s, leg_y, leg_width, leg_height), 1)
-        pygame.draw.rect(screen, (25, 25, 25), (cx - 11*s, leg_y + leg_height - 4*s, leg_width + 2*s, 5*s))
+        pygame.draw.rect(surf, pants, (cx - 10*s, leg_y, leg_width, leg_height))
+        pygame.draw.rect(surf, (0, 0, 0), (cx - 10*s, leg_y, leg_width, leg_height), 1)
+        pygame.draw.rect(surf, (25, 25, 25), (cx - 11*s, leg_y + leg_height - 4*s, leg_width + 2*s, 5*s))
         
-        pygame.draw.rect(screen, pants, (cx + 2*s, leg_y, leg_width, leg_height))
-        pygame.draw.rect(screen, (0, 0, 0), (cx + 2*s, leg_y, leg_width, leg_height), 1)
-        pygame.draw.rect(screen, (25, 25, 25), (cx + 1*s, leg_y + leg_height - 4*s, leg_width + 2*s, 5*s))
+        pygame.draw.rect(surf, pants, (cx + 2*s, leg_y, leg_width, leg_height))
+        pygame.draw.rect(surf, (0, 0, 0), (cx + 2*s, leg_y, leg_width, leg_height), 1)
+        pygame.draw.rect(surf, (25, 25, 25), (cx + 1*s, leg_y + leg_height - 4*s, leg_width + 2*s, 5*s))
         
         # Torso - dark jacket with purple accent
         torso_width = 22 * s
         torso_height = 20 * s
         torso_x = cx - torso_width/2
         torso_y = y + 18 * s
-        pygame.draw.rect(screen, (40, 35, 45), (torso_x, torso_y, torso_width, torso_height))
-        pygame.draw.rect(screen, C['purple'], (torso_x, torso_y, torso_width, 3*s))  # Purple collar
-        pygame.draw.rect(screen, (0, 0, 0), (torso_x, torso_y, torso_width, torso_height), 1)
+        pygame.draw.rect(surf, (40, 35, 45), (torso_x, torso_y, torso_width, torso_height))
+        pygame.draw.rect(surf, C['purple'], (torso_x, torso_y, torso_width, 3*s))  # Purple collar
+        pygame.draw.rect(surf, (0, 0, 0), (torso_x, torso_y, torso_width, torso_height), 1)
         
         # Arms
         arm_width = 6 * s
@@ -1982,48 +3541,129 @@ class Game:
         skin = (255, 220, 190)
         jacket = (40, 35, 45)
         
-        pygame.draw.rect(screen, jacket, (torso_x - arm_width, arm_y, arm_width, arm_height * 0.6))
-        pygame.draw.rect(screen, skin, (torso_x - arm_width, arm_y + arm_height * 0.6, arm_width, arm_height * 0.4))
-        pygame.draw.rect(screen, (0, 0, 0), (torso_x - arm_width, arm_y, arm_width, arm_height), 1)
+        pygame.draw.rect(surf, jacket, (torso_x - arm_width, arm_y, arm_width, arm_height * 0.6))
+        pygame.draw.rect(surf, skin, (torso_x - arm_width, arm_y + arm_height * 0.6, arm_width, arm_height * 0.4))
+        pygame.draw.rect(surf, (0, 0, 0), (torso_x - arm_width, arm_y, arm_width, arm_height), 1)
         
-        pygame.draw.rect(screen, jacket, (torso_x + torso_width, arm_y, arm_width, arm_height * 0.6))
-        pygame.draw.rect(screen, skin, (torso_x + torso_width, arm_y + arm_height * 0.6, arm_width, arm_height * 0.4))
-        pygame.draw.rect(screen, (0, 0, 0), (torso_x + torso_width, arm_y, arm_width, arm_height), 1)
+        pygame.draw.rect(surf, jacket, (torso_x + torso_width, arm_y, arm_width, arm_height * 0.6))
+        pygame.draw.rect(surf, skin, (torso_x + torso_width, arm_y + arm_height * 0.6, arm_width, arm_height * 0.4))
+        pygame.draw.rect(surf, (0, 0, 0), (torso_x + torso_width, arm_y, arm_width, arm_height), 1)
         
         # Neck
-        pygame.draw.rect(screen, skin, (cx - 4*s, y + 14*s, 8*s, 4*s))
+        pygame.draw.rect(surf, skin, (cx - 4*s, y + 14*s, 8*s, 4*s))
         
         # Head
         head_radius = 10 * s
         head_y = y + 10 * s
-        pygame.draw.circle(screen, skin, (int(cx), int(head_y)), int(head_radius))
-        pygame.draw.circle(screen, (0, 0, 0), (int(cx), int(head_y)), int(head_radius), 1)
+        pygame.draw.circle(surf, skin, (int(cx), int(head_y)), int(head_radius))
+        pygame.draw.circle(surf, (0, 0, 0), (int(cx), int(head_y)), int(head_radius), 1)
         
         # Short dark hair
-        pygame.draw.arc(screen, (25, 20, 15), (cx - 10*s, head_y - 14*s, 20*s, 16*s), 0, 3.14, 4)
-        pygame.draw.rect(screen, (25, 20, 15), (cx - 9*s, head_y - 8*s, 18*s, 5*s))
+        pygame.draw.arc(surf, (25, 20, 15), (cx - 10*s, head_y - 14*s, 20*s, 16*s), 0, 3.14, 4)
+        pygame.draw.rect(surf, (25, 20, 15), (cx - 9*s, head_y - 8*s, 18*s, 5*s))
         
         # Eyes - determined look
         eye_y = head_y - 1 * s
-        pygame.draw.circle(screen, (255, 255, 255), (int(cx - 4*s), int(eye_y)), int(3*s))
-        pygame.draw.circle(screen, (255, 255, 255), (int(cx + 4*s), int(eye_y)), int(3*s))
-        pygame.draw.circle(screen, (40, 60, 40), (int(cx - 4*s), int(eye_y)), int(1.5*s))  # Green eyes
-        pygame.draw.circle(screen, (40, 60, 40), (int(cx + 4*s), int(eye_y)), int(1.5*s))
+        pygame.draw.circle(surf, (255, 255, 255), (int(cx - 4*s), int(eye_y)), int(3*s))
+        pygame.draw.circle(surf, (255, 255, 255), (int(cx + 4*s), int(eye_y)), int(3*s))
+        pygame.draw.circle(surf, (40, 60, 40), (int(cx - 4*s), int(eye_y)), int(1.5*s))  # Green eyes
+        pygame.draw.circle(surf, (40, 60, 40), (int(cx + 4*s), int(eye_y)), int(1.5*s))
         
         # Subtle stubble
-        pygame.draw.arc(screen, (80, 70, 60), (cx - 6*s, head_y + 2*s, 12*s, 8*s), 3.14, 6.28, 1)
+        pygame.draw.arc(surf, (80, 70, 60), (cx - 6*s, head_y + 2*s, 12*s, 8*s), 3.14, 6.28, 1)
         
         return cx, head_y
 
-    def draw_world(self):
-        p = self.player
-        cam = self.camera
-        
+    def vehicle_sprite(self, model, angle, health, max_health, is_night):
+        """Cached sprite for a vehicle model at the nearest of VEHICLE_STEPS angles
+
+        model is ('car', w, h, color) or ('police', siren_frame); all cars of one
+        type and color share their sprites.
+        """
+        steps = self.VEHICLE_STEPS
+        step = round(angle * steps / (2 * math.pi)) % steps
+        damage = 0 if health > max_health * 0.6 else 1 if health > max_health * 0.3 else 2
+        return self.vehicle_sprites.get((model, step, damage, is_night))
+    
+    def render_vehicle(self, key):
+        """Draw one vehicle model, rotation, damage state and headlight setting"""
+        model, step, damage, is_night = key
+        if model[0] == 'police':
+            (w, h), color = self.POLICE_CAR, C['cop']
+        else:
+            w, h, color = model[1:]
+        angle = step * 2 * math.pi / self.VEHICLE_STEPS
+        size = int(math.hypot(w, h)) + 8
+        # Nothing here is antialiased, so a colorkey (RLE-encoded below) stands in for alpha
+        sprite = pygame.Surface((size, size))
+        sprite.fill(self.VEHICLE_KEY)
+        vx = vy = size // 2
+        cos_a = math.cos(angle)
+        sin_a = math.sin(angle)
+        hw, hh = w // 2, h // 2
+        
+        def at(fx, fy):
+            # Point at fractions of the half length/width in the car's own frame
+            return (vx + cos_a * hw * fx - sin_a * hh * fy, vy + sin_a * hw * fx + cos_a * hh * fy)
+        
+        # Damage darkens the paint
+        shade = (1.0, 0.8, 0.6)[damage]
+        body = tuple(int(c * shade) for c in color)
+        points = [at(1, 1), at(-1, 1), at(-1, -1), at(1, -1)]
+        pygame.draw.polygon(sprite, body, points)
+        pygame.draw.polygon(sprite, (0, 0, 0), points, 2)
+        
+        if model[0] == 'police':
+            # Light bar stays screen-aligned above the center
+            light_col = C['red'] if model[1] else C['cop']
+            pygame.draw.circle(sprite, light_col, (vx, vy - 5), 8)
+        else:
+            # Windshield, cracked once the car is badly hurt
+            ws_points = [at(0.4, 0.6), at(0.4, -0.6), at(0.1, -0.6), at(0.1, 0.6)]
+            pygame.draw.polygon(sprite, (100, 150, 200) if damage < 2 else (70, 90, 110), ws_points)
+            if damage:
+                pygame.draw.line(sprite, (30, 30, 35), at(0.35, 0.5), at(0.15, -0.3), 1)
+        
+        # Headlights at night
+        if is_night:
+            for side in (-0.7, 0.7):
+                x, y = at(1, side)
+                pygame.draw.circle(sprite, (255, 240, 180), (int(x), int(y)), 3)
+        if pygame.display.get_surface():
+            sprite = sprite.convert()
+        sprite.set_colorkey(self.VEHICLE_KEY, pygame.RLEACCEL)
+        return sprite
+    
+    def render_chunk(self, key):
+        """Bake one ChunkCache entry: ('ground', cx, cy) or ('buildings', cx, cy, is_night)"""
+        size = ChunkCache.SIZE
+        n = ChunkCache.TILES
+        cx, cy = key[1], key[2]
+        ox, oy = cx * size, cy * size
+        if key[0] == 'ground':
+            surf = pygame.Surface((size, size))
+            surf.fill(C['bg'])
+            self.render_ground(surf, cx * n, cy * n, n, n)
+            return surf.convert() if pygame.display.get_surface() else surf
+        
+        is_night = key[3]
+        if not self.query_view('building', ox - TILE, oy - TILE, size + TILE * 2, size + TILE * 2):
+            return None
+        surf = pygame.Surface((size, size), pygame.SRCALPHA)
+        self.render_buildings(surf, ox, oy, is_night)
+        if pygame.display.get_surface():
+            surf = surf.convert_alpha()
+        # RLE makes the empty space between buildings nearly free to blit
+        surf.set_alpha(255, pygame.RLEACCEL)
+        return surf
+    
+    def render_ground(self, surf, tx0, ty0, cols, rows):
+        """Streets and sidewalks for a block of tiles starting at (tx0, ty0)"""
         # Ground - Clean urban aesthetic
-        for ty in range(max(0, int(cam[1]//TILE) - 1), min(MAP_H, int((cam[1]+SCREEN_H)//TILE) + 2)):
-            for tx in range(max(0, int(cam[0]//TILE) - 1), min(MAP_W, int((cam[0]+SCREEN_W)//TILE) + 2)):
-                sx = tx*TILE - cam[0]
-                sy = ty*TILE - cam[1]
+        for ty in range(max(0, ty0), min(MAP_H, ty0 + rows)):
+            for tx in range(max(0, tx0), min(MAP_W, tx0 + cols)):
+                sx = (tx - tx0) * TILE
+                sy = (ty - ty0) * TILE
                 
                 # Determine tile type based on grid
                 is_street = (tx % 5 < 3) or (ty % 5 < 3)
@@ -2033,187 +3673,250 @@ class Game:
                     noise = ((tx * 7 + ty * 11) % 6) - 3
                     base = C['asphalt']
                     col = (base[0] + noise, base[1] + noise, base[2] + noise)
-                    pygame.draw.rect(screen, col, (sx, sy, TILE, TILE))
+                    pygame.draw.rect(surf, col, (sx, sy, TILE, TILE))
                     
                     # Subtle road markings
                     if ty % 5 == 2 and tx % 3 == 0:
-                        pygame.draw.rect(screen, (70, 70, 60), (sx + 22, sy + 29, 20, 3))
+                        pygame.draw.rect(surf, (70, 70, 60), (sx + 22, sy + 29, 20, 3))
                     
                     # Occasional manhole
                     if (tx * 17 + ty * 23) % 47 == 0:
-                        pygame.draw.circle(screen, (32, 32, 36), (sx + 32, sy + 32), 12)
-                        pygame.draw.circle(screen, (28, 28, 32), (sx + 32, sy + 32), 10)
+                        pygame.draw.circle(surf, (32, 32, 36), (sx + 32, sy + 32), 12)
+                        pygame.draw.circle(surf, (28, 28, 32), (sx + 32, sy + 32), 10)
                 else:
                     # Cleaner sidewalk tiles
                     noise = ((tx * 3 + ty * 7) % 8) - 4
                     base = C['sidewalk']
                     col = (base[0] + noise, base[1] + noise, base[2] + noise)
-                    pygame.draw.rect(screen, col, (sx, sy, TILE, TILE))
+                    pygame.draw.rect(surf, col, (sx, sy, TILE, TILE))
                     # Tile grid lines
-                    pygame.draw.line(screen, (base[0]-15, base[1]-15, base[2]-15), 
+                    pygame.draw.line(surf, (base[0]-15, base[1]-15, base[2]-15), 
                                    (sx, sy + TILE-1), (sx + TILE, sy + TILE-1), 1)
-                    pygame.draw.line(screen, (base[0]-15, base[1]-15, base[2]-15), 
+                    pygame.draw.line(surf, (base[0]-15, base[1]-15, base[2]-15), 
                                    (sx + TILE-1, sy), (sx + TILE-1, sy + TILE), 1)
-        
-        # Draw props with shadows
-        if hasattr(self, 'props'):
-            for prop in self.props:
-                px, py = prop['x'] - cam[0], prop['y'] - cam[1]
-                if px < -60 or px > SCREEN_W + 60 or py < -60 or py > SCREEN_H + 60:
-                    continue
-                
-                # Shadow under all props
-                pygame.draw.ellipse(screen, (20, 20, 25), (px + 5, py + 35, 30, 10))
+    
+    def render_buildings(self, surf, ox, oy, is_night):
+        """Every building that shows on surf when its top-left is at map (ox, oy)"""
+        w, h = surf.get_size()
+        pad = self.BUILDING_PAD
+        # Neighbours just outside the edge too - shadows and signs spill over.
+        # Sorted back into generation order so overlaps stack the same way
+        near = self.query_view('building', ox - TILE, oy - TILE, w + TILE * 2, h + TILE * 2)
+        for b in sorted(near, key=lambda b: (b.x, b.y)):
+            bx, by = b.x - ox, b.y - oy
+            if bx < -TILE or bx > w or by < -TILE or by > h:
+                continue
+            # Get building style
+            style = self.building_styles.get(id(b), self.DEFAULT_STYLE)
+            surf.blit(self.building_sprite(style, is_night, b.x % 3), (bx - pad, by - pad))
+    
+    def building_sprite(self, style, is_night, pattern):
+        """One building drawn once per style, time of day and lit-window pattern"""
+        key = (style['name'], style.get('sign'), is_night, pattern)
+        sprite = self.building_sprites.get(key)
+        if sprite is None:
+            pad = self.BUILDING_PAD
+            sprite = pygame.Surface((TILE + pad * 2, TILE + pad * 2), pygame.SRCALPHA)
+            self.render_building(sprite, pad, pad, style, is_night, pattern)
+            if pygame.display.get_surface():
+                sprite = sprite.convert_alpha()
+            self.building_sprites[key] = sprite
+        return sprite
+    
+    @staticmethod
+    def lit_windows(style, pattern):
+        """Rects, relative to the building, of the windows render_building lights at night"""
+        if style['type'] in ['tall', 'trap', 'house']:
+            return [(wx_off, 12 + floor * 16, 10, 9)
+                    for floor in range(min(style.get('floors', 2), 3))
+                    for wx_off in [8, 26, 44]
+                    if wx_off < TILE - 12 and (pattern + wx_off + floor) % 3 != 0]
+        if style['type'] in ['store', 'garage', 'club']:
+            return [(8, 24, TILE - 16, 24)]  # the storefront glass
+        return []
+    
+    def render_building(self, surf, bx, by, style, is_night, pattern):
+        """Draw one building at (bx, by); pattern (map x % 3) picks which windows are lit"""
+        # Building shadow
+        pygame.draw.rect(surf, (15, 15, 20), (bx + 4, by + 4, TILE, TILE))
+        
+        # Main building body with gradient effect
+        base_col = style['color']
+        pygame.draw.rect(surf, base_col, (bx, by, TILE, TILE))
+        # Top highlight
+        highlight = (min(255, base_col[0]+25), min(255, base_col[1]+25), min(255, base_col[2]+25))
+        pygame.draw.rect(surf, highlight, (bx, by, TILE, 4))
+        # Side shadow
+        shadow = (max(0, base_col[0]-20), max(0, base_col[1]-20), max(0, base_col[2]-20))
+        pygame.draw.rect(surf, shadow, (bx + TILE - 4, by, 4, TILE))
+        
+        # Night sprites have window glow
+        window_color = (255, 223, 140) if is_night else (45, 65, 95)
+        
+        # Windows based on building type
+        floors = style.get('floors', 2)
+        if style['type'] in ['tall', 'trap', 'house']:
+            # Residential windows
+            for floor in range(min(floors, 3)):
+                wy = by + 12 + floor * 16
+                for wx_off in [8, 26, 44]:
+                    if wx_off < TILE - 12:
+                        # Window glow at night
+                        if is_night and ((pattern + wx_off + floor) % 3 != 0):
+                            pygame.draw.rect(surf, (40, 35, 20), (bx + wx_off - 1, wy - 1, 12, 11))
+                        pygame.draw.rect(surf, window_color if is_night and ((pattern + wx_off + floor) % 3 != 0) else (35, 45, 60), 
+                                       (bx + wx_off, wy, 10, 9))
+                        pygame.draw.line(surf, (25, 30, 40), (bx + wx_off + 5, wy), (bx + wx_off + 5, wy + 9), 1)
+                        pygame.draw.line(surf, (25, 30, 40), (bx + wx_off, wy + 4), (bx + wx_off + 10, wy + 4), 1)
+        elif style['type'] in ['store', 'garage', 'club']:
+            # Storefront
+            store_window = (bx + 6, by + 22, TILE - 12, 28)
+            pygame.draw.rect(surf, (30, 35, 45), store_window)
+            if is_night:
+                # Lit storefront
+                pygame.draw.rect(surf, (60, 70, 90), (store_window[0]+2, store_window[1]+2, store_window[2]-4, store_window[3]-4))
+            pygame.draw.rect(surf, (50, 55, 65), store_window, 2)
+            # Awning with stripes
+            awning_col = highlight
+            pygame.draw.polygon(surf, awning_col, [
+                (bx, by + 18), (bx + TILE, by + 18), (bx + TILE - 3, by + 24), (bx + 3, by + 24)
+            ])
+        
+        # Door
+        door_col = (55, 45, 35)
+        pygame.draw.rect(surf, door_col, (bx + TILE//2 - 7, by + TILE - 18, 14, 18))
+        pygame.draw.rect(surf, (40, 32, 25), (bx + TILE//2 - 7, by + TILE - 18, 14, 18), 1)
+        pygame.draw.circle(surf, (200, 170, 80), (bx + TILE//2 + 3, by + TILE - 9), 2)
+        
+        # Building outline
+        pygame.draw.rect(surf, (25, 28, 35), (bx, by, TILE, TILE), 2)
+        
+        # Sign for special buildings with neon glow
+        name = style['name']
+        sign_type = style.get('sign')
+        is_special = sign_type is not None
+        
+        if is_special:
+            sign_color = self.SIGN_COLORS[sign_type]
+        
+            # Neon sign with glow
+            sign_rect = (bx + 3, by + 2, TILE - 6, 13)
+            # Glow effect
+            glow = (sign_color[0]//4, sign_color[1]//4, sign_color[2]//4)
+            pygame.draw.rect(surf, glow, (sign_rect[0]-2, sign_rect[1]-2, sign_rect[2]+4, sign_rect[3]+4))
+            pygame.draw.rect(surf, (20, 22, 28), sign_rect)
+            pygame.draw.rect(surf, sign_color, sign_rect, 1)
+        
+            txt = F['tiny'].render(name, True, sign_color)
+            surf.blit(txt, (bx + TILE//2 - txt.get_width()//2, by + 4))
+        else:
+            # Subtle sign
+            txt = F['tiny'].render(name, True, (180, 185, 195))
+            surf.blit(txt, (bx + TILE//2 - txt.get_width()//2, by + 5))
+    
+    def draw_world(self):
+        cam = self.camera
+        
+        # Ground and buildings are baked into chunks - see render_chunk
+        c = ChunkCache.SIZE
+        is_night = self.time_of_day < self.day_length * 0.25 or self.time_of_day > self.day_length * 0.75
+        visible_chunks = [
+            (cx, cy)
+            for cy in range(max(0, int(cam[1] // c)), min(-(-MAP_H * TILE // c), int((cam[1] + SCREEN_H) // c) + 1))
+            for cx in range(max(0, int(cam[0] // c)), min(-(-MAP_W * TILE // c), int((cam[0] + SCREEN_W) // c) + 1))
+        ]
+        self.draw_ground(visible_chunks)
+        self.draw_props()
+        self.draw_building_layer(visible_chunks, is_night)
+        self.draw_people()
+        self.draw_vehicles(is_night)
+        self.draw_gangs()
+        self.draw_effects()
+    
+    def draw_ground(self, chunks):
+        """Blit the baked ground chunks on screen"""
+        cam = self.camera
+        c = ChunkCache.SIZE
+        for cx, cy in chunks:
+            self.screen.blit(self.chunks.get(('ground', cx, cy)), (cx * c - cam[0], cy * c - cam[1]))
+    
+    def draw_props(self):
+        """Street furniture, each with its shadow"""
+        cam = self.camera
+        if hasattr(self, 'props'):
+            for prop in self.visible('prop', 60):
+                px, py = prop['x'] - cam[0], prop['y'] - cam[1]
+                if px < -60 or px > SCREEN_W + 60 or py < -60 or py > SCREEN_H + 60:
+                    continue
+                
+                # Shadow under all props
+                pygame.draw.ellipse(self.screen, (20, 20, 25), (px + 5, py + 35, 30, 10))
                     
                 if prop['type'] == 'dumpster':
                     # Modern dumpster
-                    pygame.draw.rect(screen, (34, 85, 51), (px, py + 5, 38, 28))
-                    pygame.draw.rect(screen, (22, 65, 38), (px + 2, py + 5, 34, 6))
-                    pygame.draw.rect(screen, (45, 100, 62), (px, py + 5, 38, 3))
-                    pygame.draw.rect(screen, (20, 20, 25), (px, py + 5, 38, 28), 1)
+                    pygame.draw.rect(self.screen, (34, 85, 51), (px, py + 5, 38, 28))
+                    pygame.draw.rect(self.screen, (22, 65, 38), (px + 2, py + 5, 34, 6))
+                    pygame.draw.rect(self.screen, (45, 100, 62), (px, py + 5, 38, 3))
+                    pygame.draw.rect(self.screen, (20, 20, 25), (px, py + 5, 38, 28), 1)
                 elif prop['type'] == 'basketball':
                     # Pole
-                    pygame.draw.rect(screen, (70, 70, 80), (px + 17, py - 5, 6, 45))
+                    pygame.draw.rect(self.screen, (70, 70, 80), (px + 17, py - 5, 6, 45))
                     # Backboard
-                    pygame.draw.rect(screen, (240, 240, 245), (px + 2, py - 30, 36, 28))
-                    pygame.draw.rect(screen, (200, 50, 50), (px + 10, py - 22, 20, 15), 2)
+                    pygame.draw.rect(self.screen, (240, 240, 245), (px + 2, py - 30, 36, 28))
+                    pygame.draw.rect(self.screen, (200, 50, 50), (px + 10, py - 22, 20, 15), 2)
                     # Rim
-                    pygame.draw.circle(screen, (220, 100, 40), (px + 20, py - 5), 8, 3)
+                    pygame.draw.circle(self.screen, (220, 100, 40), (px + 20, py - 5), 8, 3)
                 elif prop['type'] == 'bench':
                     # Park bench
-                    pygame.draw.rect(screen, (90, 65, 40), (px, py + 12, 40, 10))
-                    pygame.draw.rect(screen, (70, 50, 30), (px, py + 8, 40, 5))
-                    pygame.draw.rect(screen, (50, 50, 55), (px + 4, py + 22, 6, 12))
-                    pygame.draw.rect(screen, (50, 50, 55), (px + 30, py + 22, 6, 12))
+                    pygame.draw.rect(self.screen, (90, 65, 40), (px, py + 12, 40, 10))
+                    pygame.draw.rect(self.screen, (70, 50, 30), (px, py + 8, 40, 5))
+                    pygame.draw.rect(self.screen, (50, 50, 55), (px + 4, py + 22, 6, 12))
+                    pygame.draw.rect(self.screen, (50, 50, 55), (px + 30, py + 22, 6, 12))
                 elif prop['type'] == 'hydrant':
-                    pygame.draw.rect(screen, (200, 55, 55), (px + 12, py + 12, 16, 22))
-                    pygame.draw.ellipse(screen, (220, 70, 70), (px + 10, py + 5, 20, 14))
-                    pygame.draw.rect(screen, (180, 45, 45), (px + 6, py + 18, 8, 6))
-                    pygame.draw.rect(screen, (180, 45, 45), (px + 26, py + 18, 8, 6))
+                    pygame.draw.rect(self.screen, (200, 55, 55), (px + 12, py + 12, 16, 22))
+                    pygame.draw.ellipse(self.screen, (220, 70, 70), (px + 10, py + 5, 20, 14))
+                    pygame.draw.rect(self.screen, (180, 45, 45), (px + 6, py + 18, 8, 6))
+                    pygame.draw.rect(self.screen, (180, 45, 45), (px + 26, py + 18, 8, 6))
                 elif prop['type'] == 'streetlight':
                     # Modern street lamp
-                    pygame.draw.rect(screen, (60, 65, 70), (px + 17, py + 5, 6, 40))
-                    pygame.draw.polygon(screen, (70, 75, 80), [
+                    pygame.draw.rect(self.screen, (60, 65, 70), (px + 17, py + 5, 6, 40))
+                    pygame.draw.polygon(self.screen, (70, 75, 80), [
                         (px + 8, py), (px + 32, py), (px + 28, py + 8), (px + 12, py + 8)
                     ])
                     # Light glow
                     if self.time_of_day < self.day_length * 0.3 or self.time_of_day > self.day_length * 0.7:
-                        pygame.draw.circle(screen, (255, 240, 200), (px + 20, py + 4), 10)
-                        pygame.draw.circle(screen, (255, 250, 220), (px + 20, py + 4), 6)
+                        pygame.draw.circle(self.screen, (255, 240, 200), (px + 20, py + 4), 10)
+                        pygame.draw.circle(self.screen, (255, 250, 220), (px + 20, py + 4), 6)
                 elif prop['type'] == 'trashcan':
-                    pygame.draw.rect(screen, (55, 60, 70), (px + 10, py + 8, 20, 26))
-                    pygame.draw.ellipse(screen, (65, 70, 80), (px + 8, py + 4, 24, 10))
-                    pygame.draw.rect(screen, (45, 50, 60), (px + 10, py + 8, 20, 26), 1)
+                    pygame.draw.rect(self.screen, (55, 60, 70), (px + 10, py + 8, 20, 26))
+                    pygame.draw.ellipse(self.screen, (65, 70, 80), (px + 8, py + 4, 24, 10))
+                    pygame.draw.rect(self.screen, (45, 50, 60), (px + 10, py + 8, 20, 26), 1)
                 elif prop['type'] == 'mailbox':
-                    pygame.draw.rect(screen, (35, 80, 160), (px + 8, py + 5, 24, 30))
-                    pygame.draw.rect(screen, (45, 95, 180), (px + 8, py + 5, 24, 8))
-                    pygame.draw.rect(screen, (25, 60, 130), (px + 8, py + 5, 24, 30), 1)
+                    pygame.draw.rect(self.screen, (35, 80, 160), (px + 8, py + 5, 24, 30))
+                    pygame.draw.rect(self.screen, (45, 95, 180), (px + 8, py + 5, 24, 8))
+                    pygame.draw.rect(self.screen, (25, 60, 130), (px + 8, py + 5, 24, 30), 1)
                 elif prop['type'] == 'busstop':
-                    pygame.draw.rect(screen, (70, 75, 85), (px + 2, py, 6, 42))
-                    pygame.draw.rect(screen, (55, 130, 180), (px - 4, py - 8, 48, 22))
-                    pygame.draw.rect(screen, (40, 100, 150), (px - 4, py - 8, 48, 22), 1)
+                    pygame.draw.rect(self.screen, (70, 75, 85), (px + 2, py, 6, 42))
+                    pygame.draw.rect(self.screen, (55, 130, 180), (px - 4, py - 8, 48, 22))
+                    pygame.draw.rect(self.screen, (40, 100, 150), (px - 4, py - 8, 48, 22), 1)
                     txt = F['tiny'].render("BUS", True, C['white'])
-                    screen.blit(txt, (px + 8, py - 4))
-        
-        # Buildings - Modern stylized look
-        crack_rects = [r for r, c in self.crack_dens]
-        strip_rects = [r for r, c in self.strip_clubs]
-        gun_rects = [r for r, c in self.gunstores]
-        upgrade_rects = [r for r, c in self.upgrade_shops]
-        safe_rects = [r for r, c in self.safe_houses]
-        
-        for b in self.buildings:
-            bx, by = b.x - cam[0], b.y - cam[1]
-            if bx < -TILE or bx > SCREEN_W or by < -TILE or by > SCREEN_H:
-                continue
-            
-            # Get building style
-            style = self.building_styles.get(id(b), {'name': 'BUILDING', 'color': (65, 70, 80), 'floors': 2, 'type': 'generic'})
-            
-            # Building shadow
-            pygame.draw.rect(screen, (15, 15, 20), (bx + 4, by + 4, TILE, TILE))
-            
-            # Main building body with gradient effect
-            base_col = style['color']
-            pygame.draw.rect(screen, base_col, (bx, by, TILE, TILE))
-            # Top highlight
-            highlight = (min(255, base_col[0]+25), min(255, base_col[1]+25), min(255, base_col[2]+25))
-            pygame.draw.rect(screen, highlight, (bx, by, TILE, 4))
-            # Side shadow
-            shadow = (max(0, base_col[0]-20), max(0, base_col[1]-20), max(0, base_col[2]-20))
-            pygame.draw.rect(screen, shadow, (bx + TILE - 4, by, 4, TILE))
-            
-            # Determine if nighttime for window glow
-            is_night = self.time_of_day < self.day_length * 0.25 or self.time_of_day > self.day_length * 0.75
-            window_color = (255, 223, 140) if is_night else (45, 65, 95)
-            
-            # Windows based on building type
-            floors = style.get('floors', 2)
-            if style['type'] in ['tall', 'trap', 'house']:
-                # Residential windows
-                for floor in range(min(floors, 3)):
-                    wy = by + 12 + floor * 16
-                    for wx_off in [8, 26, 44]:
-                        if wx_off < TILE - 12:
-                            # Window glow at night
-                            if is_night and ((bx + wx_off + floor) % 3 != 0):
-                                pygame.draw.rect(screen, (40, 35, 20), (bx + wx_off - 1, wy - 1, 12, 11))
-                            pygame.draw.rect(screen, window_color if is_night and ((bx + wx_off + floor) % 3 != 0) else (35, 45, 60), 
-                                           (bx + wx_off, wy, 10, 9))
-                            pygame.draw.line(screen, (25, 30, 40), (bx + wx_off + 5, wy), (bx + wx_off + 5, wy + 9), 1)
-                            pygame.draw.line(screen, (25, 30, 40), (bx + wx_off, wy + 4), (bx + wx_off + 10, wy + 4), 1)
-            elif style['type'] in ['store', 'garage', 'club']:
-                # Storefront
-                store_window = (bx + 6, by + 22, TILE - 12, 28)
-                pygame.draw.rect(screen, (30, 35, 45), store_window)
-                if is_night:
-                    # Lit storefront
-                    pygame.draw.rect(screen, (60, 70, 90), (store_window[0]+2, store_window[1]+2, store_window[2]-4, store_window[3]-4))
-                pygame.draw.rect(screen, (50, 55, 65), store_window, 2)
-                # Awning with stripes
-                awning_col = highlight
-                pygame.draw.polygon(screen, awning_col, [
-                    (bx, by + 18), (bx + TILE, by + 18), (bx + TILE - 3, by + 24), (bx + 3, by + 24)
-                ])
-            
-            # Door
-            door_col = (55, 45, 35)
-            pygame.draw.rect(screen, door_col, (bx + TILE//2 - 7, by + TILE - 18, 14, 18))
-            pygame.draw.rect(screen, (40, 32, 25), (bx + TILE//2 - 7, by + TILE - 18, 14, 18), 1)
-            pygame.draw.circle(screen, (200, 170, 80), (bx + TILE//2 + 3, by + TILE - 9), 2)
-            
-            # Building outline
-            pygame.draw.rect(screen, (25, 28, 35), (bx, by, TILE, TILE), 2)
-            
-            # Sign for special buildings with neon glow
-            name = style['name']
-            is_special = b in crack_rects or b in strip_rects or b in gun_rects or b in upgrade_rects or b in safe_rects
-            
-            if is_special:
-                sign_colors = {
-                    'crack': C['neon'], 'strip': C['pink'], 'gun': C['gold'], 
-                    'upgrade': C['neon'], 'safe': C['green']
-                }
-                sign_type = 'crack' if b in crack_rects else 'strip' if b in strip_rects else 'gun' if b in gun_rects else 'upgrade' if b in upgrade_rects else 'safe'
-                sign_color = sign_colors[sign_type]
-                
-                # Neon sign with glow
-                sign_rect = (bx + 3, by + 2, TILE - 6, 13)
-                # Glow effect
-                glow = (sign_color[0]//4, sign_color[1]//4, sign_color[2]//4)
-                pygame.draw.rect(screen, glow, (sign_rect[0]-2, sign_rect[1]-2, sign_rect[2]+4, sign_rect[3]+4))
-                pygame.draw.rect(screen, (20, 22, 28), sign_rect)
-                pygame.draw.rect(screen, sign_color, sign_rect, 1)
-                
-                txt = F['tiny'].render(name, True, sign_color)
-                screen.blit(txt, (bx + TILE//2 - txt.get_width()//2, by + 4))
-            else:
-                # Subtle sign
-                txt = F['tiny'].render(name, True, (180, 185, 195))
-                screen.blit(txt, (bx + TILE//2 - txt.get_width()//2, by + 5))
-        
+                    self.screen.blit(txt, (px + 8, py - 4))
+    
+    def draw_building_layer(self, chunks, is_night):
+        """Blit the baked building chunks over the street"""
+        cam = self.camera
+        c = ChunkCache.SIZE
+        for cx, cy in chunks:
+            layer = self.chunks.get(('buildings', cx, cy, is_night))
+            if layer is not None:
+                self.screen.blit(layer, (cx * c - cam[0], cy * c - cam[1]))
+    
+    def draw_people(self):
+        """Dealers, pickups and blood, then the crew, civilians, cops and the player"""
+        p = self.player
+        cam = self.camera
         # Drug dealers - street corner look
-        for dealer in self.drug_dealers:
+        for dealer in self.visible_by_depth('dealer', 50):
             dx, dy = dealer.x - cam[0], dealer.y - cam[1]
             if dx < -50 or dx > SCREEN_W + 50 or dy < -50 or dy > SCREEN_H + 50:
                 continue
@@ -2225,25 +3928,21 @@ class Game:
                            hair_color=(20, 15, 10),
                            scale=0.95)
             # Dollar sign above head (they selling)
-            screen.blit(F['small'].render("$", True, C['green']), (dx + 15, dy - 25))
+            self.screen.blit(F['small'].render("$", True, C['green']), (dx + 15, dy - 25))
         
         # Health pickups
         for hp in self.health_pickups:
             hx, hy = hp.x - cam[0], hp.y - cam[1]
             if hx < -30 or hx > SCREEN_W + 30 or hy < -30 or hy > SCREEN_H + 30:
                 continue
-            hp.pulse = (hp.pulse + 0.1) % 6.28
             size = 12 + int(math.sin(hp.pulse) * 3)
-            pygame.draw.rect(screen, C['red'], (hx - size//2, hy - 4, size, 8))
-            pygame.draw.rect(screen, C['red'], (hx - 4, hy - size//2, 8, size))
-            pygame.draw.rect(screen, C['white'], (hx - size//2, hy - 4, size, 8), 1)
-            pygame.draw.rect(screen, C['white'], (hx - 4, hy - size//2, 8, size), 1)
+            pygame.draw.rect(self.screen, C['red'], (hx - size//2, hy - 4, size, 8))
+            pygame.draw.rect(self.screen, C['red'], (hx - 4, hy - size//2, 8, size))
+            pygame.draw.rect(self.screen, C['white'], (hx - size//2, hy - 4, size, 8), 1)
+            pygame.draw.rect(self.screen, C['white'], (hx - 4, hy - size//2, 8, size), 1)
         
         # Blood
-        for b in self.blood:
-            bx, by = b['x'] - cam[0], b['y'] - cam[1]
-            size = max(2, b['life'] // 30)
-            pygame.draw.circle(screen, C['blood'], (int(bx), int(by)), size)
+        self.blood.draw(self.screen, cam)
         
         # Hoes (Crew members)
         for hoe in self.hoes:
@@ -2259,7 +3958,7 @@ class Game:
                            scale=0.8)
         
         # Civilians
-        for civ in self.civilians:
+        for civ in self.visible_by_depth('civilian', 50):
             cx, cy = civ.x - cam[0], civ.y - cam[1]
             if cx < -50 or cx > SCREEN_W + 50 or cy < -50 or cy > SCREEN_H + 50:
                 continue
@@ -2271,10 +3970,10 @@ class Game:
                            hair_color=(40, 30, 20),
                            scale=0.85)
             if civ.scared:
-                screen.blit(F['tiny'].render("!", True, C['red']), (cx + 17, cy - 18))
+                self.screen.blit(F['tiny'].render("!", True, C['red']), (cx + 17, cy - 18))
         
         # Cops
-        for cop in self.cops:
+        for cop in self.visible_by_depth('cop', 50):
             cx, cy = cop.x - cam[0], cop.y - cam[1]
             if cx < -50 or cx > SCREEN_W + 50 or cy < -50 or cy > SCREEN_H + 50:
                 continue
@@ -2282,10 +3981,10 @@ class Game:
             self.draw_cop_person(cx, cy, scale=1.0)
             # Health bar
             if cop.health < cop.max_health:
-                pygame.draw.rect(screen, (60, 0, 0), (cx, cy - 10, 40, 6))
-                pygame.draw.rect(screen, C['red'], (cx, cy - 10, 40 * cop.health // cop.max_health, 6))
+                pygame.draw.rect(self.screen, (60, 0, 0), (cx, cy - 10, 40, 6))
+                pygame.draw.rect(self.screen, C['red'], (cx, cy - 10, 40 * cop.health // cop.max_health, 6))
             if cop.alert:
-                screen.blit(F['tiny'].render("!", True, C['red']), (cx + 17, cy - 22))
+                self.screen.blit(F['tiny'].render("!", True, C['red']), (cx + 17, cy - 22))
         
         # Player
         if p.alive and not p.inside and not p.in_vehicle:
@@ -2293,51 +3992,34 @@ class Game:
             # Draw humanoid player character
             self.draw_player_character(px, py, scale=1.0)
             # Gold outline to show it's the player
-            pygame.draw.rect(screen, C['gold'], (px - 2, py - 2, 44, 68), 2)
-        
+            pygame.draw.rect(self.screen, C['gold'], (px - 2, py - 2, 44, 68), 2)
+    
+    def draw_vehicles(self, is_night):
+        """Cars, police cars and rockets in flight"""
+        cam = self.camera
         # Vehicles
-        for vehicle in self.vehicles:
+        for vehicle in self.visible_by_depth('vehicle', 100):
             vx, vy = vehicle.x - cam[0], vehicle.y - cam[1]
             if vx < -100 or vx > SCREEN_W + 100 or vy < -100 or vy > SCREEN_H + 100:
                 continue
             
-            # Draw vehicle body
+            # Body, windshield, damage and headlights come from the sprite cache
             color = C.get(vehicle.color_key, C['car_red'])
-            
-            # Rotate vehicle shape based on angle
-            cos_a = math.cos(vehicle.angle)
-            sin_a = math.sin(vehicle.angle)
-            hw, hh = vehicle.w // 2, vehicle.h // 2
-            
-            # Simple rectangle for now (rotated)
-            points = [
-                (vx + cos_a * hw - sin_a * hh, vy + sin_a * hw + cos_a * hh),
-                (vx - cos_a * hw - sin_a * hh, vy - sin_a * hw + cos_a * hh),
-                (vx - cos_a * hw + sin_a * hh, vy - sin_a * hw - cos_a * hh),
-                (vx + cos_a * hw + sin_a * hh, vy + sin_a * hw - cos_a * hh),
-            ]
-            pygame.draw.polygon(screen, color, points)
-            pygame.draw.polygon(screen, (0, 0, 0), points, 2)
-            
-            # Windshield
-            ws_points = [
-                (vx + cos_a * hw * 0.4 - sin_a * hh * 0.6, vy + sin_a * hw * 0.4 + cos_a * hh * 0.6),
-                (vx + cos_a * hw * 0.4 + sin_a * hh * 0.6, vy + sin_a * hw * 0.4 - cos_a * hh * 0.6),
-                (vx + cos_a * hw * 0.1 + sin_a * hh * 0.6, vy + sin_a * hw * 0.1 - cos_a * hh * 0.6),
-                (vx + cos_a * hw * 0.1 - sin_a * hh * 0.6, vy + sin_a * hw * 0.1 + cos_a * hh * 0.6),
-            ]
-            pygame.draw.polygon(screen, (100, 150, 200), ws_points)
+            sprite = self.vehicle_sprite(('car', vehicle.w, vehicle.h, color), vehicle.angle,
+                                         vehicle.health, vehicle.max_health, is_night)
+            self.screen.blit(sprite, (vx - sprite.get_width() // 2, vy - sprite.get_height() // 2))
+            hh = vehicle.h // 2
             
             # Show if occupied
             if vehicle.occupied:
-                pygame.draw.circle(screen, C['gold'], (int(vx), int(vy)), 5)
+                pygame.draw.circle(self.screen, C['gold'], (int(vx), int(vy)), 5)
             
             # Health bar if damaged
             if vehicle.health < vehicle.max_health:
                 bar_x = vx - 30
                 bar_y = vy - hh - 15
-                pygame.draw.rect(screen, (60, 0, 0), (bar_x, bar_y, 60, 5))
-                pygame.draw.rect(screen, C['green'], (bar_x, bar_y, 60 * vehicle.health // vehicle.max_health, 5))
+                pygame.draw.rect(self.screen, (60, 0, 0), (bar_x, bar_y, 60, 5))
+                pygame.draw.rect(self.screen, C['green'], (bar_x, bar_y, 60 * vehicle.health // vehicle.max_health, 5))
         
         # Police cars
         for pcar in self.police_cars:
@@ -2345,29 +4027,17 @@ class Game:
             if px < -100 or px > SCREEN_W + 100 or py < -100 or py > SCREEN_H + 100:
                 continue
             
-            # Draw police car
-            cos_a = math.cos(pcar['angle'])
-            sin_a = math.sin(pcar['angle'])
-            hw, hh = 45, 25
-            
-            points = [
-                (px + cos_a * hw - sin_a * hh, py + sin_a * hw + cos_a * hh),
-                (px - cos_a * hw - sin_a * hh, py - sin_a * hw + cos_a * hh),
-                (px - cos_a * hw + sin_a * hh, py - sin_a * hw - cos_a * hh),
-                (px + cos_a * hw + sin_a * hh, py + sin_a * hw - cos_a * hh),
-            ]
-            pygame.draw.polygon(screen, C['cop'], points)
-            pygame.draw.polygon(screen, (0, 0, 0), points, 2)
-            
-            # Light bar (red/blue flashing)
+            # Light bar (red/blue flashing) is baked in both states
             flash = (self.game_time // 10) % 2
-            light_col = C['red'] if flash else C['cop']
-            pygame.draw.circle(screen, light_col, (int(px), int(py - 5)), 8)
+            sprite = self.vehicle_sprite(('police', flash), pcar['angle'],
+                                         pcar['health'], pcar['max_health'], is_night)
+            self.screen.blit(sprite, (px - sprite.get_width() // 2, py - sprite.get_height() // 2))
+            hh = self.POLICE_CAR[1] // 2
             
             # Health bar
             if pcar['health'] < pcar['max_health']:
-                pygame.draw.rect(screen, (60, 0, 0), (px - 30, py - hh - 12, 60, 5))
-                pygame.draw.rect(screen, C['red'], (px - 30, py - hh - 12, 60 * pcar['health'] // pcar['max_health'], 5))
+                pygame.draw.rect(self.screen, (60, 0, 0), (px - 30, py - hh - 12, 60, 5))
+                pygame.draw.rect(self.screen, C['red'], (px - 30, py - hh - 12, 60 * pcar['health'] // pcar['max_health'], 5))
         
         # Rockets (RPG)
         for rocket in self.rockets:
@@ -2378,13 +4048,15 @@ class Game:
             # Draw rocket
             angle = rocket['angle']
             length = 15
-            pygame.draw.line(screen, C['orange'], 
+            pygame.draw.line(self.screen, C['orange'], 
                 (rx - math.cos(angle) * length, ry - math.sin(angle) * length),
                 (rx + math.cos(angle) * length/2, ry + math.sin(angle) * length/2), 4)
-            pygame.draw.circle(screen, C['red'], (int(rx + math.cos(angle) * length/2), int(ry + math.sin(angle) * length/2)), 5)
-        
-        # Gang members
-        for gang in self.gang_members:
+            pygame.draw.circle(self.screen, C['red'], (int(rx + math.cos(angle) * length/2), int(ry + math.sin(angle) * length/2)), 5)
+    
+    def draw_gangs(self):
+        """Gang members, with health bars and alert marks"""
+        cam = self.camera
+        for gang in self.visible_by_depth('gang', 50):
             gx, gy = gang.x - cam[0], gang.y - cam[1]
             if gx < -50 or gx > SCREEN_W + 50 or gy < -50 or gy > SCREEN_H + 50:
                 continue
@@ -2392,23 +4064,24 @@ class Game:
             self.draw_gang_member(gx, gy, gang.color, scale=1.0)
             # Health bar
             if gang.health < gang.max_health:
-                pygame.draw.rect(screen, (60, 0, 0), (gx, gy - 10, 38, 5))
-                pygame.draw.rect(screen, gang.color, (gx, gy - 10, 38 * gang.health // gang.max_health, 5))
+                pygame.draw.rect(self.screen, (60, 0, 0), (gx, gy - 10, 38, 5))
+                pygame.draw.rect(self.screen, gang.color, (gx, gy - 10, 38 * gang.health // gang.max_health, 5))
             if gang.alert:
-                screen.blit(F['tiny'].render("!", True, C['white']), (gx + 17, gy - 20))
-        
+                self.screen.blit(F['tiny'].render("!", True, C['white']), (gx + 17, gy - 20))
+    
+    def draw_effects(self):
+        """Particles, bullets and floating texts over everything else"""
+        cam = self.camera
         # Particles
-        for particle in self.particles:
-            px, py = particle.x - cam[0], particle.y - cam[1]
-            if px < -20 or px > SCREEN_W + 20 or py < -20 or py > SCREEN_H + 20:
-                continue
-            alpha = int(255 * particle.life / 45)
-            size = int(particle.size)
-            if particle.ptype == 'smoke':
+        for x, y, ptype, size, color in self.particles.visible(
+                cam[0] - 20, cam[1] - 20, cam[0] + SCREEN_W + 20, cam[1] + SCREEN_H + 20):
+            px, py = x - cam[0], y - cam[1]
+            size = int(size)
+            if ptype == 'smoke':
                 # Draw smoke as fading circle
-                pygame.draw.circle(screen, (80, 80, 80), (int(px), int(py)), size)
+                pygame.draw.circle(self.screen, (80, 80, 80), (int(px), int(py)), size)
             else:
-                pygame.draw.circle(screen, particle.color, (int(px), int(py)), max(1, size))
+                pygame.draw.circle(self.screen, color, (int(px), int(py)), max(1, size))
         
         # Bullets
         for b in self.bullets:
@@ -2421,152 +4094,177 @@ class Game:
                 # Gang bullets - use gang color
                 gang_name = b.owner.split('_')[1] if '_' in b.owner else 'red'
                 col = C.get(f'gang_{gang_name}', C['red'])
-            pygame.draw.circle(screen, col, (int(bx), int(by)), 5)
-            pygame.draw.circle(screen, C['white'], (int(bx), int(by)), 3)
+            pygame.draw.circle(self.screen, col, (int(bx), int(by)), 5)
+            pygame.draw.circle(self.screen, C['white'], (int(bx), int(by)), 3)
         
         # Floating texts
-        if hasattr(self, 'floating_texts'):
-            for ft in self.floating_texts[:]:
-                fx, fy = ft['x'] - cam[0], ft['y'] - cam[1]
-                alpha = int(255 * ft['life'] / 60)
-                txt = F['main'].render(ft['text'], True, ft['color'])
-                txt.set_alpha(alpha)
-                screen.blit(txt, (fx - txt.get_width()//2, fy))
+        for ft in self.floating_texts:
+            fx, fy = ft['x'] - cam[0], ft['y'] - cam[1]
+            alpha = int(255 * ft['life'] / 60)
+            txt = F['main'].render(ft['text'], True, ft['color'])
+            txt.set_alpha(alpha)
+            self.screen.blit(txt, (fx - txt.get_width()//2, fy))
+            txt.set_alpha(None)  # the surface may be shared through the text cache
     
-    def draw_interior(self):
-        p = self.player
-        
-        if p.building_type == 'crack':
-            screen.fill((40, 0, 60))
-            
+    def build_interiors(self):
+        """Cached room backdrops and the widgets drawn over them"""
+        self.interior = pygame.Surface((SCREEN_W, SCREEN_H))
+        self.interior_background = pygame.Surface((SCREEN_W, SCREEN_H))
+        self.interior_key = None  # (building type, backdrop pulse) the background was drawn for
+        self.interior_frame = None  # HUD and overlay state the display last showed over a room
+        text = self.draw_interior_text
+        self.interior_widgets = {
+            'crack': {
+                'stage': HudWidget((0, 145, SCREEN_W, 45), text),
+                'bar': HudWidget((197, 412, 886, 66), self.draw_cook_bar),
+                'hint': HudWidget((0, 515, SCREEN_W, 125), text),
+            },
+            'strip': {
+                'score': HudWidget((0, 125, SCREEN_W, 75), text),
+                'sequence': HudWidget((0, 270, SCREEN_W, 135), self.draw_rizz_sequence),
+                'message': HudWidget((0, 435, SCREEN_W, 45), text),
+                'crew': HudWidget((0, 515, SCREEN_W, 45), text),
+            },
+            'gun': {
+                'items': HudWidget((0, 125, SCREEN_W, 315), text),
+                'stock': HudWidget((0, 515, SCREEN_W, 80), text),
+            },
+            'dealer': {
+                'info': HudWidget((0, 135, SCREEN_W, 45), text),
+                'options': HudWidget((0, 215, SCREEN_W, 105), text),
+                'inventory': HudWidget((0, 395, SCREEN_W, 45), text),
+                'hint': HudWidget((0, 495, SCREEN_W, 45), text),
+            },
+            'upgrade': {
+                'upgrades': HudWidget((0, 175, SCREEN_W, 215), text),
+                'cash': HudWidget((0, 445, SCREEN_W, 45), text),
+            },
+            'safe': {
+                'options': HudWidget((0, 215, SCREEN_W, 105), text),
+                'status': HudWidget((0, 395, SCREEN_W, 45), text),
+                'save': HudWidget((0, 445, SCREEN_W, 35), text),
+            },
+        }
+    
+    def render_interior(self, surf, kind, pulse):
+        """Everything in a room that only changes with the room itself"""
+        surf.fill(self.INTERIOR_FILLS.get(kind, C['bg']))
+        lines = []
+        if kind == 'crack':
             # Table
-            pygame.draw.rect(screen, C['table'], (SCREEN_W//2 - 100, SCREEN_H//2 - 40, 200, 100))
-            pygame.draw.rect(screen, C['gold'], (SCREEN_W//2 - 100, SCREEN_H//2 - 40, 200, 100), 4)
-            
-            title = F['big'].render("TRAP HOUSE", True, C['purple'])
-            screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 60))
-            
-            if not p.cooking:
-                hint = F['main'].render("Press SPACE to cook", True, C['neon'])
-                screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, SCREEN_H - 120))
-            else:
-                stage = F['main'].render(f"Stage {p.cook_stage + 1}/3", True, C['gold'])
-                screen.blit(stage, (SCREEN_W//2 - stage.get_width()//2, 150))
-                
-                # Bar
-                bar_rect = pygame.Rect(200, 420, 880, 50)
-                pygame.draw.rect(screen, (50, 50, 70), bar_rect)
-                
-                # Target zone
-                zone_x = 200 + int((p.cook_target - p.cook_zone/2) * 880)
-                zone_w = int(p.cook_zone * 880)
-                pygame.draw.rect(screen, C['green'], (zone_x, 420, zone_w, 50))
-                
-                # Indicator
-                ind_x = 200 + int(p.cook_bar * 880)
-                pygame.draw.rect(screen, C['neon'], (ind_x - 3, 415, 6, 60))
-                
-                pygame.draw.rect(screen, C['white'], bar_rect, 3)
-                
-                hint = F['main'].render("Press SPACE in the GREEN zone!", True, C['white'])
-                screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, 520))
+            pygame.draw.rect(surf, C['table'], (SCREEN_W//2 - 100, SCREEN_H//2 - 40, 200, 100))
+            pygame.draw.rect(surf, C['gold'], (SCREEN_W//2 - 100, SCREEN_H//2 - 40, 200, 100), 4)
+            lines.append(('big', "TRAP HOUSE", C['purple'], None, 60))
+        elif kind == 'strip':
+            # Pulsing backdrop
+            surf.fill((60 + pulse, 0, 50 + pulse))
+            lines.append(('big', "[ THE PIT ]", C['pink'], None, 30))
+            lines.append(('small', "prove you're not weak", C['neon'], None, 85))
+            lines.append(('small', "Hit the keys in sequence. ESC to leave.", (150, 150, 150), None, 560))
+        elif kind == 'gun':
+            lines.append(('big', "TONY'S GUNS", C['gold'], None, 40))
+            lines.append(('main', "W/S = Select | SPACE = Buy", C['white'], None, 480))
+        elif kind == 'dealer':
+            lines.append(('big', "DRUG DEALER", C['green'], None, 60))
+        elif kind == 'upgrade':
+            lines.append(('big', "CHOP SHOP", C['neon'], None, 60))
+            lines.append(('main', "W/S = Select | SPACE = Buy", C['white'], None, 520))
+        elif kind == 'safe':
+            lines.append(('big', "THE STASH", C['green'], None, 60))
+            lines.append(('main', "W/S = Select | SPACE = Confirm", C['white'], None, 520))
+        # Exit hint
+        lines.append(('small', "ESC = Exit", (150, 150, 150), 20, SCREEN_H - 40))
+        self.draw_interior_text(surf, lines)
+    
+    def draw_interior_text(self, surf, lines):
+        """(font, text, color, x, y) lines, centered across the screen when x is None"""
+        for font, text, color, x, y in lines:
+            txt = F[font].render(text, True, color)
+            surf.blit(txt, (SCREEN_W//2 - txt.get_width()//2 if x is None else x, y))
+    
+    def draw_cook_bar(self, surf, value):
+        if value is None:
+            return
+        zone_x, zone_w, ind_x = value
+        bar_rect = pygame.Rect(200, 420, 880, 50)
+        pygame.draw.rect(surf, (50, 50, 70), bar_rect)
+        # Target zone
+        pygame.draw.rect(surf, C['green'], (zone_x, 420, zone_w, 50))
+        # Indicator
+        pygame.draw.rect(surf, C['neon'], (ind_x - 3, 415, 6, 60))
+        pygame.draw.rect(surf, C['white'], bar_rect, 3)
+    
+    def draw_rizz_sequence(self, surf, value):
+        if value is None:
+            return
+        sequence, index, pulse, timer_w = value
+        arrow_symbols = {'W': '↑', 'A': '←', 'S': '↓', 'D': '→'}
         
-        elif p.building_type == 'strip':
-            screen.fill((60, 0, 50))
-            
-            # Pulsing background effect
-            pulse = int(abs(math.sin(self.game_time * 0.1)) * 30)
-            pygame.draw.rect(screen, (60 + pulse, 0, 50 + pulse), (0, 0, SCREEN_W, SCREEN_H))
-            
-            title = F['big'].render("[ THE PIT ]", True, C['pink'])
-            screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 30))
+        # Draw upcoming arrows
+        y_pos = 280
+        start_x = SCREEN_W//2 - (len(sequence) * 45) // 2
+        
+        for i, key in enumerate(sequence):
+            x_pos = start_x + i * 45
             
-            subtitle = F['small'].render("prove you're not weak", True, C['neon'])
-            screen.blit(subtitle, (SCREEN_W//2 - subtitle.get_width()//2, 85))
+            if i < index:
+                # Already hit - green
+                col = C['green']
+            elif i == index:
+                # Current - pulsing yellow
+                col = (255, 255, pulse)
+                # Draw highlight box
+                pygame.draw.rect(surf, col, (x_pos - 5, y_pos - 5, 50, 70), 3)
+            else:
+                # Upcoming - white
+                col = C['white']
             
-            # Score display
-            score_txt = F['main'].render(f"RESPECT: {p.rizz_score}/{p.rizz_target}", True, C['gold'])
-            screen.blit(score_txt, (SCREEN_W//2 - score_txt.get_width()//2, 130))
+            arrow = F['big'].render(arrow_symbols[key], True, col)
+            surf.blit(arrow, (x_pos, y_pos))
             
+            # Key label below
+            key_txt = F['small'].render(key, True, col)
+            surf.blit(key_txt, (x_pos + 15, y_pos + 50))
+        
+        # Timer bar for current key
+        bar_w = 300
+        pygame.draw.rect(surf, (80, 40, 60), (SCREEN_W//2 - bar_w//2, 380, bar_w, 20))
+        pygame.draw.rect(surf, C['neon'], (SCREEN_W//2 - bar_w//2, 380, timer_w, 20))
+        pygame.draw.rect(surf, C['white'], (SCREEN_W//2 - bar_w//2, 380, bar_w, 20), 2)
+    
+    def interior_values(self, kind):
+        """What each widget of the room shows this frame"""
+        p = self.player
+        
+        if kind == 'crack':
+            if not p.cooking:
+                return {'stage': (), 'bar': None,
+                        'hint': (('main', "Press SPACE to cook", C['neon'], None, SCREEN_H - 120),)}
+            return {
+                'stage': (('main', f"Stage {p.cook_stage + 1}/3", C['gold'], None, 150),),
+                'bar': (200 + int((p.cook_target - p.cook_zone/2) * 880), int(p.cook_zone * 880),
+                        200 + int(p.cook_bar * 880)),
+                'hint': (('main', "Press SPACE in the GREEN zone!", C['white'], None, 520),),
+            }
+        
+        if kind == 'strip':
+            score = [('main', f"RESPECT: {p.rizz_score}/{p.rizz_target}", C['gold'], None, 130)]
             # Combo display
             if p.rizz_combo > 0:
                 combo_col = C['neon'] if p.rizz_combo < 5 else C['gold'] if p.rizz_combo < 10 else C['pink']
-                combo_txt = F['main'].render(f"COMBO x{p.rizz_combo} BRUTAL", True, combo_col)
-                screen.blit(combo_txt, (SCREEN_W//2 - combo_txt.get_width()//2, 165))
-            
+                score.append(('main', f"COMBO x{p.rizz_combo} BRUTAL", combo_col, None, 165))
             # Arrow sequence display
+            sequence = None
             if len(p.rizz_sequence) > 0 and p.rizz_index < len(p.rizz_sequence):
-                arrow_symbols = {'W': '↑', 'A': '←', 'S': '↓', 'D': '→'}
-                
-                # Draw upcoming arrows
-                y_pos = 280
-                start_x = SCREEN_W//2 - (len(p.rizz_sequence) * 45) // 2
-                
-                for i, key in enumerate(p.rizz_sequence):
-                    x_pos = start_x + i * 45
-                    
-                    if i < p.rizz_index:
-                        # Already hit - green
-                        col = C['green']
-                        alpha = 100
-                    elif i == p.rizz_index:
-                        # Current - pulsing yellow
-                        pulse = int(abs(math.sin(self.game_time * 0.15)) * 50)
-                        col = (255, 255, pulse)
-                        # Draw highlight box
-                        pygame.draw.rect(screen, col, (x_pos - 5, y_pos - 5, 50, 70), 3)
-                    else:
-                        # Upcoming - white
-                        col = C['white']
-                    
-                    arrow = F['big'].render(arrow_symbols[key], True, col)
-                    screen.blit(arrow, (x_pos, y_pos))
-                    
-                    # Key label below
-                    key_txt = F['small'].render(key, True, col)
-                    screen.blit(key_txt, (x_pos + 15, y_pos + 50))
-                
-                # Timer bar for current key
-                timer_ratio = p.rizz_timer / 120
-                bar_w = 300
-                pygame.draw.rect(screen, (80, 40, 60), (SCREEN_W//2 - bar_w//2, 380, bar_w, 20))
-                pygame.draw.rect(screen, C['neon'], (SCREEN_W//2 - bar_w//2, 380, int(bar_w * timer_ratio), 20))
-                pygame.draw.rect(screen, C['white'], (SCREEN_W//2 - bar_w//2, 380, bar_w, 20), 2)
-                
-                # Timer decreases
-                p.rizz_timer -= 1
-                if p.rizz_timer <= 0:
-                    # TIME OUT - reset combo
-                    p.rizz_combo = 0
-                    p.rizz_timer = 120
-                    p.rizz_message = "TOO SLOW. PATHETIC."
-                    p.rizz_message_timer = 40
-            
-            # Message display
+                pulse = int(abs(math.sin(self.game_time * 0.15)) * 50)
+                sequence = (tuple(p.rizz_sequence), p.rizz_index, pulse, int(300 * (p.rizz_timer / 120)))
+            message = ()
             if p.rizz_message_timer > 0:
-                msg_scale = min(1.0, p.rizz_message_timer / 20)
-                msg = F['main'].render(p.rizz_message, True, C['gold'])
-                screen.blit(msg, (SCREEN_W//2 - msg.get_width()//2, 440))
-                p.rizz_message_timer -= 1
-            
-            # Stats
-            hoes_txt = F['main'].render(f"Crew Members: {len(self.hoes)}", True, C['pink'])
-            screen.blit(hoes_txt, (SCREEN_W//2 - hoes_txt.get_width()//2, 520))
-            
-            hint = F['small'].render("Hit the keys in sequence. ESC to leave.", True, (150, 150, 150))
-            screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, 560))
+                message = (('main', p.rizz_message, C['gold'], None, 440),)
+            return {'score': tuple(score), 'sequence': sequence, 'message': message,
+                    'crew': (('main', f"Crew Members: {len(self.hoes)}", C['pink'], None, 520),)}
         
-        elif p.building_type == 'gun':
-            screen.fill((50, 40, 30))
-            
-            title = F['big'].render("TONY'S GUNS", True, C['gold'])
-            screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 40))
-            
-            # Initialize selection if needed
-            if not hasattr(p, 'gun_selection'):
-                p.gun_selection = 0
-            
-            # Display items
+        if kind == 'gun':
             items = [
                 ("Pistol + 30 Ammo - $200", 200, p.has_gun, 'pistol'),
                 ("Shotgun + 20 Ammo - $500", 500, p.has_shotgun, 'shotgun'),
@@ -2576,256 +4274,205 @@ class Game:
                 ("Ammo x30 - $100", 100, False, 'ammo'),
                 ("Rockets x3 - $300", 300, False, 'rockets'),
             ]
-            
+            lines = []
             y = 130
             for idx, (text, price, owned, item_type) in enumerate(items):
                 selected = (p.gun_selection == idx)
                 prefix = "► " if selected else "  "
                 
-                if item_type == 'ammo':
-                    if not (p.has_gun or p.has_shotgun or p.has_uzi or p.has_rifle):
-                        col = (80, 80, 80)
-                        txt = F['main'].render(prefix + text + " [NO WEAPON]", True, col)
-                    elif p.cash >= price:
-                        col = C['neon'] if selected else C['gold']
-                        txt = F['main'].render(prefix + text, True, col)
-                    else:
-                        col = C['red']
-                        txt = F['main'].render(prefix + text, True, col)
-                elif item_type == 'rockets':
-                    if not p.has_rpg:
-                        col = (80, 80, 80)
-                        txt = F['main'].render(prefix + text + " [NO RPG]", True, col)
-                    elif p.cash >= price:
-                        col = C['neon'] if selected else C['gold']
-                        txt = F['main'].render(prefix + text, True, col)
-                    else:
-                        col = C['red']
-                        txt = F['main'].render(prefix + text, True, col)
+                if item_type == 'ammo' and not (p.has_gun or p.has_shotgun or p.has_uzi or p.has_rifle):
+                    col, text = (80, 80, 80), text + " [NO WEAPON]"
+                elif item_type == 'rockets' and not p.has_rpg:
+                    col, text = (80, 80, 80), text + " [NO RPG]"
                 elif owned:
-                    col = C['green']
-                    txt = F['main'].render(prefix + text + " [OWNED]", True, col)
+                    col, text = C['green'], text + " [OWNED]"
                 elif p.cash >= price:
                     col = C['neon'] if selected else C['gold']
-                    txt = F['main'].render(prefix + text, True, col)
                 else:
                     col = C['red']
-                    txt = F['main'].render(prefix + text, True, col)
-                screen.blit(txt, (SCREEN_W//2 - txt.get_width()//2, y))
+                lines.append(('main', prefix + text, col, None, y))
                 y += 45
-            
-            hint = F['main'].render("W/S = Select | SPACE = Buy", True, C['white'])
-            screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, 480))
-            
-            ammo_txt = F['main'].render(f"Ammo: {p.ammo} | Rockets: {p.rockets}", True, C['neon'])
-            screen.blit(ammo_txt, (SCREEN_W//2 - ammo_txt.get_width()//2, 520))
-            
-            cash_txt = F['main'].render(f"Cash: ${p.cash}", True, C['gold'])
-            screen.blit(cash_txt, (SCREEN_W//2 - cash_txt.get_width()//2, 555))
-        
-        elif p.building_type == 'dealer':
-            screen.fill((20, 40, 20))
-            
-            title = F['big'].render("DRUG DEALER", True, C['green'])
-            screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 60))
-            
-            if hasattr(p, 'current_dealer'):
-                dealer = p.current_dealer
-                if not hasattr(p, 'dealer_selection'):
-                    p.dealer_selection = 0
-                
-                # Show dealer info
-                info = F['main'].render(f"Dealer Stock: {dealer.stock} | Dealer Cash: ${dealer.cash}", True, C['white'])
-                screen.blit(info, (SCREEN_W//2 - info.get_width()//2, 140))
-                
-                # Options
-                options = [
-                    (f"BUY Crack - ${dealer.buy_price} each", dealer.stock > 0 and p.cash >= dealer.buy_price),
-                    (f"SELL Crack - ${dealer.sell_price} each", p.drugs['crack'] > 0 and dealer.cash >= dealer.sell_price),
-                ]
-                
-                y = 220
-                for i, (text, available) in enumerate(options):
-                    selected = (p.dealer_selection == i)
-                    prefix = "► " if selected else "  "
-                    col = C['neon'] if selected and available else (C['green'] if available else C['red'])
-                    txt = F['main'].render(prefix + text, True, col)
-                    screen.blit(txt, (SCREEN_W//2 - txt.get_width()//2, y))
-                    y += 60
-                
-                # Player inventory
-                inv = F['main'].render(f"Your Crack: {p.drugs['crack']} | Your Cash: ${p.cash}", True, C['gold'])
-                screen.blit(inv, (SCREEN_W//2 - inv.get_width()//2, 400))
-                
-                hint = F['main'].render("W/S = Select | SPACE = Confirm", True, C['white'])
-                screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, 500))
+            return {'items': tuple(lines), 'stock': (
+                ('main', f"Ammo: {p.ammo} | Rockets: {p.rockets}", C['neon'], None, 520),
+                ('main', f"Cash: ${p.cash}", C['gold'], None, 555),
+            )}
         
-        elif p.building_type == 'upgrade':
-            screen.fill((30, 30, 60))
-            
-            title = F['big'].render("CHOP SHOP", True, C['neon'])
-            screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 60))
-            
-            if not hasattr(p, 'upgrade_selection'):
-                p.upgrade_selection = 0
-            
+        if kind == 'dealer':
+            if not hasattr(p, 'current_dealer'):
+                return {'info': (), 'options': (), 'inventory': (), 'hint': ()}
+            dealer = p.current_dealer
+            options = [
+                (f"BUY Crack - ${dealer.buy_price} each", dealer.stock > 0 and p.cash >= dealer.buy_price),
+                (f"SELL Crack - ${dealer.sell_price} each", p.drugs['crack'] > 0 and dealer.cash >= dealer.sell_price),
+            ]
+            lines = []
+            for i, (text, available) in enumerate(options):
+                selected = (p.dealer_selection == i)
+                prefix = "► " if selected else "  "
+                col = C['neon'] if selected and available else (C['green'] if available else C['red'])
+                lines.append(('main', prefix + text, col, None, 220 + i * 60))
+            return {
+                'info': (('main', f"Dealer Stock: {dealer.stock} | Dealer Cash: ${dealer.cash}", C['white'], None, 140),),
+                'options': tuple(lines),
+                'inventory': (('main', f"Your Crack: {p.drugs['crack']} | Your Cash: ${p.cash}", C['gold'], None, 400),),
+                'hint': (('main', "W/S = Select | SPACE = Confirm", C['white'], None, 500),),
+            }
+        
+        if kind == 'upgrade':
             upgrades = [
                 (f"Max Health +25 - $500", 500, f"Current: {p.max_health}"),
                 (f"Speed +1 - $400", 400, f"Current: {p.speed + p.speed_bonus}"),
                 (f"Armor +10% - $600", 600, f"Current: {p.armor}%"),
                 (f"Damage +20% - $800", 800, f"Current: {int(p.damage_mult * 100)}%"),
             ]
-            
+            lines = []
             y = 180
             for i, (text, price, current) in enumerate(upgrades):
                 selected = (p.upgrade_selection == i)
                 prefix = "► " if selected else "  "
                 available = p.cash >= price
                 col = C['neon'] if selected and available else (C['gold'] if available else C['red'])
-                txt = F['main'].render(prefix + text, True, col)
-                screen.blit(txt, (SCREEN_W//2 - txt.get_width()//2, y))
+                lines.append(('main', prefix + text, col, None, y))
                 # Show current stat
-                curr_txt = F['small'].render(current, True, (150, 150, 150))
-                screen.blit(curr_txt, (SCREEN_W//2 + 200, y + 5))
+                lines.append(('small', current, (150, 150, 150), SCREEN_W//2 + 200, y + 5))
                 y += 55
-            
-            cash_txt = F['main'].render(f"Your Cash: ${p.cash}", True, C['gold'])
-            screen.blit(cash_txt, (SCREEN_W//2 - cash_txt.get_width()//2, 450))
-            
-            hint = F['main'].render("W/S = Select | SPACE = Buy", True, C['white'])
-            screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, 520))
+            return {'upgrades': tuple(lines),
+                    'cash': (('main', f"Your Cash: ${p.cash}", C['gold'], None, 450),)}
         
-        elif p.building_type == 'safe':
-            screen.fill((20, 30, 20))
-            
-            title = F['big'].render("THE STASH", True, C['green'])
-            screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 60))
-            
-            if not hasattr(p, 'safe_selection'):
-                p.safe_selection = 0
-            
+        if kind == 'safe':
             options = [
                 ("Save Game", "FREE", True),
                 ("Full Heal + Clear Heat", "$200", p.cash >= 200 and p.health < p.max_health),
             ]
-            
-            y = 220
+            lines = []
             for i, (text, cost, available) in enumerate(options):
                 selected = (p.safe_selection == i)
                 prefix = "► " if selected else "  "
                 col = C['green'] if selected and available else (C['white'] if available else C['red'])
-                txt = F['main'].render(f"{prefix}{text} - {cost}", True, col)
-                screen.blit(txt, (SCREEN_W//2 - txt.get_width()//2, y))
-                y += 60
-            
-            # Status
-            status = F['main'].render(f"Health: {p.health}/{p.max_health} | Wanted: {'★' * int(p.wanted)}", True, C['gold'])
-            screen.blit(status, (SCREEN_W//2 - status.get_width()//2, 400))
-            
-            if self.has_save:
-                save_info = F['small'].render("(Save data exists)", True, (100, 150, 100))
-                screen.blit(save_info, (SCREEN_W//2 - save_info.get_width()//2, 450))
-            
-            hint = F['main'].render("W/S = Select | SPACE = Confirm", True, C['white'])
-            screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, 520))
-        
-        # Exit hint
-        exit_txt = F['small'].render("ESC = Exit", True, (150, 150, 150))
-        screen.blit(exit_txt, (20, SCREEN_H - 40))
+                lines.append(('main', f"{prefix}{text} - {cost}", col, None, 220 + i * 60))
+            save = (('small', "(Save data exists)", (100, 150, 100), None, 450),) if self.has_save else ()
+            return {
+                'options': tuple(lines),
+                'status': (('main', f"Health: {p.health}/{p.max_health} | Wanted: {'★' * int(p.wanted)}",
+                            C['gold'], None, 400),),
+                'save': save,
+            }
+        
+        return {}
     
-    def draw_hud(self):
+    def draw_interior(self):
+        """Cached room plus the widgets that changed; returns the screen rects that did"""
         p = self.player
-        
-        # Modern HUD background with gradient effect
-        hud = pygame.Surface((SCREEN_W, 65), pygame.SRCALPHA)
+        kind = p.building_type
+        pulse = int(abs(math.sin(self.game_time * 0.1)) * 30) if kind == 'strip' else 0
+        widgets = self.interior_widgets.get(kind, {})
+        dirty = []
+        
+        # New room (or the pit's backdrop pulsed) - start from a clean background
+        if (kind, pulse) != self.interior_key:
+            self.interior_key = (kind, pulse)
+            self.render_interior(self.interior_background, kind, pulse)
+            self.interior.blit(self.interior_background, (0, 0))
+            for widget in widgets.values():
+                widget.value = HudWidget.STALE
+            dirty.append(self.interior.get_rect())
+        
+        values = self.interior_values(kind)
+        for name, widget in widgets.items():
+            if widget.update(self.interior, self.interior_background, values[name]):
+                dirty.append(widget.rect)
+        self.screen.blit(self.interior, (0, 0))
+        return dirty
+    
+    def build_hud(self):
+        """Cached top bar and mission panel, with the widgets drawn into them"""
+        # Gradient bar with the player name baked in
+        gradient = pygame.Surface((SCREEN_W, 65), pygame.SRCALPHA)
         for y in range(65):
             alpha = 220 - y * 2
-            pygame.draw.line(hud, (15, 20, 30, alpha), (0, y), (SCREEN_W, y))
-        screen.blit(hud, (0, 0))
-        
-        # Subtle bottom border
-        pygame.draw.line(screen, C['ui_border'], (0, 64), (SCREEN_W, 64), 2)
-        
-        # Player name with style
+            pygame.draw.line(gradient, (15, 20, 30, alpha), (0, y), (SCREEN_W, y))
+        self.hud_background = bg = gradient.premul_alpha()
         name_bg = pygame.Surface((85, 28), pygame.SRCALPHA)
         name_bg.fill((147, 51, 234, 40))
-        screen.blit(name_bg, (12, 6))
-        pygame.draw.rect(screen, C['purple'], (12, 6, 85, 28), 2)
-        screen.blit(F['main'].render("RICO", True, C['purple']), (20, 8))
-        
-        # Cash with icon
-        cash_txt = F['main'].render(f"${p.cash:,}", True, C['gold'])
-        screen.blit(cash_txt, (110, 8))
-        
-        # Weapon display - modern box style
-        weapon = p.current_weapon.upper()
-        weapon_owned = {
-            'pistol': p.has_gun, 'shotgun': p.has_shotgun, 'uzi': p.has_uzi,
-            'rifle': p.has_rifle, 'rpg': p.has_rpg, 'fists': True,
+        HudWidget.blit(bg, name_bg, (12, 6))
+        pygame.draw.rect(bg, C['purple'], (12, 6, 85, 28), 2)
+        HudWidget.blit(bg, F['main'].render("RICO", True, C['purple']), (20, 8))
+        self.hud = bg.copy()
+        bar_x = SCREEN_W - 260
+        self.hud_widgets = {
+            'cash': HudWidget((105, 0, 150, 40), self.draw_hud_cash),
+            'weapon': HudWidget((258, 6, 104, 28), self.draw_hud_weapon),
+            'crew': HudWidget((375, 5, 120, 50), self.draw_hud_crew),
+            'wanted': HudWidget((496, 8, 146, 34), self.draw_hud_wanted),
+            'health': HudWidget((bar_x - 2, 14, 244, 51), self.draw_hud_health),
         }
-        
-        if not weapon_owned.get(p.current_weapon, False):
-            weapon = "FISTS"
-        
-        # Ammo status
-        if p.current_weapon == 'rpg':
-            ammo_str = str(p.rockets)
-            weapon_col = C['orange'] if p.rockets > 0 else C['red']
-        elif p.current_weapon in ['pistol', 'shotgun', 'uzi', 'rifle']:
-            ammo_str = str(p.ammo)
-            weapon_col = C['neon'] if p.ammo > 10 else C['yellow'] if p.ammo > 0 else C['red']
-        else:
-            ammo_str = "∞"
-            weapon_col = C['gray']
-        
+        # Mission panel, opaque black with a neon border
+        self.mission_background = pygame.Surface((290, 55), pygame.SRCALPHA)
+        self.mission_background.fill((0, 0, 0))
+        pygame.draw.rect(self.mission_background, C['neon'], (0, 0, 290, 55), 2)
+        self.mission_panel = self.mission_background.copy()
+        self.mission_widget = HudWidget((0, 0, 290, 55), self.draw_hud_mission)
+        # Widget redraws, counted per second
+        self.hud_redraws = 0
+        self.hud_redraw_rate = 0
+        self.hud_rate_start = 0
+        self.show_hud_stats = False
+    
+    def draw_hud_cash(self, surf, cash):
+        HudWidget.blit(surf, F['main'].render(f"${cash:,}", True, C['gold']), (110, 8))
+    
+    def draw_hud_weapon(self, surf, value):
+        weapon, ammo_str, weapon_col = value
         # Weapon box
         weapon_x = 260
-        pygame.draw.rect(screen, (30, 35, 45), (weapon_x, 8, 100, 24))
-        pygame.draw.rect(screen, weapon_col, (weapon_x, 8, 100, 24), 2)
-        screen.blit(F['small'].render(weapon, True, weapon_col), (weapon_x + 8, 10))
+        pygame.draw.rect(surf, (30, 35, 45), (weapon_x, 8, 100, 24))
+        pygame.draw.rect(surf, weapon_col, (weapon_x, 8, 100, 24), 2)
+        HudWidget.blit(surf, F['small'].render(weapon, True, weapon_col), (weapon_x + 8, 10))
         
         # Ammo indicator
         ammo_box = pygame.Surface((30, 24), pygame.SRCALPHA)
         ammo_box.fill((weapon_col[0]//4, weapon_col[1]//4, weapon_col[2]//4, 150))
-        screen.blit(ammo_box, (weapon_x + 68, 8))
+        HudWidget.blit(surf, ammo_box, (weapon_x + 68, 8))
         ammo_txt = F['small'].render(ammo_str, True, C['white'])
-        screen.blit(ammo_txt, (weapon_x + 83 - ammo_txt.get_width()//2, 10))
-        
-        # Crew count
-        screen.blit(F['small'].render(f"CREW: {len(self.hoes)}", True, C['pink']), (380, 10))
+        HudWidget.blit(surf, ammo_txt, (weapon_x + 83 - ammo_txt.get_width()//2, 10))
+    
+    def draw_hud_crew(self, surf, value):
+        crew, drugs_total = value
+        HudWidget.blit(surf, F['small'].render(f"CREW: {crew}", True, C['pink']), (380, 10))
         
         # Drugs if any
-        drugs_total = sum(p.drugs.values())
         if drugs_total > 0:
-            screen.blit(F['small'].render(f"PRODUCT: {drugs_total}", True, C['neon']), (380, 32))
-        
-        # Wanted level - star icons with glow
+            HudWidget.blit(surf, F['small'].render(f"PRODUCT: {drugs_total}", True, C['neon']), (380, 32))
+    
+    def draw_hud_wanted(self, surf, wanted):
+        # Star icons with glow
         stars_x = 500
         for i in range(5):
-            is_active = i < int(p.wanted)
+            is_active = i < wanted
             if is_active:
                 # Glow effect
                 glow_surf = pygame.Surface((28, 28), pygame.SRCALPHA)
                 pygame.draw.circle(glow_surf, (251, 191, 36, 60), (14, 14), 14)
-                screen.blit(glow_surf, (stars_x + i * 28 - 2, 10))
+                HudWidget.blit(surf, glow_surf, (stars_x + i * 28 - 2, 10))
             col = C['gold'] if is_active else (45, 50, 60)
-            screen.blit(F['main'].render("★", True, col), (stars_x + i * 28, 12))
-        
-        # Health bar - modern design
+            HudWidget.blit(surf, F['main'].render("★", True, col), (stars_x + i * 28, 12))
+    
+    def draw_hud_health(self, surf, value):
+        health, max_health, armor = value
         bar_x = SCREEN_W - 260
         bar_w = 240
         bar_h = 22
         
         # Background with subtle pattern
-        pygame.draw.rect(screen, (25, 30, 40), (bar_x - 2, 16, bar_w + 4, bar_h + 4))
-        pygame.draw.rect(screen, (35, 40, 55), (bar_x, 18, bar_w, bar_h))
+        pygame.draw.rect(surf, (25, 30, 40), (bar_x - 2, 16, bar_w + 4, bar_h + 4))
+        pygame.draw.rect(surf, (35, 40, 55), (bar_x, 18, bar_w, bar_h))
         
         # Health fill with gradient effect
-        hw = int(bar_w * p.health / p.max_health)
-        if p.health > 60:
+        hw = int(bar_w * health / max_health)
+        if health > 60:
             col = (34, 197, 94)  # Green
             col_dark = (22, 163, 74)
-        elif p.health > 30:
+        elif health > 30:
             col = (250, 204, 21)  # Yellow
             col_dark = (202, 138, 4)
         else:
@@ -2833,92 +4480,197 @@ class Game:
             col_dark = (185, 28, 28)
         
         if hw > 0:
-            pygame.draw.rect(screen, col_dark, (bar_x, 18, hw, bar_h))
-            pygame.draw.rect(screen, col, (bar_x, 18, hw, bar_h // 2))
+            pygame.draw.rect(surf, col_dark, (bar_x, 18, hw, bar_h))
+            pygame.draw.rect(surf, col, (bar_x, 18, hw, bar_h // 2))
         
         # Border
-        pygame.draw.rect(screen, (60, 65, 80), (bar_x, 18, bar_w, bar_h), 2)
+        pygame.draw.rect(surf, (60, 65, 80), (bar_x, 18, bar_w, bar_h), 2)
         
         # HP text with shadow
-        hp_txt = F['small'].render(f"{p.health}/{p.max_health}", True, C['white'])
-        screen.blit(hp_txt, (bar_x + bar_w//2 - hp_txt.get_width()//2, 20))
+        hp_txt = F['small'].render(f"{health}/{max_health}", True, C['white'])
+        HudWidget.blit(surf, hp_txt, (bar_x + bar_w//2 - hp_txt.get_width()//2, 20))
         
         # Armor indicator below
-        if p.armor > 0:
-            armor_w = int((bar_w - 40) * p.armor / 100)
-            pygame.draw.rect(screen, (35, 40, 55), (bar_x + 20, 42, bar_w - 40, 8))
-            pygame.draw.rect(screen, C['neon'], (bar_x + 20, 42, armor_w, 8))
-            pygame.draw.rect(screen, (45, 50, 65), (bar_x + 20, 42, bar_w - 40, 8), 1)
-            armor_txt = F['tiny'].render(f"ARMOR {p.armor}%", True, C['neon'])
-            screen.blit(armor_txt, (bar_x + bar_w//2 - armor_txt.get_width()//2, 52))
+        if armor > 0:
+            armor_w = int((bar_w - 40) * armor / 100)
+            pygame.draw.rect(surf, (35, 40, 55), (bar_x + 20, 42, bar_w - 40, 8))
+            pygame.draw.rect(surf, C['neon'], (bar_x + 20, 42, armor_w, 8))
+            pygame.draw.rect(surf, (45, 50, 65), (bar_x + 20, 42, bar_w - 40, 8), 1)
+            armor_txt = F['tiny'].render(f"ARMOR {armor}%", True, C['neon'])
+            HudWidget.blit(surf, armor_txt, (bar_x + bar_w//2 - armor_txt.get_width()//2, 52))
+    
+    def draw_hud_mission(self, surf, value):
+        description, progress, reward = value
+        HudWidget.blit(surf, F['small'].render(f"MISSION: {description}", True, C['neon']), (5, 5))
+        HudWidget.blit(surf, F['small'].render(f"Progress: {progress} | ${reward}", True, C['gold']), (5, 27))
+    
+    def bake_minimap(self):
+        """Streets, buildings, shops and dealers drawn once at minimap scale
+
+        A half-minimap margin of empty ground around the city lets the
+        viewport be a plain sub-rectangle even at the map edge.
+        """
+        scale = self.MINIMAP_SCALE
+        pad = self.MINIMAP_SIZE // 2
+        self.minimap = pygame.Surface((int(MAP_W * TILE * scale) + pad * 2,
+                                       int(MAP_H * TILE * scale) + pad * 2))
+        surf = self.minimap
+        surf.fill((35, 45, 60))
+        
+        # Streets, darker than the blocks between them
+        for ty in range(MAP_H):
+            y0, y1 = pad + int(ty * TILE * scale), pad + int((ty + 1) * TILE * scale)
+            for tx in range(MAP_W):
+                if (tx % 5 < 3) or (ty % 5 < 3):
+                    x0, x1 = pad + int(tx * TILE * scale), pad + int((tx + 1) * TILE * scale)
+                    pygame.draw.rect(surf, (30, 38, 52), (x0, y0, x1 - x0, y1 - y0))
+        
+        for b in self.buildings:
+            pygame.draw.rect(surf, (70, 75, 90), (pad + int(b.x * scale), pad + int(b.y * scale), 3, 3))
+        
+        # Shop markers in their sign colors
+        for kind, places in self.site_places().items():
+            for rect, center in places:
+                pygame.draw.rect(surf, self.SIGN_COLORS[kind],
+                                 (pad + int(rect.x * scale) - 1, pad + int(rect.y * scale) - 1, 5, 5))
+        
+        # Dealers (green dots) never leave their corner
+        for dealer in self.drug_dealers:
+            pygame.draw.circle(surf, C['green'], (pad + int(dealer.x * scale), pad + int(dealer.y * scale)), 3)
+        self.full_map = None  # scaled copy for the M key, made on first use
+    
+    def draw_minimap(self):
+        """Baked map around the player, with cops from the spatial hash on top"""
+        p = self.player
+        map_size = self.MINIMAP_SIZE
+        map_x, map_y = SCREEN_W - map_size - 15, SCREEN_H - map_size - 40
+        scale = self.MINIMAP_SCALE
+        center_x, center_y = p.x, p.y
+        
+        pygame.draw.rect(self.screen, (20, 25, 35), (map_x - 3, map_y - 3, map_size + 6, map_size + 6))
+        self.screen.blit(self.minimap, (map_x, map_y),
+                    (int(center_x * scale), int(center_y * scale), map_size, map_size))
+        pygame.draw.rect(self.screen, (55, 65, 85), (map_x, map_y, map_size, map_size), 2)
+        
+        # Draw cops on minimap (blue dots)
+        reach = map_size / 2 / scale
+        for cop in self.grids['cop'].query_rect(center_x - reach, center_y - reach, reach * 2, reach * 2):
+            cx = map_x + map_size//2 + int((cop.x - center_x) * scale)
+            cy = map_y + map_size//2 + int((cop.y - center_y) * scale)
+            if map_x < cx < map_x + map_size and map_y < cy < map_y + map_size:
+                pygame.draw.circle(self.screen, C['cop'], (cx, cy), 2)
+        
+        # Player always at center (gold)
+        pygame.draw.circle(self.screen, C['gold'], (map_x + map_size//2, map_y + map_size//2), 3)
+    
+    def draw_full_map(self):
+        """The whole city from the baked minimap, scaled to fit the screen"""
+        p = self.player
+        side = SCREEN_H - 150
+        if self.full_map is None:
+            pad = self.MINIMAP_SIZE // 2
+            w, h = self.minimap.get_size()
+            city = self.minimap.subsurface((pad, pad, w - pad * 2, h - pad * 2))
+            self.full_map = pygame.transform.smoothscale(city, (side, side))
+        map_x, map_y = (SCREEN_W - side) // 2, 110
+        scale = side / (MAP_W * TILE)
+        
+        # Everything below the top bar
+        self.screen.fill((10, 12, 18), (0, 65, SCREEN_W, SCREEN_H - 65))
+        self.screen.blit(self.full_map, (map_x, map_y))
+        pygame.draw.rect(self.screen, (55, 65, 85), (map_x - 2, map_y - 2, side + 4, side + 4), 2)
+        
+        for cop in self.cops:
+            pygame.draw.circle(self.screen, C['cop'], (map_x + int(cop.x * scale), map_y + int(cop.y * scale)), 3)
+        pygame.draw.circle(self.screen, C['gold'], (map_x + int(p.x * scale), map_y + int(p.y * scale)), 5)
+        
+        title = F['main'].render("CITY MAP", True, C['neon'])
+        self.screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 72))
+        hint = F['tiny'].render("M = Close", True, (150, 150, 150))
+        self.screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, SCREEN_H - 30))
+    
+    def draw_hud(self):
+        """Draw the HUD; returns whether the top bar changed since last frame"""
+        p = self.player
+        
+        # Weapon display
+        weapon = p.current_weapon.upper()
+        weapon_owned = {
+            'pistol': p.has_gun, 'shotgun': p.has_shotgun, 'uzi': p.has_uzi,
+            'rifle': p.has_rifle, 'rpg': p.has_rpg, 'fists': True,
+        }
+        
+        if not weapon_owned.get(p.current_weapon, False):
+            weapon = "FISTS"
+        
+        # Ammo status
+        if p.current_weapon == 'rpg':
+            ammo_str = str(p.rockets)
+            weapon_col = C['orange'] if p.rockets > 0 else C['red']
+        elif p.current_weapon in ['pistol', 'shotgun', 'uzi', 'rifle']:
+            ammo_str = str(p.ammo)
+            weapon_col = C['neon'] if p.ammo > 10 else C['yellow'] if p.ammo > 0 else C['red']
+        else:
+            ammo_str = "∞"
+            weapon_col = C['gray']
+        
+        # Top bar: only widgets whose values changed are redrawn into the cached surface
+        values = {
+            'cash': p.cash,
+            'weapon': (weapon, ammo_str, weapon_col),
+            'crew': (len(self.hoes), sum(p.drugs.values())),
+            'wanted': int(p.wanted),
+            'health': (p.health, p.max_health, p.armor),
+        }
+        redrawn = False
+        for key, widget in self.hud_widgets.items():
+            if widget.update(self.hud, self.hud_background, values[key]):
+                self.hud_redraws += 1
+                redrawn = True
+        self.screen.blit(self.hud, (0, 0), special_flags=pygame.BLEND_PREMULTIPLIED)
+        
+        # Subtle bottom border
+        pygame.draw.line(self.screen, C['ui_border'], (0, 64), (SCREEN_W, 64), 2)
         
         # Minimap - cleaner design
         if not p.inside:
-            map_size = 130
-            map_x, map_y = SCREEN_W - map_size - 15, SCREEN_H - map_size - 40
-            
-            # Minimap background with border
-            pygame.draw.rect(screen, (20, 25, 35), (map_x - 3, map_y - 3, map_size + 6, map_size + 6))
-            pygame.draw.rect(screen, (35, 45, 60), (map_x, map_y, map_size, map_size))
-            pygame.draw.rect(screen, (55, 65, 85), (map_x, map_y, map_size, map_size), 2)
-            
-            # Scale: world to minimap
-            scale = map_size / 800
-            center_x, center_y = p.x, p.y
-            
-            # Draw buildings on minimap
-            for b in self.buildings:
-                bx = map_x + map_size//2 + int((b.x - center_x) * scale)
-                by = map_y + map_size//2 + int((b.y - center_y) * scale)
-                if map_x < bx < map_x + map_size - 2 and map_y < by < map_y + map_size - 2:
-                    pygame.draw.rect(screen, (70, 75, 90), (bx, by, 3, 3))
-            
-            # Draw dealers on minimap (green dots)
-            for dealer in self.drug_dealers:
-                dx = map_x + map_size//2 + int((dealer.x - center_x) * scale)
-                dy = map_y + map_size//2 + int((dealer.y - center_y) * scale)
-                if map_x + 2 < dx < map_x + map_size - 2 and map_y + 2 < dy < map_y + map_size - 2:
-                    pygame.draw.circle(screen, C['green'], (dx, dy), 3)
-            
-            # Draw cops on minimap (blue dots)
-            for cop in self.cops:
-                cx = map_x + map_size//2 + int((cop.x - center_x) * scale)
-                cy = map_y + map_size//2 + int((cop.y - center_y) * scale)
-                if map_x < cx < map_x + map_size and map_y < cy < map_y + map_size:
-                    pygame.draw.circle(screen, C['cop'], (cx, cy), 2)
-            
-            # Player always at center (gold)
-            pygame.draw.circle(screen, C['gold'], (map_x + map_size//2, map_y + map_size//2), 3)
+            if self.show_map:
+                self.draw_full_map()
+            else:
+                self.draw_minimap()
         
         # Stats display (bottom left)
         if not p.inside:
             stats_txt = F['tiny'].render(f"Kills: {p.kills} | Earned: ${p.total_earned} | Missions: {self.completed_missions}", True, (100, 100, 100))
-            screen.blit(stats_txt, (10, SCREEN_H - 55))
+            self.screen.blit(stats_txt, (10, SCREEN_H - 55))
         
         # Active mission display (top right)
         if self.active_mission and not p.inside:
             m = self.active_mission
-            mission_bg = pygame.Rect(SCREEN_W - 300, 65, 290, 55)
-            pygame.draw.rect(screen, (0, 0, 0, 200), mission_bg)
-            pygame.draw.rect(screen, C['neon'], mission_bg, 2)
-            
-            mission_txt = F['small'].render(f"MISSION: {m.description}", True, C['neon'])
-            screen.blit(mission_txt, (SCREEN_W - 295, 70))
-            
-            progress_txt = F['small'].render(f"Progress: {m.get_progress_text()} | ${m.reward}", True, C['gold'])
-            screen.blit(progress_txt, (SCREEN_W - 295, 92))
+            if self.mission_widget.update(self.mission_panel, self.mission_background,
+                                          (m.description, m.get_progress_text(), m.reward)):
+                self.hud_redraws += 1
+            self.screen.blit(self.mission_panel, (SCREEN_W - 300, 65))
         elif not self.active_mission and not p.inside and self.mission_cooldown <= 0:
             # Show hint to press TAB for missions
             hint_txt = F['tiny'].render("Press TAB for missions", True, (100, 100, 100))
-            screen.blit(hint_txt, (SCREEN_W - hint_txt.get_width() - 10, 70))
+            self.screen.blit(hint_txt, (SCREEN_W - hint_txt.get_width() - 10, 70))
         
         # Notification
         if self.notification:
             notif = F['main'].render(self.notification, True, C['gold'])
             notif_bg = pygame.Rect(SCREEN_W//2 - notif.get_width()//2 - 10, 70, notif.get_width() + 20, 40)
-            pygame.draw.rect(screen, (0, 0, 0), notif_bg)
-            pygame.draw.rect(screen, C['gold'], notif_bg, 2)
-            screen.blit(notif, (SCREEN_W//2 - notif.get_width()//2, 75))
+            pygame.draw.rect(self.screen, (0, 0, 0), notif_bg)
+            pygame.draw.rect(self.screen, C['gold'], notif_bg, 2)
+            self.screen.blit(notif, (SCREEN_W//2 - notif.get_width()//2, 75))
+        
+        # HUD redraw counter (F2)
+        now = pygame.time.get_ticks()
+        if now - self.hud_rate_start >= 1000:
+            self.hud_redraw_rate, self.hud_redraws, self.hud_rate_start = self.hud_redraws, 0, now
+        if self.show_hud_stats:
+            self.screen.blit(F['tiny'].render(f"HUD redraws/s: {self.hud_redraw_rate}", True, (100, 100, 100)),
+                        (10, 70))
         
         # Dead - with dark humor messages
         if not p.alive:
@@ -2930,9 +4682,10 @@ class Game:
             # Use player kills as seed for consistent message until respawn
             msg_idx = (p.kills + int(p.respawn_timer / 30)) % len(death_msgs)
             dead = F['big'].render(death_msgs[msg_idx], True, C['red'])
-            screen.blit(dead, (SCREEN_W//2 - dead.get_width()//2, SCREEN_H//2 - 50))
+            self.screen.blit(dead, (SCREEN_W//2 - dead.get_width()//2, SCREEN_H//2 - 50))
             resp = F['main'].render("Respawning... try not to suck this time", True, C['white'])
-            screen.blit(resp, (SCREEN_W//2 - resp.get_width()//2, SCREEN_H//2 + 30))
+            self.screen.blit(resp, (SCREEN_W//2 - resp.get_width()//2, SCREEN_H//2 + 30))
+        return redrawn
     
     def draw_crosshair(self):
         p = self.player
@@ -2955,85 +4708,59 @@ class Game:
                 size = 25 + pulse
                 
                 # Corner brackets
-                pygame.draw.line(screen, C['red'], (cx - size, cy - size), (cx - size + 10, cy - size), 3)
-                pygame.draw.line(screen, C['red'], (cx - size, cy - size), (cx - size, cy - size + 10), 3)
-                pygame.draw.line(screen, C['red'], (cx + size, cy - size), (cx + size - 10, cy - size), 3)
-                pygame.draw.line(screen, C['red'], (cx + size, cy - size), (cx + size, cy - size + 10), 3)
-                pygame.draw.line(screen, C['red'], (cx - size, cy + size), (cx - size + 10, cy + size), 3)
-                pygame.draw.line(screen, C['red'], (cx - size, cy + size), (cx - size, cy + size - 10), 3)
-                pygame.draw.line(screen, C['red'], (cx + size, cy + size), (cx + size - 10, cy + size), 3)
-                pygame.draw.line(screen, C['red'], (cx + size, cy + size), (cx + size, cy + size - 10), 3)
+                pygame.draw.line(self.screen, C['red'], (cx - size, cy - size), (cx - size + 10, cy - size), 3)
+                pygame.draw.line(self.screen, C['red'], (cx - size, cy - size), (cx - size, cy - size + 10), 3)
+                pygame.draw.line(self.screen, C['red'], (cx + size, cy - size), (cx + size - 10, cy - size), 3)
+                pygame.draw.line(self.screen, C['red'], (cx + size, cy - size), (cx + size, cy - size + 10), 3)
+                pygame.draw.line(self.screen, C['red'], (cx - size, cy + size), (cx - size + 10, cy + size), 3)
+                pygame.draw.line(self.screen, C['red'], (cx - size, cy + size), (cx - size, cy + size - 10), 3)
+                pygame.draw.line(self.screen, C['red'], (cx + size, cy + size), (cx + size - 10, cy + size), 3)
+                pygame.draw.line(self.screen, C['red'], (cx + size, cy + size), (cx + size, cy + size - 10), 3)
                 
                 # Distance indicator
                 dist_txt = F['tiny'].render(f"{int(cop_dist)}m", True, C['red'])
-                screen.blit(dist_txt, (cx - dist_txt.get_width()//2, cy + size + 5))
+                self.screen.blit(dist_txt, (cx - dist_txt.get_width()//2, cy + size + 5))
             else:
                 # Normal crosshair when no target
                 mx, my = pygame.mouse.get_pos()
-                pygame.draw.circle(screen, C['white'], (mx, my), 16, 2)
-                pygame.draw.circle(screen, C['red'], (mx, my), 4)
+                pygame.draw.circle(self.screen, C['white'], (mx, my), 16, 2)
+                pygame.draw.circle(self.screen, C['red'], (mx, my), 4)
         elif has_weapon and p.ammo <= 0:
             # Empty crosshair
             mx, my = pygame.mouse.get_pos()
-            pygame.draw.circle(screen, (100, 100, 100), (mx, my), 16, 1)
-            pygame.draw.line(screen, (100, 100, 100), (mx - 12, my), (mx + 12, my), 1)
-            pygame.draw.line(screen, (100, 100, 100), (mx, my - 12), (mx, my + 12), 1)
+            pygame.draw.circle(self.screen, (100, 100, 100), (mx, my), 16, 1)
+            pygame.draw.line(self.screen, (100, 100, 100), (mx - 12, my), (mx + 12, my), 1)
+            pygame.draw.line(self.screen, (100, 100, 100), (mx, my - 12), (mx, my + 12), 1)
     
     def check_near_building(self):
         p = self.player
         if p.inside or p.in_vehicle:
             return None
         
-        px, py = p.center
+        pos = p.center
         
         # Check for nearby vehicle first
-        for vehicle in self.vehicles:
-            if not vehicle.occupied and math.hypot(px - vehicle.x, py - vehicle.y) < 80:
-                return f"{vehicle.vtype.upper()} (E to enter)"
-        
-        for rect, center in self.crack_dens:
-            if math.hypot(px - center[0], py - center[1]) < 80:
-                return "TRAP HOUSE"
-        for rect, center in self.strip_clubs:
-            if math.hypot(px - center[0], py - center[1]) < 80:
-                return "THE SPOT"
-        for rect, center in self.gunstores:
-            if math.hypot(px - center[0], py - center[1]) < 80:
-                return "TONY'S GUNS"
-        for rect, center in self.upgrade_shops:
-            if math.hypot(px - center[0], py - center[1]) < 80:
-                return "CHOP SHOP"
-        for rect, center in self.safe_houses:
-            if math.hypot(px - center[0], py - center[1]) < 80:
-                return "THE STASH"
-        for dealer in self.drug_dealers:
-            if math.hypot(px - dealer.center[0], py - dealer.center[1]) < 80:
-                return "PLUG"
+        vehicle, _ = self.query_nearest('vehicle', pos, self.INTERACT_RANGE,
+                                        lambda v: not v.occupied)
+        if vehicle:
+            return f"{vehicle.vtype.upper()} (E to enter)"
+        
+        for kind, label in self.SITES:
+            if self.query_nearest(kind, pos, self.INTERACT_RANGE)[0]:
+                return label
+        if self.get_nearby_dealer():
+            return "PLUG"
         return None
     
     def get_nearby_dealer(self):
         """Get the dealer closest to player if within range"""
-        p = self.player
-        px, py = p.center
-        for dealer in self.drug_dealers:
-            if math.hypot(px - dealer.center[0], py - dealer.center[1]) < 80:
-                return dealer
-        return None
+        dealer, _ = self.query_nearest('dealer', self.player.center, self.INTERACT_RANGE)
+        return dealer
     
     def get_nearest_cop(self, max_range=400):
         """Get the nearest cop within range for auto-aim"""
-        p = self.player
-        px, py = p.center
-        nearest = None
-        nearest_dist = max_range
-        
-        for cop in self.cops:
-            dist = math.hypot(cop.center[0] - px, cop.center[1] - py)
-            if dist < nearest_dist:
-                nearest = cop
-                nearest_dist = dist
-        
-        return nearest, nearest_dist if nearest else (None, 0)
+        nearest, nearest_dist = self.query_nearest('cop', self.player.center, max_range)
+        return (nearest, nearest_dist) if nearest else (None, 0)
     
     def draw_pause_screen(self):
         """Draw pause menu or win screen"""
@@ -3042,25 +4769,25 @@ class Game:
         # Darken background
         overlay = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 180))
-        screen.blit(overlay, (0, 0))
+        self.screen.blit(overlay, (0, 0))
         
         if self.game_won:
             # Win screen
             title = F['big'].render("MISSION COMPLETE", True, C['gold'])
-            screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 80))
+            self.screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 80))
             
             subtitle = F['main'].render("You dominated the streets.", True, C['neon'])
-            screen.blit(subtitle, (SCREEN_W//2 - subtitle.get_width()//2, 150))
+            self.screen.blit(subtitle, (SCREEN_W//2 - subtitle.get_width()//2, 150))
             
             flex = F['main'].render(f"${self.win_goal} secured. Absolute legend.", True, C['pink'])
-            screen.blit(flex, (SCREEN_W//2 - flex.get_width()//2, 190))
+            self.screen.blit(flex, (SCREEN_W//2 - flex.get_width()//2, 190))
         else:
             # Pause screen
             title = F['big'].render("PAUSED", True, C['white'])
-            screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 100))
+            self.screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 100))
             
             pause_msg = F['small'].render("(catch your breath, soldier)", True, (150, 150, 150))
-            screen.blit(pause_msg, (SCREEN_W//2 - pause_msg.get_width()//2, 160))
+            self.screen.blit(pause_msg, (SCREEN_W//2 - pause_msg.get_width()//2, 160))
         
         # Stats
         play_time = self.game_time // 60  # seconds
@@ -3079,21 +4806,21 @@ class Game:
         y = 240
         for stat in stats:
             txt = F['main'].render(stat, True, C['white'])
-            screen.blit(txt, (SCREEN_W//2 - txt.get_width()//2, y))
+            self.screen.blit(txt, (SCREEN_W//2 - txt.get_width()//2, y))
             y += 35
         
         # Instructions
         hint = F['small'].render("ESC to resume | Q to quit", True, (150, 150, 150))
-        screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, SCREEN_H - 80))
+        self.screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, SCREEN_H - 80))
         
         # Goal progress
         progress = min(1.0, p.total_earned / self.win_goal)
         bar_w = 400
-        pygame.draw.rect(screen, (40, 40, 50), (SCREEN_W//2 - bar_w//2, 520, bar_w, 30))
-        pygame.draw.rect(screen, C['gold'], (SCREEN_W//2 - bar_w//2, 520, int(bar_w * progress), 30))
-        pygame.draw.rect(screen, C['white'], (SCREEN_W//2 - bar_w//2, 520, bar_w, 30), 2)
+        pygame.draw.rect(self.screen, (40, 40, 50), (SCREEN_W//2 - bar_w//2, 520, bar_w, 30))
+        pygame.draw.rect(self.screen, C['gold'], (SCREEN_W//2 - bar_w//2, 520, int(bar_w * progress), 30))
+        pygame.draw.rect(self.screen, C['white'], (SCREEN_W//2 - bar_w//2, 520, bar_w, 30), 2)
         goal_txt = F['small'].render(f"Empire Progress: ${p.total_earned} / ${self.win_goal}", True, C['white'])
-        screen.blit(goal_txt, (SCREEN_W//2 - goal_txt.get_width()//2, 555))
+        self.screen.blit(goal_txt, (SCREEN_W//2 - goal_txt.get_width()//2, 555))
     
     def draw_mission_select(self):
         """Draw mission selection screen"""
@@ -3102,32 +4829,32 @@ class Game:
         # Darken background
         overlay = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 200))
-        screen.blit(overlay, (0, 0))
+        self.screen.blit(overlay, (0, 0))
         
         title = F['big'].render("CONTRACTS", True, C['neon'])
-        screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 60))
+        self.screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 60))
         
         if self.active_mission:
             # Show active mission with abandon option
             active_txt = F['main'].render("ACTIVE CONTRACT:", True, C['gold'])
-            screen.blit(active_txt, (SCREEN_W//2 - active_txt.get_width()//2, 150))
+            self.screen.blit(active_txt, (SCREEN_W//2 - active_txt.get_width()//2, 150))
             
             m = self.active_mission
             desc_txt = F['main'].render(m.description, True, C['white'])
-            screen.blit(desc_txt, (SCREEN_W//2 - desc_txt.get_width()//2, 200))
+            self.screen.blit(desc_txt, (SCREEN_W//2 - desc_txt.get_width()//2, 200))
             
             progress_txt = F['main'].render(f"Status: {m.get_progress_text()}", True, C['neon'])
-            screen.blit(progress_txt, (SCREEN_W//2 - progress_txt.get_width()//2, 240))
+            self.screen.blit(progress_txt, (SCREEN_W//2 - progress_txt.get_width()//2, 240))
             
             reward_txt = F['main'].render(f"Payout: ${m.reward}", True, C['gold'])
-            screen.blit(reward_txt, (SCREEN_W//2 - reward_txt.get_width()//2, 280))
+            self.screen.blit(reward_txt, (SCREEN_W//2 - reward_txt.get_width()//2, 280))
             
             hint = F['small'].render("X to abort | TAB to close", True, (150, 150, 150))
-            screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, SCREEN_H - 80))
+            self.screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, SCREEN_H - 80))
         else:
             # Show available missions
             subtitle = F['main'].render(f"Difficulty: {1 + self.completed_missions // 3}", True, C['white'])
-            screen.blit(subtitle, (SCREEN_W//2 - subtitle.get_width()//2, 130))
+            self.screen.blit(subtitle, (SCREEN_W//2 - subtitle.get_width()//2, 130))
             
             if not hasattr(self, 'mission_selection'):
                 self.mission_selection = 0
@@ -3139,36 +4866,36 @@ class Game:
                 col = C['neon'] if selected else C['white']
                 
                 txt = F['main'].render(f"{prefix}{mission.description}", True, col)
-                screen.blit(txt, (SCREEN_W//2 - 200, y))
+                self.screen.blit(txt, (SCREEN_W//2 - 200, y))
                 
                 reward_txt = F['small'].render(f"${mission.reward}", True, C['gold'])
-                screen.blit(reward_txt, (SCREEN_W//2 + 150, y + 5))
+                self.screen.blit(reward_txt, (SCREEN_W//2 + 150, y + 5))
                 
                 y += 45
             
             hint = F['small'].render("W/S = Select | SPACE = Accept | TAB = Close", True, (150, 150, 150))
-            screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, SCREEN_H - 80))
+            self.screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, SCREEN_H - 80))
     
     def draw_title_screen(self):
         """Draw the title screen"""
         # Background with animated elements
-        screen.fill(C['dark_purple'])
+        self.screen.fill(C['dark_purple'])
         
         # Draw some decorative blood splatters
         for i in range(20):
             x = (i * 137 + self.game_time) % SCREEN_W
             y = (i * 89) % SCREEN_H
             size = 10 + (i % 15)
-            pygame.draw.circle(screen, C['blood'], (x, y), size)
+            pygame.draw.circle(self.screen, C['blood'], (x, y), size)
         
         # Title
         title = F['big'].render("BLOODBATH", True, C['red'])
         title_shadow = F['big'].render("BLOODBATH", True, (100, 0, 0))
-        screen.blit(title_shadow, (SCREEN_W//2 - title.get_width()//2 + 4, 104))
-        screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 100))
+        self.screen.blit(title_shadow, (SCREEN_W//2 - title.get_width()//2 + 4, 104))
+        self.screen.blit(title, (SCREEN_W//2 - title.get_width()//2, 100))
         
         subtitle = F['main'].render("R P G", True, C['gold'])
-        screen.blit(subtitle, (SCREEN_W//2 - subtitle.get_width()//2, 180))
+        self.screen.blit(subtitle, (SCREEN_W//2 - subtitle.get_width()//2, 180))
         
         # Rotating aggressive taglines
         taglines = [
@@ -3179,7 +4906,7 @@ class Game:
         ]
         tagline_idx = (self.game_time // 120) % len(taglines)
         tag = F['small'].render(f"[ {taglines[tagline_idx]} ]", True, C['pink'])
-        screen.blit(tag, (SCREEN_W//2 - tag.get_width()//2, 220))
+        self.screen.blit(tag, (SCREEN_W//2 - tag.get_width()//2, 220))
         
         # Menu options
         options = ["START THE CARNAGE", "CONTROLS", "QUIT (coward)"]
@@ -3189,7 +4916,7 @@ class Game:
             col = C['gold'] if selected else C['white']
             prefix = "► " if selected else "  "
             txt = F['main'].render(prefix + option, True, col)
-            screen.blit(txt, (SCREEN_W//2 - txt.get_width()//2, y))
+            self.screen.blit(txt, (SCREEN_W//2 - txt.get_width()//2, y))
             y += 50
         
         # Controls info (if selected)
@@ -3205,12 +4932,12 @@ class Game:
             y = 480
             for ctrl in controls:
                 txt = F['small'].render(ctrl, True, C['neon'])
-                screen.blit(txt, (SCREEN_W//2 - txt.get_width()//2, y))
+                self.screen.blit(txt, (SCREEN_W//2 - txt.get_width()//2, y))
                 y += 25
         
         # Version info
         ver = F['tiny'].render("v1.4 - No Mercy Update", True, (100, 100, 100))
-        screen.blit(ver, (10, SCREEN_H - 25))
+        self.screen.blit(ver, (10, SCREEN_H - 25))
     
     def draw_day_night_overlay(self):
         """Apply day/night cycle lighting"""
@@ -3224,35 +4951,383 @@ class Game:
         # 0.65-0.75: Dusk
         # 0.75-1.0: Night
         
-        overlay = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA)
-        
+        lights = ()
         if time_ratio < 0.25 or time_ratio > 0.75:
             # Night - blue tint
-            alpha = 80
-            overlay.fill((0, 0, 50, alpha))
+            tint, alpha = (0, 0, 50), 80
+            if self.light_map:
+                lights = self.visible_lights()
         elif time_ratio < 0.35:
             # Dawn - orange/pink tint
             alpha = int(50 * (0.35 - time_ratio) / 0.1)
-            overlay.fill((80, 40, 60, alpha))
+            tint = (80, 40, 60)
         elif time_ratio > 0.65:
             # Dusk - orange tint
             alpha = int(50 * (time_ratio - 0.65) / 0.1)
-            overlay.fill((80, 40, 20, alpha))
+            tint = (80, 40, 20)
         else:
             # Day - no overlay
             return
         
-        screen.blit(overlay, (0, 0))
+        self.lighting.apply(self.screen, tint, alpha, lights)
+    
+    def visible_lights(self):
+        """Streetlight pools and lit windows on screen, in screen space"""
+        cam = self.camera
+        ox, oy = int(cam[0]), int(cam[1])
+        lights = []
+        for prop in self.visible('prop', 120):
+            if prop['type'] != 'streetlight':
+                continue
+            px, py = prop['x'] - ox, prop['y'] - oy
+            if -120 < px < SCREEN_W + 120 and -120 < py < SCREEN_H + 120:
+                lights.append((px + 20, py + 20, 90))
+        for b in self.visible('building', TILE):
+            bx, by = b.x - ox, b.y - oy
+            if -TILE < bx < SCREEN_W and -TILE < by < SCREEN_H:
+                style = self.building_styles.get(id(b), self.DEFAULT_STYLE)
+                for wx, wy, ww, wh in self.lit_windows(style, b.x % 3):
+                    lights.append((bx + wx, by + wy, ww, wh))
+        return tuple(lights)
     
-    def run(self):
+    def capture_positions(self):
+        """Remember where everything drawn stands before the next tick moves it"""
+        crowd = self.civilians if CROWD_STORE else None
+        self.interp.capture(
+            itertools.chain((self.player,), self.cops, self.gang_members, self.hoes, self.vehicles,
+                            self.bullets, () if CROWD_STORE else self.civilians),
+            dicts=itertools.chain(self.police_cars, self.rockets, self.floating_texts), crowd=crowd, camera=self.camera)
+    
+    def step(self, keys, shoot, mouse=(0, 0), presses=()):
+        """One fixed tick: player input, camera and the world
+
+        keys are the keys held, shoot whether the player fired and mouse
+        where they aimed, and presses the keys pressed since the last tick.
+        Nothing else reaches the simulation, which is what makes an InputLog
+        replay the game exactly.
+        """
+        for key in presses:
+            self.press(key)
+        if self.paused or self.mission_menu:
+            return
+        p = self.player
+        self.game_time += 1
+        
+        # Movement
+        if p.alive and not p.inside:
+            if p.in_vehicle and p.current_vehicle:
+                # Vehicle driving controls
+                vehicle = p.current_vehicle
+        
+                # W/S for acceleration/brake
+                accel = (keys[pygame.K_w] or keys[pygame.K_UP]) - (keys[pygame.K_s] or keys[pygame.K_DOWN])
+                # A/D for steering
+                steer = (keys[pygame.K_d] or keys[pygame.K_RIGHT]) - (keys[pygame.K_a] or keys[pygame.K_LEFT])
+        
+                # Apply acceleration
+                if accel > 0:
+                    vehicle.velocity = min(vehicle.velocity + 0.3, vehicle.max_speed)
+                elif accel < 0:
+                    vehicle.velocity = max(vehicle.velocity - 0.5, -vehicle.max_speed * 0.5)
+                else:
+                    # Friction
+                    vehicle.velocity *= 0.97
+        
+                # Apply steering (only when moving)
+                if abs(vehicle.velocity) > 0.5:
+                    vehicle.angle += steer * 0.04 * (vehicle.velocity / vehicle.max_speed)
+        
+                # Move vehicle
+                nx = vehicle.x + math.cos(vehicle.angle) * vehicle.velocity
+                ny = vehicle.y + math.sin(vehicle.angle) * vehicle.velocity
+        
+                # Check collision
+                if not self.collides(nx - vehicle.w//2, ny - vehicle.h//2, vehicle.w, vehicle.h):
+                    vehicle.x = nx
+                    vehicle.y = ny
+                else:
+                    vehicle.velocity *= -0.5  # Bounce back
+                    self.spawn_particles(vehicle.x, vehicle.y, 'spark', 5)
+        
+                # Keep in bounds
+                vehicle.x = max(vehicle.w, min(MAP_W*TILE - vehicle.w, vehicle.x))
+                vehicle.y = max(vehicle.h, min(MAP_H*TILE - vehicle.h, vehicle.y))
+        
+                # Update player position to match vehicle
+                p.x = vehicle.x - p.w//2
+                p.y = vehicle.y - p.h//2
+            else:
+                # Normal on-foot movement
+                dx = (keys[pygame.K_d] or keys[pygame.K_RIGHT]) - (keys[pygame.K_a] or keys[pygame.K_LEFT])
+                dy = (keys[pygame.K_s] or keys[pygame.K_DOWN]) - (keys[pygame.K_w] or keys[pygame.K_UP])
+        
+                if dx and dy:
+                    dx *= 0.707
+                    dy *= 0.707
+        
+                actual_speed = p.speed + p.speed_bonus
+                nx = p.x + dx * actual_speed
+                ny = p.y + dy * actual_speed
+        
+                if not self.collides(nx, p.y, p.w, p.h):
+                    p.x = nx
+                if not self.collides(p.x, ny, p.w, p.h):
+                    p.y = ny
+        
+                p.x = max(0, min(MAP_W*TILE - p.w, p.x))
+                p.y = max(0, min(MAP_H*TILE - p.h, p.y))
+        
+        # Shooting with auto-aim
+        if shoot and p.alive and not p.inside:
+            # Check for nearest cop to auto-aim
+            nearest_cop, cop_dist = self.get_nearest_cop(400)
+        
+            if nearest_cop:
+                # Auto-aim at nearest cop
+                angle = math.atan2(
+                    nearest_cop.center[1] - p.center[1],
+                    nearest_cop.center[0] - p.center[0]
+                )
+            else:
+                # Manual aim with mouse
+                mx, my = mouse
+                angle = math.atan2(my - SCREEN_H//2, mx - SCREEN_W//2)
+        
+            self.shoot(angle)
+        
+        # Update camera
+        self.camera[0] += (p.x - SCREEN_W//2 + p.w//2 - self.camera[0]) * 0.1
+        self.camera[1] += (p.y - SCREEN_H//2 + p.h//2 - self.camera[1]) * 0.1
+        
+        # Apply screen shake
+        if p.screen_shake > 0:
+            self.camera[0] += self.fx_rng.randint(-5, 5)
+            self.camera[1] += self.fx_rng.randint(-5, 5)
+        
+        
+        # Update game
+        self.update(self.TICK)
+    
+    def press(self, key):
+        """Act on one key pressed (or mouse wheel turned) during play"""
+        # Mouse wheel weapon cycling
+        if key in (InputLog.WHEEL_UP, InputLog.WHEEL_DOWN):
+            p = self.player
+            if p.inside:
+                return
+            weapons = []
+            if p.has_gun: weapons.append('pistol')
+            if p.has_shotgun: weapons.append('shotgun')
+            if p.has_uzi: weapons.append('uzi')
+            if p.has_rifle: weapons.append('rifle')
+            if p.has_rpg: weapons.append('rpg')
+            if len(weapons) > 0:
+                try:
+                    idx = weapons.index(p.current_weapon)
+                except ValueError:
+                    idx = 0
+                if key == InputLog.WHEEL_UP:
+                    idx = (idx - 1) % len(weapons)
+                else:
+                    idx = (idx + 1) % len(weapons)
+                p.current_weapon = weapons[idx]
+                self.show_notification(weapons[idx].upper(), 30)
+            return
+        
+        # Handle pause/quit
+        if key == pygame.K_ESCAPE:
+            if self.mission_menu:
+                self.mission_menu = False
+            elif self.paused:
+                self.paused = False
+            elif self.player.inside:
+                self.exit_building()
+            else:
+                self.paused = True
+        
+        # Mission menu toggle
+        if key == pygame.K_TAB and not self.player.inside and not self.paused:
+            self.mission_menu = not self.mission_menu
+            if self.mission_menu:
+                self.mission_selection = 0
+        
+        # Mission menu navigation
+        if self.mission_menu:
+            if key == pygame.K_w or key == pygame.K_UP:
+                if len(self.available_missions) > 0:
+                    self.mission_selection = (self.mission_selection - 1) % len(self.available_missions)
+            if key == pygame.K_s or key == pygame.K_DOWN:
+                if len(self.available_missions) > 0:
+                    self.mission_selection = (self.mission_selection + 1) % len(self.available_missions)
+            if key == pygame.K_SPACE and not self.active_mission:
+                # Accept selected mission
+                if len(self.available_missions) > 0:
+                    self.start_mission(self.available_missions[self.mission_selection])
+                    self.mission_menu = False
+            if key == pygame.K_x and self.active_mission:
+                # Abandon mission
+                self.abandon_mission()
+            return
+        
+        # Skip other inputs if paused
+        if self.paused:
+            return
+        
+        if key == pygame.K_e:
+            # E key - enter buildings OR vehicles
+            if self.player.in_vehicle:
+                self.exit_vehicle()
+            elif self.get_nearby_vehicle():
+                self.enter_vehicle()
+            else:
+                self.enter_building()
+        if key == pygame.K_f:
+            # F key - exit vehicle (alternative)
+            if self.player.in_vehicle:
+                self.exit_vehicle()
+        if key == pygame.K_SPACE:
+            if self.player.inside:
+                self.interact()
+            elif not self.player.in_vehicle:
+                self.melee()
+        # Radio toggle (R key while in vehicle)
+        if key == pygame.K_r and self.player.in_vehicle:
+            self.current_station = (self.current_station + 1) % len(self.radio_stations)
+            station = self.radio_stations[self.current_station]
+            if station['name'] == 'OFF':
+                self.show_notification("Radio: OFF", 60)
+            else:
+                self.show_notification(f"Radio: {station['name']} ({station['genre']})", 90)
+        
+        # Weapon switching (1-5 keys)
+        p = self.player
+        if not p.inside:
+            if key == pygame.K_1 and p.has_gun:
+                p.current_weapon = 'pistol'
+                self.show_notification("Pistol", 30)
+            elif key == pygame.K_2 and p.has_shotgun:
+                p.current_weapon = 'shotgun'
+                self.show_notification("Shotgun", 30)
+            elif key == pygame.K_3 and p.has_uzi:
+                p.current_weapon = 'uzi'
+                self.show_notification("Uzi", 30)
+            elif key == pygame.K_4 and p.has_rifle:
+                p.current_weapon = 'rifle'
+                self.show_notification("Rifle", 30)
+            elif key == pygame.K_5 and p.has_rpg:
+                p.current_weapon = 'rpg'
+                self.show_notification("RPG", 30)
+        
+        # Menu navigation when inside buildings
+        if self.player.inside:
+            p = self.player
+            
+            # RIZZ BATTLE rhythm game
+            if p.building_type == 'strip' and len(p.rizz_sequence) > 0:
+                key_pressed = None
+                if key == pygame.K_w: key_pressed = 'W'
+                elif key == pygame.K_a: key_pressed = 'A'
+                elif key == pygame.K_s: key_pressed = 'S'
+                elif key == pygame.K_d: key_pressed = 'D'
+                
+                if key_pressed and p.rizz_index < len(p.rizz_sequence):
+                    expected = p.rizz_sequence[p.rizz_index]
+                    if key_pressed == expected:
+                        # CORRECT!
+                        p.rizz_combo += 1
+                        combo_bonus = min(p.rizz_combo, 10)
+                        points = 50 * combo_bonus
+                        p.rizz_score += points
+                        p.rizz_index += 1
+                        p.rizz_timer = 120
+                        
+                        # Aggressive feedback messages
+                        messages = [
+                            "NICE.", "SOLID.", "CLEAN.", "LETHAL.",
+                            "BRUTAL.", "SAVAGE.", "RELENTLESS.", "MERCILESS.",
+                            "COLD BLOODED.", "NO HESITATION.", "DOMINANT.",
+                            "RUTHLESS.", "UNSTOPPABLE."
+                        ]
+                        p.rizz_message = self.economy_rng.choice(messages) + f" +{points}"
+                        p.rizz_message_timer = 40
+                        
+                        # Check if completed sequence
+                        if p.rizz_index >= len(p.rizz_sequence):
+                            if p.rizz_score >= p.rizz_target:
+                                # RECRUIT SUCCESS
+                                hoe = Hoe(p.entry_pos[0] + self.economy_rng.randint(-50, 50),
+                                         p.entry_pos[1] + self.economy_rng.randint(-50, 50),
+                                         rng=self.economy_rng)
+                                self.hoes.append(hoe)
+                                p.cash += 100 + p.rizz_combo * 10
+                                p.rizz_message = "RESPECT EARNED. +1 RECRUIT"
+                                p.rizz_message_timer = 90
+                            else:
+                                p.rizz_message = "NOT GOOD ENOUGH. AGAIN."
+                                p.rizz_message_timer = 90
+                            # Reset for next round
+                            p.rizz_sequence = [self.economy_rng.choice(['W', 'A', 'S', 'D']) for _ in range(8)]
+                            p.rizz_index = 0
+                            p.rizz_combo = 0
+                            p.rizz_score = 0
+                            p.rizz_timer = 120
+                    else:
+                        # WRONG! Combo broken
+                        p.rizz_combo = 0
+                        fails = ["WEAK.", "PATHETIC.", "SLOPPY.", 
+                                 "AMATEUR HOUR.", "EMBARRASSING.", "TRASH.",
+                                 "YOU CALL THAT A TRY?", "DO BETTER."]
+                        p.rizz_message = self.economy_rng.choice(fails)
+                        p.rizz_message_timer = 40
+            
+            elif key == pygame.K_w or key == pygame.K_UP:
+                if p.building_type == 'gun':
+                    p.gun_selection = (p.gun_selection - 1) % 7
+                elif p.building_type == 'dealer':
+                    p.dealer_selection = (p.dealer_selection - 1) % 2
+                elif p.building_type == 'upgrade':
+                    p.upgrade_selection = (p.upgrade_selection - 1) % 4
+                elif p.building_type == 'safe':
+                    p.safe_selection = (p.safe_selection - 1) % 2
+            elif key == pygame.K_s or key == pygame.K_DOWN:
+                if p.building_type == 'gun':
+                    p.gun_selection = (p.gun_selection + 1) % 7
+                elif p.building_type == 'dealer':
+                    p.dealer_selection = (p.dealer_selection + 1) % 2
+                elif p.building_type == 'upgrade':
+                    p.upgrade_selection = (p.upgrade_selection + 1) % 4
+                elif p.building_type == 'safe':
+                    p.safe_selection = (p.safe_selection + 1) % 2
+    
+    def soak(self, ticks):
+        """Step the world ticks times with nobody at the controls"""
+        self.game_state = 'playing'
+        idle = collections.defaultdict(bool)  # no keys held
+        for _ in range(ticks):
+            self.step(idle, False)
+    
+    def replay(self, log):
+        """Play a recorded game back tick for tick"""
+        self.game_state = 'playing'
+        self.game_time = log.start
+        for keys, shoot, mouse, presses in log:
+            self.step(keys, shoot, mouse, presses)
+    
+    def run(self, log=None):
+        """Play in the window, logging every tick's input to log if given"""
         running = True
+        lag = 0.0  # real time the world has yet to be ticked through
+        shoot = False
+        presses = []  # keys pressed since the last tick
         
         while running:
-            dt = clock.tick(FPS) / 1000.0
-            self.game_time += 1
+            lag += clock.tick(FPS) / 1000.0
             
             # Handle title screen
             if self.game_state == 'title':
+                while lag >= self.TICK:
+                    self.game_time += 1
+                    lag -= self.TICK
                 for e in pygame.event.get():
                     if e.type == pygame.QUIT:
                         running = False
@@ -3264,6 +5339,8 @@ class Game:
                         if e.key == pygame.K_RETURN or e.key == pygame.K_SPACE:
                             if self.title_selection == 0:
                                 self.game_state = 'playing'
+                                if log is not None:
+                                    log.start = self.game_time
                             elif self.title_selection == 2:
                                 running = False
                         if e.key == pygame.K_ESCAPE:
@@ -3273,213 +5350,67 @@ class Game:
                 pygame.display.flip()
                 continue
             
-            # Events
-            shoot = False
+            # Profiling (F3) times this frame's phases
+            prof = self.profiler if self.profiler.on else None
+            if prof:
+                t = prof.next_frame(self)
+            
+            # Events (a click waits for the next tick if this frame runs none)
             for e in pygame.event.get():
                 if e.type == pygame.QUIT:
                     running = False
                 if e.type == pygame.KEYDOWN:
-                    # Handle pause/quit
-                    if e.key == pygame.K_ESCAPE:
-                        if self.mission_menu:
-                            self.mission_menu = False
-                        elif self.paused:
-                            self.paused = False
-                        elif self.player.inside:
-                            self.exit_building()
-                        else:
-                            self.paused = True
                     if e.key == pygame.K_q and self.paused:
                         running = False
-                    
-                    # Mission menu toggle
-                    if e.key == pygame.K_TAB and not self.player.inside and not self.paused:
-                        self.mission_menu = not self.mission_menu
-                        if self.mission_menu:
-                            self.mission_selection = 0
-                    
-                    # Mission menu navigation
-                    if self.mission_menu:
-                        if e.key == pygame.K_w or e.key == pygame.K_UP:
-                            if len(self.available_missions) > 0:
-                                self.mission_selection = (self.mission_selection - 1) % len(self.available_missions)
-                        if e.key == pygame.K_s or e.key == pygame.K_DOWN:
-                            if len(self.available_missions) > 0:
-                                self.mission_selection = (self.mission_selection + 1) % len(self.available_missions)
-                        if e.key == pygame.K_SPACE and not self.active_mission:
-                            # Accept selected mission
-                            if len(self.available_missions) > 0:
-                                self.start_mission(self.available_missions[self.mission_selection])
-                                self.mission_menu = False
-                        if e.key == pygame.K_x and self.active_mission:
-                            # Abandon mission
-                            self.abandon_mission()
-                        continue
-                    
-                    # Skip other inputs if paused
-                    if self.paused:
-                        continue
-                    
-                    if e.key == pygame.K_e:
-                        # E key - enter buildings OR vehicles
-                        if self.player.in_vehicle:
-                            self.exit_vehicle()
-                        elif self.get_nearby_vehicle():
-                            self.enter_vehicle()
-                        else:
-                            self.enter_building()
-                    if e.key == pygame.K_f:
-                        # F key - exit vehicle (alternative)
-                        if self.player.in_vehicle:
-                            self.exit_vehicle()
-                    if e.key == pygame.K_SPACE:
-                        if self.player.inside:
-                            self.interact()
-                        elif not self.player.in_vehicle:
-                            self.melee()
-                    if e.key == pygame.K_F11:
-                        pygame.display.toggle_fullscreen()
-                    # Radio toggle (R key while in vehicle)
-                    if e.key == pygame.K_r and self.player.in_vehicle:
-                        self.current_station = (self.current_station + 1) % len(self.radio_stations)
-                        station = self.radio_stations[self.current_station]
-                        if station['name'] == 'OFF':
-                            self.show_notification("Radio: OFF", 60)
-                        else:
-                            self.show_notification(f"Radio: {station['name']} ({station['genre']})", 90)
-                    
-                    # Weapon switching (1-5 keys)
-                    p = self.player
-                    if not p.inside:
-                        if e.key == pygame.K_1 and p.has_gun:
-                            p.current_weapon = 'pistol'
-                            self.show_notification("Pistol", 30)
-                        elif e.key == pygame.K_2 and p.has_shotgun:
-                            p.current_weapon = 'shotgun'
-                            self.show_notification("Shotgun", 30)
-                        elif e.key == pygame.K_3 and p.has_uzi:
-                            p.current_weapon = 'uzi'
-                            self.show_notification("Uzi", 30)
-                        elif e.key == pygame.K_4 and p.has_rifle:
-                            p.current_weapon = 'rifle'
-                            self.show_notification("Rifle", 30)
-                        elif e.key == pygame.K_5 and p.has_rpg:
-                            p.current_weapon = 'rpg'
-                            self.show_notification("RPG", 30)
-                    
-                    # Menu navigation when inside buildings
-                    if self.player.inside:
-                        p = self.player
-                        
-                        # RIZZ BATTLE rhythm game
-                        if p.building_type == 'strip' and len(p.rizz_sequence) > 0:
-                            key_pressed = None
-                            if e.key == pygame.K_w: key_pressed = 'W'
-                            elif e.key == pygame.K_a: key_pressed = 'A'
-                            elif e.key == pygame.K_s: key_pressed = 'S'
-                            elif e.key == pygame.K_d: key_pressed = 'D'
-                            
-                            if key_pressed and p.rizz_index < len(p.rizz_sequence):
-                                expected = p.rizz_sequence[p.rizz_index]
-                                if key_pressed == expected:
-                                    # CORRECT!
-                                    p.rizz_combo += 1
-                                    combo_bonus = min(p.rizz_combo, 10)
-                                    points = 50 * combo_bonus
-                                    p.rizz_score += points
-                                    p.rizz_index += 1
-                                    p.rizz_timer = 120
-                                    
-                                    # Aggressive feedback messages
-                                    messages = [
-                                        "NICE.", "SOLID.", "CLEAN.", "LETHAL.",
-                                        "BRUTAL.", "SAVAGE.", "RELENTLESS.", "MERCILESS.",
-                                        "COLD BLOODED.", "NO HESITATION.", "DOMINANT.",
-                                        "RUTHLESS.", "UNSTOPPABLE."
-                                    ]
-                                    p.rizz_message = random.choice(messages) + f" +{points}"
-                                    p.rizz_message_timer = 40
-                                    
-                                    # Check if completed sequence
-                                    if p.rizz_index >= len(p.rizz_sequence):
-                                        if p.rizz_score >= p.rizz_target:
-                                            # RECRUIT SUCCESS
-                                            hoe = Hoe(p.entry_pos[0] + random.randint(-50, 50),
-                                                     p.entry_pos[1] + random.randint(-50, 50))
-                                            self.hoes.append(hoe)
-                                            p.cash += 100 + p.rizz_combo * 10
-                                            p.rizz_message = "RESPECT EARNED. +1 RECRUIT"
-                                            p.rizz_message_timer = 90
-                                        else:
-                                            p.rizz_message = "NOT GOOD ENOUGH. AGAIN."
-                                            p.rizz_message_timer = 90
-                                        # Reset for next round
-                                        p.rizz_sequence = [random.choice(['W', 'A', 'S', 'D']) for _ in range(8)]
-                                        p.rizz_index = 0
-                                        p.rizz_combo = 0
-                                        p.rizz_score = 0
-                                        p.rizz_timer = 120
-                                else:
-                                    # WRONG! Combo broken
-                                    p.rizz_combo = 0
-                                    fails = ["WEAK.", "PATHETIC.", "SLOPPY.", 
-                                             "AMATEUR HOUR.", "EMBARRASSING.", "TRASH.",
-                                             "YOU CALL THAT A TRY?", "DO BETTER."]
-                                    p.rizz_message = random.choice(fails)
-                                    p.rizz_message_timer = 40
-                        
-                        elif e.key == pygame.K_w or e.key == pygame.K_UP:
-                            if p.building_type == 'gun':
-                                p.gun_selection = (p.gun_selection - 1) % 7
-                            elif p.building_type == 'dealer':
-                                p.dealer_selection = (p.dealer_selection - 1) % 2
-                            elif p.building_type == 'upgrade':
-                                p.upgrade_selection = (p.upgrade_selection - 1) % 4
-                            elif p.building_type == 'safe':
-                                p.safe_selection = (p.safe_selection - 1) % 2
-                        elif e.key == pygame.K_s or e.key == pygame.K_DOWN:
-                            if p.building_type == 'gun':
-                                p.gun_selection = (p.gun_selection + 1) % 7
-                            elif p.building_type == 'dealer':
-                                p.dealer_selection = (p.dealer_selection + 1) % 2
-                            elif p.building_type == 'upgrade':
-                                p.upgrade_selection = (p.upgrade_selection + 1) % 4
-                            elif p.building_type == 'safe':
-                                p.safe_selection = (p.safe_selection + 1) % 2
+                    if not self.paused and not self.mission_menu:
+                        if e.key == pygame.K_F11:
+                            pygame.display.toggle_fullscreen()
+                        if e.key == pygame.K_F2:
+                            self.show_hud_stats = not self.show_hud_stats
+                        if e.key == pygame.K_m:
+                            self.show_map = not self.show_map
+                        if e.key == pygame.K_l:
+                            self.light_map = not self.light_map
+                        # Reported in the profiler panel, not as a notification, which is game state
+                        if e.key == pygame.K_F3:
+                            self.profiler.toggle(self)
+                        if e.key == pygame.K_F4 and self.profiler.on:
+                            self.profiler.dump()
+                    presses.append(e.key)
                 if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
                     if not self.paused:
                         shoot = True
-                # Mouse wheel weapon cycling
-                if e.type == pygame.MOUSEWHEEL and not self.player.inside:
-                    p = self.player
-                    weapons = []
-                    if p.has_gun: weapons.append('pistol')
-                    if p.has_shotgun: weapons.append('shotgun')
-                    if p.has_uzi: weapons.append('uzi')
-                    if p.has_rifle: weapons.append('rifle')
-                    if p.has_rpg: weapons.append('rpg')
-                    if len(weapons) > 0:
-                        try:
-                            idx = weapons.index(p.current_weapon)
-                        except ValueError:
-                            idx = 0
-                        if e.y > 0:  # Scroll up
-                            idx = (idx - 1) % len(weapons)
-                        else:  # Scroll down
-                            idx = (idx + 1) % len(weapons)
-                        p.current_weapon = weapons[idx]
-                        self.show_notification(weapons[idx].upper(), 30)
+                if e.type == pygame.MOUSEWHEEL:
+                    presses.append(InputLog.WHEEL_UP if e.y > 0 else InputLog.WHEEL_DOWN)
             
             # Held keys
             keys = pygame.key.get_pressed()
+            mouse = pygame.mouse.get_pos()
             p = self.player  # Need p defined for pause screen
             if pygame.mouse.get_pressed()[0] and not self.paused:
                 shoot = True
+            if prof:
+                prof.span('input', t)
             
-            # Skip game logic if paused
+            # Fixed ticks catch the world up to real time; a frame slower than
+            # MAX_TICKS ticks lets the world slow down rather than stall drawing.
+            # Paused ticks only take the keys that unpause.
+            ticks = 0
+            while lag >= self.TICK and ticks < self.MAX_TICKS:
+                self.capture_positions()
+                if log is not None:
+                    log.append(keys, shoot, mouse, presses)
+                self.step(keys, shoot, mouse, presses)
+                shoot = False
+                presses = []
+                lag -= self.TICK
+                ticks += 1
+            lag = min(lag, self.TICK)
+            
+            # Skip drawing the world if paused
             if self.paused:
                 # Draw game state behind pause menu
-                screen.fill(C['bg'])
+                self.screen.fill(C['bg'])
                 if p.inside:
                     self.draw_interior()
                 else:
@@ -3487,117 +5418,27 @@ class Game:
                 self.draw_hud()
                 self.draw_pause_screen()
                 pygame.display.flip()
+                self.interior_frame = None
                 continue
             
-            # Skip game logic if mission menu open
+            # Skip drawing the world if mission menu open
             if self.mission_menu:
-                screen.fill(C['bg'])
+                self.screen.fill(C['bg'])
                 self.draw_world()
                 self.draw_hud()
                 self.draw_mission_select()
                 pygame.display.flip()
+                self.interior_frame = None
                 continue
             
-            # Movement
-            if p.alive and not p.inside:
-                if p.in_vehicle and p.current_vehicle:
-                    # Vehicle driving controls
-                    vehicle = p.current_vehicle
-                    
-                    # W/S for acceleration/brake
-                    accel = (keys[pygame.K_w] or keys[pygame.K_UP]) - (keys[pygame.K_s] or keys[pygame.K_DOWN])
-                    # A/D for steering
-                    steer = (keys[pygame.K_d] or keys[pygame.K_RIGHT]) - (keys[pygame.K_a] or keys[pygame.K_LEFT])
-                    
-                    # Apply acceleration
-                    if accel > 0:
-                        vehicle.velocity = min(vehicle.velocity + 0.3, vehicle.max_speed)
-                    elif accel < 0:
-                        vehicle.velocity = max(vehicle.velocity - 0.5, -vehicle.max_speed * 0.5)
-                    else:
-                        # Friction
-                        vehicle.velocity *= 0.97
-                    
-                    # Apply steering (only when moving)
-                    if abs(vehicle.velocity) > 0.5:
-                        vehicle.angle += steer * 0.04 * (vehicle.velocity / vehicle.max_speed)
-                    
-                    # Move vehicle
-                    nx = vehicle.x + math.cos(vehicle.angle) * vehicle.velocity
-                    ny = vehicle.y + math.sin(vehicle.angle) * vehicle.velocity
-                    
-                    # Check collision
-                    if not self.collides(nx - vehicle.w//2, ny - vehicle.h//2, vehicle.w, vehicle.h):
-                        vehicle.x = nx
-                        vehicle.y = ny
-                    else:
-                        vehicle.velocity *= -0.5  # Bounce back
-                        self.spawn_particles(vehicle.x, vehicle.y, 'spark', 5)
-                    
-                    # Keep in bounds
-                    vehicle.x = max(vehicle.w, min(MAP_W*TILE - vehicle.w, vehicle.x))
-                    vehicle.y = max(vehicle.h, min(MAP_H*TILE - vehicle.h, vehicle.y))
-                    
-                    # Update player position to match vehicle
-                    p.x = vehicle.x - p.w//2
-                    p.y = vehicle.y - p.h//2
-                else:
-                    # Normal on-foot movement
-                    dx = (keys[pygame.K_d] or keys[pygame.K_RIGHT]) - (keys[pygame.K_a] or keys[pygame.K_LEFT])
-                    dy = (keys[pygame.K_s] or keys[pygame.K_DOWN]) - (keys[pygame.K_w] or keys[pygame.K_UP])
-                    
-                    if dx and dy:
-                        dx *= 0.707
-                        dy *= 0.707
-                    
-                    actual_speed = p.speed + p.speed_bonus
-                    nx = p.x + dx * actual_speed
-                    ny = p.y + dy * actual_speed
-                    
-                    if not self.collides(nx, p.y, p.w, p.h):
-                        p.x = nx
-                    if not self.collides(p.x, ny, p.w, p.h):
-                        p.y = ny
-                    
-                    p.x = max(0, min(MAP_W*TILE - p.w, p.x))
-                    p.y = max(0, min(MAP_H*TILE - p.h, p.y))
-            
-            # Shooting with auto-aim
-            if shoot and p.alive and not p.inside:
-                # Check for nearest cop to auto-aim
-                nearest_cop, cop_dist = self.get_nearest_cop(400)
-                
-                if nearest_cop:
-                    # Auto-aim at nearest cop
-                    angle = math.atan2(
-                        nearest_cop.center[1] - p.center[1],
-                        nearest_cop.center[0] - p.center[0]
-                    )
-                else:
-                    # Manual aim with mouse
-                    mx, my = pygame.mouse.get_pos()
-                    angle = math.atan2(my - SCREEN_H//2, mx - SCREEN_W//2)
-                
-                self.shoot(angle)
-            
-            # Update camera
-            self.camera[0] += (p.x - SCREEN_W//2 + p.w//2 - self.camera[0]) * 0.1
-            self.camera[1] += (p.y - SCREEN_H//2 + p.h//2 - self.camera[1]) * 0.1
-            
-            # Apply screen shake
-            if p.screen_shake > 0:
-                self.camera[0] += random.randint(-5, 5)
-                self.camera[1] += random.randint(-5, 5)
-            
-            # Update game
-            self.update(dt)
+            # Draw between the last two ticks
+            self.interp.apply(lag / self.TICK)
             
             # Draw
-            screen.fill(C['bg'])
-            
             if p.inside:
-                self.draw_interior()
+                dirty = self.draw_interior()
             else:
+                self.screen.fill(C['bg'])
                 self.draw_world()
                 
                 # Near building prompt
@@ -3606,11 +5447,13 @@ class Game:
                     prompt = F['main'].render(f"Press E to enter {near}", True, C['gold'])
                     bg_rect = pygame.Rect(SCREEN_W//2 - prompt.get_width()//2 - 10, SCREEN_H - 80, 
                                          prompt.get_width() + 20, 40)
-                    pygame.draw.rect(screen, (0, 0, 0), bg_rect)
-                    pygame.draw.rect(screen, C['gold'], bg_rect, 2)
-                    screen.blit(prompt, (SCREEN_W//2 - prompt.get_width()//2, SCREEN_H - 75))
+                    pygame.draw.rect(self.screen, (0, 0, 0), bg_rect)
+                    pygame.draw.rect(self.screen, C['gold'], bg_rect, 2)
+                    self.screen.blit(prompt, (SCREEN_W//2 - prompt.get_width()//2, SCREEN_H - 75))
             
-            self.draw_hud()
+            hud_redrawn = self.draw_hud()
+            if prof:
+                t = time.perf_counter()
             self.draw_crosshair()
             
             # Day/night lighting
@@ -3618,16 +5461,13 @@ class Game:
             
             # Damage flash overlay
             if p.damage_flash > 0:
-                flash = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA)
-                alpha = int(100 * p.damage_flash / 10)
-                flash.fill((255, 0, 0, alpha))
-                screen.blit(flash, (0, 0))
+                self.flash.apply(self.screen, (255, 0, 0), int(100 * p.damage_flash / 10))
             
             # Vehicle speed indicator
             if p.in_vehicle and p.current_vehicle:
                 v = p.current_vehicle
                 speed_txt = F['main'].render(f"{abs(int(v.velocity * 5))} MPH", True, C['neon'])
-                screen.blit(speed_txt, (SCREEN_W//2 - speed_txt.get_width()//2, SCREEN_H - 90))
+                self.screen.blit(speed_txt, (SCREEN_W//2 - speed_txt.get_width()//2, SCREEN_H - 90))
                 
                 # Radio display
                 station = self.radio_stations[self.current_station]
@@ -3635,22 +5475,94 @@ class Game:
                     radio_txt = F['small'].render(f"♫ {station['name']} - {station['genre']}", True, C['gold'])
                 else:
                     radio_txt = F['small'].render("♫ Radio OFF", True, (100, 100, 100))
-                screen.blit(radio_txt, (SCREEN_W//2 - radio_txt.get_width()//2, SCREEN_H - 65))
+                self.screen.blit(radio_txt, (SCREEN_W//2 - radio_txt.get_width()//2, SCREEN_H - 65))
                 
                 exit_hint = F['tiny'].render("E = Exit | R = Radio", True, (150, 150, 150))
-                screen.blit(exit_hint, (SCREEN_W//2 - exit_hint.get_width()//2, SCREEN_H - 40))
+                self.screen.blit(exit_hint, (SCREEN_W//2 - exit_hint.get_width()//2, SCREEN_H - 40))
             
             # Controls hint
             if not p.inside and not p.in_vehicle:
                 hint = F['tiny'].render("WASD=Move | Click=Shoot | Space=Melee | E=Enter | TAB=Missions", True, (80, 80, 80))
-                screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, SCREEN_H - 25))
+                self.screen.blit(hint, (SCREEN_W//2 - hint.get_width()//2, SCREEN_H - 25))
+            self.interp.restore()
+            if prof:
+                t = prof.span('overlays', t)
+                prof.draw(self.screen, clock.get_fps())
+                t = time.perf_counter()  # the panel itself is left out
             
-            pygame.display.flip()
+            if p.inside:
+                # Rooms mostly hold still - push only what changed unless something
+                # drawn over the whole frame did
+                frame = (self.lighting.tint, p.damage_flash, self.notification,
+                         self.show_hud_stats and self.hud_redraw_rate, p.alive or p.respawn_timer)
+                if frame == self.interior_frame and not prof:
+                    if hud_redrawn:
+                        dirty.append(self.hud.get_rect())
+                    pygame.display.update(dirty)
+                else:
+                    pygame.display.flip()
+                self.interior_frame = frame
+            else:
+                pygame.display.flip()
+                self.interior_frame = None
+            if prof:
+                prof.span('flip', t)
         
         pygame.quit()
         sys.exit()
 
 
+def seed_arg(text):
+    """argparse type for --seed: an integer a recording can hold"""
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"seed must be an integer, not {text!r}")
+    if not 0 <= seed < InputLog.SEEDS:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and 2**64-1, not {seed}")
+    return seed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BLOODBATH RPG")
+    parser.add_argument('--headless', action='store_true',
+                        help="simulate without a window and report ticks per second")
+    parser.add_argument('--ticks', type=int, default=TICK_RATE * 60, help="ticks to simulate with --headless")
+    parser.add_argument('--seed', type=seed_arg, help="play the game this seed rolls (random by default)")
+    parser.add_argument('--record', metavar='PATH', help="save every tick's input to PATH on quitting")
+    parser.add_argument('--replay', metavar='PATH', help="play a recorded game back headless")
+    args = parser.parse_args(argv)
+    
+    if args.replay:
+        log = InputLog.load(args.replay)
+        game = Game(headless=True, seed=log.seed)
+        start = time.perf_counter()
+        game.replay(log)
+        elapsed = time.perf_counter() - start
+        p = game.player
+        print(f"replayed {len(log)} ticks of seed {log.seed} in {elapsed:.2f}s: {len(log) / elapsed:.0f} ticks/s "
+              f"(ended with ${p.cash}, {p.kills} kills, wanted {p.wanted:.1f}, at ({p.x:.0f}, {p.y:.0f}))")
+        return 0
+    
+    if not args.headless:
+        game = Game(open_display(), seed=args.seed)
+        log = InputLog(game.seed) if args.record else None
+        try:
+            game.run(log)
+        finally:
+            if log is not None:
+                log.save(args.record)
+        return 0
+    
+    game = Game(headless=True, seed=args.seed)
+    start = time.perf_counter()
+    game.soak(args.ticks)
+    elapsed = time.perf_counter() - start
+    print(f"{args.ticks} ticks in {elapsed:.2f}s: {args.ticks / elapsed:.0f} ticks/s "
+          f"({len(game.cops)} cops, {len(game.civilians)} civilians, {len(game.gang_members)} gang members, "
+          f"{len(game.vehicles)} vehicles)")
+    return 0
+
+
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    sys.exit(main())